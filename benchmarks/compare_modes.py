@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-criterion graph vs single-call structured evaluation.
+
+Runs evaluate_research_paper in both modes against the configured Groq model
+and reports wall-clock latency and token usage for each. With --backend fake or
+--backend replay (after a --backend record run) no network access is needed.
+
+Usage:
+    uv run python benchmarks/compare_modes.py <paper.pdf|paper.txt> "<theme>"
+        [--runs N] [--out results.json] [--backend groq|fake|record|replay]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Make the agent importable the same way the Streamlit app does
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+from langchain_core.callbacks import get_usage_metadata_callback
+
+from article_scout.utils.pdf_extractor import extract_text_from_pdf
+
+
+def load_paper(path: str) -> str:
+    """Loads paper text from a PDF or a plain-text file"""
+    if path.lower().endswith(".pdf"):
+        return extract_text_from_pdf(path)
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def run_mode(paper: str, theme: str, single_call: bool, runs: int) -> dict:
+    """Evaluates the paper `runs` times and aggregates latency and token usage"""
+    # Imported here so --backend can configure the agent before it loads
+    from article_scout.article_scout_agent import evaluate_research_paper
+
+    latencies = []
+    input_tokens = []
+    output_tokens = []
+    final_scores = []
+    for _ in range(runs):
+        with get_usage_metadata_callback() as cb:
+            start = time.perf_counter()
+            result = evaluate_research_paper(paper, theme, single_call=single_call)
+            latencies.append(time.perf_counter() - start)
+        usage = list(cb.usage_metadata.values())
+        input_tokens.append(sum(u.get("input_tokens", 0) for u in usage))
+        output_tokens.append(sum(u.get("output_tokens", 0) for u in usage))
+        final_scores.append(result["final_score"])
+    return {
+        "mode": "single_call" if single_call else "per_criterion",
+        "runs": runs,
+        "latency_mean_s": statistics.mean(latencies),
+        "latency_max_s": max(latencies),
+        "input_tokens_mean": statistics.mean(input_tokens),
+        "output_tokens_mean": statistics.mean(output_tokens),
+        "final_scores": final_scores,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("paper", help="PDF or text file with the research paper")
+    parser.add_argument("theme", help="Article/TCC theme to evaluate against")
+    parser.add_argument("--runs", type=int, default=3, help="Evaluations per mode")
+    parser.add_argument("--out", help="Optional JSON file for the results")
+    parser.add_argument(
+        "--backend",
+        choices=["groq", "fake", "record", "replay"],
+        help="Model backend (overrides LLM_BACKEND)",
+    )
+    args = parser.parse_args()
+    if args.backend:
+        os.environ["LLM_BACKEND"] = args.backend
+
+    paper = load_paper(args.paper)
+    if not paper:
+        print(f"❌ Could not load text from {args.paper}")
+        sys.exit(1)
+
+    results = [
+        run_mode(paper, args.theme, single_call, args.runs)
+        for single_call in (False, True)
+    ]
+
+    print(f"{'mode':<15}{'latency (s)':>14}{'input tok':>12}{'output tok':>12}")
+    for r in results:
+        print(
+            f"{r['mode']:<15}{r['latency_mean_s']:>14.2f}"
+            f"{r['input_tokens_mean']:>12.0f}{r['output_tokens_mean']:>12.0f}"
+        )
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark: recall of the lexical prefilter against the model's relevance scores.
+
+Ranks every paper in a folder (PDF or .txt) against the theme with the local
+BM25 index, then scores the relevance of every paper with the model (one call
+per paper: the relevance gate skips the other criteria) and reports which
+share of the papers the model finds relevant survive each prefilter setting,
+together with the share of evaluations the setting would skip.
+
+Usage:
+    uv run python benchmarks/prefilter_recall.py <folder> "<theme>" [--relevant 0.5]
+        [--top-k 5,10,20] [--min-score 0.1,0.25,0.5] [--out results.json]
+        [--backend groq|fake|record|replay]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Make the agent importable the same way the Streamlit app does
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+
+def load_corpus(folder: str) -> list[str]:
+    """PDF paths and plain-text papers of the folder, in name order"""
+    sources = []
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if name.lower().endswith(".pdf"):
+            sources.append(path)
+        elif name.lower().endswith(".txt"):
+            with open(path, encoding="utf-8") as f:
+                sources.append(f.read())
+    return sources
+
+
+def relevance_scores(
+    sources: list[str], theme: str, concurrency: int
+) -> list[float | None]:
+    """The model's relevance score of each source (None when its evaluation failed)"""
+    # Imported here so --backend can configure the agent before it loads
+    from article_scout.batch import evaluate_batch
+
+    scores = [None] * len(sources)
+    # A threshold above any score stops every evaluation after the relevance criterion
+    jobs = ((source, theme) for source in sources)
+    for batch_result in evaluate_batch(
+        jobs, max_concurrency=concurrency, relevance_threshold=1.01
+    ):
+        if batch_result.ok:
+            scores[batch_result.index] = batch_result.result["relevance_score"]
+        else:
+            print(f"⚠️  {batch_result.source}: {batch_result.error}")
+    return scores
+
+
+def recall(kept: set[int], relevant: set[int]) -> float:
+    return len(kept & relevant) / len(relevant) if relevant else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("folder", help="Folder with the papers (.pdf or .txt)")
+    parser.add_argument("theme", help="Article/TCC theme to screen against")
+    parser.add_argument(
+        "--relevant",
+        type=float,
+        default=0.5,
+        help="Model relevance score from which a paper counts as relevant",
+    )
+    parser.add_argument(
+        "--top-k", default="5,10,20", help="Comma-separated top-k settings to measure"
+    )
+    parser.add_argument(
+        "--min-score",
+        default="0.1,0.25,0.5",
+        help="Comma-separated relative-score thresholds to measure",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Concurrent model evaluations"
+    )
+    parser.add_argument("--out", help="Optional JSON file for the results")
+    parser.add_argument(
+        "--backend",
+        choices=["groq", "fake", "record", "replay"],
+        help="Model backend (overrides LLM_BACKEND)",
+    )
+    args = parser.parse_args()
+    if args.backend:
+        os.environ["LLM_BACKEND"] = args.backend
+
+    from article_scout.batch import rank_papers
+    from article_scout.utils.lexical_index import LexicalIndex
+
+    sources = load_corpus(args.folder)
+    if not sources:
+        print(f"❌ No .pdf or .txt papers in {args.folder}")
+        sys.exit(1)
+
+    # Building the index includes the PDF extraction; ranking is what a rerun costs
+    index = LexicalIndex(":memory:")
+    start = time.perf_counter()
+    rank_papers(sources, args.theme, index=index)
+    index_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    ranked = rank_papers(sources, args.theme, index=index)
+    rank_ms = (time.perf_counter() - start) * 1000
+
+    position = {id(source): i for i, source in enumerate(sources)}
+    order = [position[id(paper.source)] for paper in ranked]
+    relative = {position[id(paper.source)]: paper.relative_score for paper in ranked}
+    matched = {i for i in order if relative[i] > 0}
+
+    scores = relevance_scores(sources, args.theme, args.concurrency)
+    relevant = {
+        i
+        for i, score in enumerate(scores)
+        if score is not None and score >= args.relevant
+    }
+
+    settings = [("any match", matched)]
+    settings += [
+        (f"top {k}", set(order[:k]) & matched) for k in map(int, args.top_k.split(","))
+    ]
+    settings += [
+        (f"score >= {s:g}", {i for i in matched if relative[i] >= s})
+        for s in map(float, args.min_score.split(","))
+    ]
+    results = {
+        "papers": len(sources),
+        "relevant": len(relevant),
+        "index_seconds": index_seconds,
+        "rank_ms": rank_ms,
+        "settings": [
+            {
+                "setting": name,
+                "kept": len(kept),
+                "recall": recall(kept, relevant),
+                "evaluations_skipped": 1 - len(kept) / len(sources),
+            }
+            for name, kept in settings
+        ],
+    }
+
+    print(
+        f"{len(sources)} papers, {len(relevant)} relevant "
+        f"(model score >= {args.relevant}); "
+        f"index built in {index_seconds:.2f}s, ranked in {rank_ms:.1f}ms"
+    )
+    print(f"{'setting':<16}{'kept':>6}{'recall':>9}{'skipped':>9}")
+    for r in results["settings"]:
+        print(
+            f"{r['setting']:<16}{r['kept']:>6}{r['recall']:>9.0%}"
+            f"{r['evaluations_skipped']:>9.0%}"
+        )
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
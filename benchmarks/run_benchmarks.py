@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: PDF extraction, response parsing and full evaluations.
+
+- extraction: try_pypdf2, try_pdfminer and try_pymupdf on generated PDFs of
+  increasing page counts (pages/s, characters/s, peak memory)
+- parsing: extract_score_and_explanation on typical model answers (calls/s)
+- evaluation: evaluate_research_paper in each mode, and a batch, against the
+  offline fake model with a fixed latency (latency percentiles, papers/s)
+- pipeline: a batch of generated PDFs evaluated by evaluate_batch (extraction
+  and evaluation in the same threads) and by evaluate_pipeline (extraction in
+  a process pool), with the pipeline's stage occupancy
+- prefilter: building the lexical index of a synthetic corpus and ranking it
+  against a theme (papers/s, queries/s); see prefilter_recall.py for recall
+- startup: in a fresh interpreter, importing article_scout_agent, building
+  its model client and graphs (initialize) and the first evaluation
+
+Runs offline. Results are written as JSON; pass an earlier results file with
+--compare to print the change in throughput and peak memory per benchmark.
+Peak memory is measured with tracemalloc, so it covers Python allocations only
+(not memory allocated inside C extensions such as PyMuPDF).
+
+Usage:
+    uv run python benchmarks/run_benchmarks.py [--out results.json]
+        [--compare baseline.json] [--quick]
+        [--only extraction,parsing,evaluation,pipeline,prefilter,startup]
+"""
+
+import argparse
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+# The evaluation benchmarks use the deterministic fake model, never the API or the cache
+os.environ["LLM_BACKEND"] = "fake"
+os.environ["FAKE_LLM_LATENCY_DISTRIBUTION"] = "constant"
+os.environ.setdefault("FAKE_LLM_LATENCY_MEAN", "0.05")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+# Per-evaluation log lines would drown the report
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# Make the agent importable the same way the Streamlit app does
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+)
+
+PAGE_COUNTS = [1, 10, 50, 200]
+QUICK_PAGE_COUNTS = [1, 10]
+LINES_PER_PAGE = 45
+SAMPLE_LINE = (
+    "The proposed method improves retrieval accuracy on three public benchmarks "
+    "by {n} percent."
+)
+SAMPLE_RESPONSES = [
+    "Score: 0.8\nExplanation: The paper is closely related to the theme.",
+    "Score: 0.35\n"
+    "Explanation: Only the introduction touches the theme.\n"
+    "It focuses on a different domain.",
+    "Some preamble.\nScore: 1\nExplanation: " + "Very detailed reasoning. " * 40,
+]
+
+
+def _escape_pdf_text(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(path: str, pages: int, lines_per_page: int = LINES_PER_PAGE) -> None:
+    """Writes a text-only PDF with the given number of pages (no dependencies)."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_refs = []
+    for page in range(pages):
+        first = page * lines_per_page
+        lines = [
+            f"({_escape_pdf_text(SAMPLE_LINE.format(n=first + i))}) Tj T*"
+            for i in range(lines_per_page)
+        ]
+        stream = ("BT /F1 10 Tf 14 TL 50 780 Td\n" + "\n".join(lines) + "\nET").encode(
+            "latin-1"
+        )
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        page_refs.append(len(objects))
+    kids = " ".join(f"{ref} 0 R" for ref in page_refs).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(
+        b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+        % (len(objects) + 1, xref)
+    )
+    with open(path, "wb") as f:
+        f.write(out.getvalue())
+
+
+def measure(fn, repeats: int) -> dict:
+    """Runs fn `repeats` times; wall-clock stats and one run's peak traced memory."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        value = fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "value": value,
+        "seconds_min": min(timings),
+        "seconds_mean": statistics.mean(timings),
+        "seconds_p95": sorted(timings)[max(int(len(timings) * 0.95) - 1, 0)],
+        "peak_memory_mb": peak / 2**20,
+    }
+
+
+def bench_extraction(quick: bool) -> list[dict]:
+    from article_scout.utils.pdf_extractor import try_pdfminer, try_pymupdf, try_pypdf2
+
+    # name -> (extractor, module it needs)
+    extractors = {
+        "pypdf2": (try_pypdf2, "PyPDF2"),
+        "pdfminer": (try_pdfminer, "pdfminer"),
+        "pymupdf": (try_pymupdf, "fitz"),
+    }
+    results = []
+    with tempfile.TemporaryDirectory() as corpus:
+        for pages in QUICK_PAGE_COUNTS if quick else PAGE_COUNTS:
+            path = os.path.join(corpus, f"paper_{pages}p.pdf")
+            make_pdf(path, pages)
+            for name, (extract, module) in extractors.items():
+                entry = {"benchmark": f"extraction/{name}/{pages}p", "pages": pages}
+                if importlib.util.find_spec(module) is None:
+                    results.append({**entry, "skipped": f"{module} is not installed"})
+                    continue
+                stats = measure(lambda: extract(path), repeats=3 if pages < 50 else 1)
+                text = stats.pop("value")
+                if not text:
+                    results.append({**entry, "skipped": "no text extracted"})
+                    continue
+                results.append(
+                    {
+                        **entry,
+                        **stats,
+                        "throughput": pages / stats["seconds_min"],
+                        "throughput_unit": "pages/s",
+                        "chars_per_s": len(text) / stats["seconds_min"],
+                    }
+                )
+    return results
+
+
+def bench_parsing(quick: bool) -> list[dict]:
+    from article_scout.article_scout_agent import extract_score_and_explanation
+
+    iterations = 2000 if quick else 20000
+
+    def parse_all():
+        for _ in range(iterations):
+            for response in SAMPLE_RESPONSES:
+                extract_score_and_explanation(response)
+
+    stats = measure(parse_all, repeats=3)
+    stats.pop("value")
+    calls = iterations * len(SAMPLE_RESPONSES)
+    return [
+        {
+            "benchmark": "parsing/extract_score_and_explanation",
+            **stats,
+            "throughput": calls / stats["seconds_min"],
+            "throughput_unit": "calls/s",
+        }
+    ]
+
+
+def bench_evaluation(quick: bool) -> list[dict]:
+    from article_scout import article_scout_agent
+    from article_scout.article_scout_agent import evaluate_research_paper
+    from article_scout.batch import evaluate_batch
+
+    latency = float(os.environ["FAKE_LLM_LATENCY_MEAN"])
+    paper = " ".join(SAMPLE_LINE.format(n=i) for i in range(300))
+    long_paper = " ".join(SAMPLE_LINE.format(n=i) for i in range(3000))
+    runs = 2 if quick else 5
+    cases = {
+        "per_criterion": lambda: evaluate_research_paper(
+            paper, "information retrieval"
+        ),
+        "single_call": lambda: evaluate_research_paper(
+            paper, "information retrieval", single_call=True
+        ),
+        "map_reduce": lambda: evaluate_research_paper(
+            long_paper, "information retrieval", map_reduce=True
+        ),
+    }
+    results = []
+    for mode, run in cases.items():
+        stats = measure(run, repeats=runs)
+        stats.pop("value")
+        results.append(
+            {
+                "benchmark": f"evaluation/{mode}",
+                "model_latency_s": latency,
+                **stats,
+                "throughput": 1 / stats["seconds_mean"],
+                "throughput_unit": "papers/s",
+            }
+        )
+
+    papers = 8 if quick else 32
+    jobs = [(f"{paper} Variant {i}.", "information retrieval") for i in range(papers)]
+    stats = measure(lambda: list(evaluate_batch(jobs, max_concurrency=4)), repeats=1)
+    failed = sum(not r.ok for r in stats.pop("value"))
+    results.append(
+        {
+            "benchmark": "evaluation/batch",
+            "model_latency_s": latency,
+            "papers": papers,
+            "failed": failed,
+            **stats,
+            "throughput": papers / stats["seconds_mean"],
+            "throughput_unit": "papers/s",
+            "model_calls": article_scout_agent.llm.stats["calls"],
+        }
+    )
+    return results
+
+
+def bench_pipeline(quick: bool) -> list[dict]:
+    from article_scout.batch import PipelineStats, evaluate_batch, evaluate_pipeline
+
+    latency = float(os.environ["FAKE_LLM_LATENCY_MEAN"])
+    papers, pages = (8, 10) if quick else (32, 20)
+    results = []
+    with tempfile.TemporaryDirectory() as corpus:
+        jobs = []
+        for i in range(papers):
+            path = os.path.join(corpus, f"paper_{i}.pdf")
+            make_pdf(path, pages)
+            jobs.append((path, f"information retrieval {i}"))
+        pipeline_stats = []  # Of each run; measure() runs the pipeline more than once
+
+        def run_pipeline():
+            pipeline_stats.append(PipelineStats())
+            return list(
+                evaluate_pipeline(jobs, max_concurrency=4, stats=pipeline_stats[-1])
+            )
+
+        runs = {
+            "batch": lambda: list(evaluate_batch(jobs, max_concurrency=4)),
+            "pipeline": run_pipeline,
+        }
+        for name, run in runs.items():
+            stats = measure(run, repeats=1)
+            failed = sum(not r.ok for r in stats.pop("value"))
+            entry = {
+                "benchmark": f"pipeline/{name}",
+                "model_latency_s": latency,
+                "papers": papers,
+                "pages": pages,
+                "failed": failed,
+                **stats,
+                "throughput": papers / stats["seconds_min"],
+                "throughput_unit": "papers/s",
+            }
+            if name == "pipeline":
+                entry["occupancy"] = pipeline_stats[0].occupancy()
+                entry["peak_queued"] = pipeline_stats[0].peak_queued
+            results.append(entry)
+    return results
+
+
+def bench_prefilter(quick: bool) -> list[dict]:
+    import random
+
+    from article_scout.utils.lexical_index import LexicalIndex
+
+    papers = 100 if quick else 500
+    rng = random.Random(0)
+    vocabulary = [f"term{i}" for i in range(5000)]
+    texts = [" ".join(rng.choices(vocabulary, k=3000)) for _ in range(papers)]
+    themes = [" ".join(rng.sample(vocabulary, 6)) for _ in range(20)]
+
+    def build():
+        index = LexicalIndex(":memory:")
+        for i, text in enumerate(texts):
+            index.add(f"paper-{i}", text)
+        return index
+
+    build_stats = measure(build, repeats=1)
+    index = build_stats.pop("value")
+    rank_stats = measure(lambda: [index.search(theme) for theme in themes], repeats=3)
+    rank_stats.pop("value")
+    return [
+        {
+            "benchmark": "prefilter/index",
+            "papers": papers,
+            **build_stats,
+            "throughput": papers / build_stats["seconds_min"],
+            "throughput_unit": "papers/s",
+        },
+        {
+            "benchmark": "prefilter/rank",
+            "papers": papers,
+            **rank_stats,
+            "throughput": len(themes) / rank_stats["seconds_min"],
+            "throughput_unit": "queries/s",
+        },
+    ]
+
+
+STARTUP_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from article_scout import article_scout_agent
+imported = time.perf_counter()
+article_scout_agent.initialize()
+initialized = time.perf_counter()
+article_scout_agent.evaluate_research_paper(
+    "A short paper about retrieval. " * 50, "information retrieval"
+)
+evaluated = time.perf_counter()
+json.dump({"import": imported - start, "initialize": initialized - imported,
+           "first_evaluation": evaluated - initialized}, sys.stdout)
+"""
+
+
+def bench_startup(quick: bool) -> list[dict]:
+    """Cold-start phases, each in a new interpreter (the module cache hides them)."""
+    package_dir = sys.path[0]
+    runs = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", STARTUP_SCRIPT],
+                cwd=package_dir,
+                capture_output=True,
+                text=True,
+                check=True,
+                env={**os.environ, "FAKE_LLM_LATENCY_MEAN": "0"},
+            ).stdout
+        )
+        for _ in range(2 if quick else 5)
+    ]
+    results = []
+    for phase in ("import", "initialize", "first_evaluation"):
+        timings = sorted(run[phase] for run in runs)
+        results.append(
+            {
+                "benchmark": f"startup/{phase}",
+                "seconds_min": timings[0],
+                "seconds_mean": statistics.mean(timings),
+                "seconds_p95": timings[max(int(len(timings) * 0.95) - 1, 0)],
+                "throughput": 1 / timings[0],
+                "throughput_unit": "starts/s",
+            }
+        )
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list[dict], baseline_path: str) -> None:
+    """Prints each benchmark's throughput and peak-memory change against a baseline."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {r["benchmark"]: r for r in json.load(f)["results"]}
+    print(f"\nChange vs {baseline_path}:")
+    print(f"{'benchmark':<45}{'throughput':>12}{'peak mem':>12}")
+    for r in results:
+        old = baseline.get(r["benchmark"])
+        if not old or "throughput" not in r or "throughput" not in old:
+            continue
+        throughput = (r["throughput"] / old["throughput"] - 1) * 100
+        memory = 0.0
+        if old.get("peak_memory_mb") and "peak_memory_mb" in r:
+            memory = (r["peak_memory_mb"] / old["peak_memory_mb"] - 1) * 100
+        print(f"{r['benchmark']:<45}{throughput:>+11.1f}%{memory:>+11.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--out", default="benchmark_results.json", help="JSON file for the results"
+    )
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument(
+        "--only",
+        default="extraction,parsing,evaluation,pipeline,prefilter,startup",
+        help="Comma-separated groups to run",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Smaller corpus and fewer runs"
+    )
+    args = parser.parse_args()
+
+    groups = {
+        "extraction": bench_extraction,
+        "parsing": bench_parsing,
+        "evaluation": bench_evaluation,
+        "pipeline": bench_pipeline,
+        "prefilter": bench_prefilter,
+        "startup": bench_startup,
+    }
+    results = []
+    for group in args.only.split(","):
+        print(f"Running {group} benchmarks...")
+        results.extend(groups[group](args.quick))
+
+    print(f"\n{'benchmark':<45}{'throughput':>16}{'mean (s)':>10}{'peak MB':>9}")
+    for r in results:
+        if "skipped" in r:
+            print(f"{r['benchmark']:<45}  skipped: {r['skipped'][:40]}")
+            continue
+        throughput = f"{r['throughput']:.1f} {r['throughput_unit']}"
+        peak = f"{r['peak_memory_mb']:.1f}" if "peak_memory_mb" in r else "-"
+        print(
+            f"{r['benchmark']:<45}{throughput:>16}{r['seconds_mean']:>10.3f}{peak:>9}"
+        )
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": args.quick,
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
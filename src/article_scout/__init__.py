@@ -4,13 +4,42 @@ Article Scout - Research Paper Evaluator for TCC
 A tool to evaluate research papers for relevance to TCC (Final Project) themes.
 """
 
+import importlib
+
 __version__ = "0.1.0"
 __author__ = "Article Scout Team"
 
-from .article_scout_agent import evaluate_research_paper
-from .utils.pdf_extractor import extract_text_from_pdf
+# Public names and the submodule that defines each. A submodule is imported on
+# first access, so importing another one (the PDF extractor in the worker
+# processes of evaluate_pipeline, or in the Streamlit app before it loads its
+# .env file) does not import the agent, which reads its settings at import.
+_EXPORTS = {
+    "aevaluate_research_paper": ".article_scout_agent",
+    "astream_research_paper_evaluation": ".article_scout_agent",
+    "evaluate_research_paper": ".article_scout_agent",
+    "initialize": ".article_scout_agent",
+    "stream_research_paper_evaluation": ".article_scout_agent",
+    "summarize_model_calls": ".article_scout_agent",
+    "summarize_parse_repairs": ".article_scout_agent",
+    "BatchResult": ".batch",
+    "PipelineStats": ".batch",
+    "RankedPaper": ".batch",
+    "aevaluate_batch": ".batch",
+    "evaluate_batch": ".batch",
+    "evaluate_pipeline": ".batch",
+    "prefilter_jobs": ".batch",
+    "rank_papers": ".batch",
+    "summarize_batch": ".batch",
+    "extract_text_from_pdf": ".utils.pdf_extractor",
+}
+
+__all__ = sorted(_EXPORTS)
+
 
-__all__ = [
-    "evaluate_research_paper",
-    "extract_text_from_pdf",
-]
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
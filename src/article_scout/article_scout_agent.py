@@ -1,374 +1,2179 @@
 # %%
-from typing import TypedDict
-from langgraph.graph import StateGraph, START, END
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import logging
+import operator
 import os
-from dotenv import load_dotenv
-import re
-import pprint
-from utils.pdf_extractor import extract_text_from_pdf
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Annotated, NamedTuple, TypedDict
 
-MAX_INPUT_CHARS = 5000  # Adjust this value based on your API limits
+from .utils import telemetry
+from .utils.criteria import Criterion, load_criteria, registry_fingerprint
+from .utils.evaluation_cache import EvaluationCache, make_cache_key
+from .utils.near_duplicates import NearDuplicateIndex
+from .utils.parsing import normalize_score, parse_score_response
+from .utils.rate_limiter import RateLimiter
+from .utils.sections import (
+    Section,
+    build_excerpt,
+    split_into_chunks,
+    split_into_sections,
+)
+from .utils.single_flight import SingleFlight
+from .utils.tokens import (
+    chars_per_token,
+    count_tokens,
+    fit_to_tokens,
+    input_token_budget,
+)
 
 # %%
-# Load environment variables and configure the Groq API key
-load_dotenv()
-groq_api_key = os.getenv('GROQ_API_KEY')
-if groq_api_key:
-    os.environ["GROQ_API_KEY"] = groq_api_key
-else:
-    print("Warning: GROQ_API_KEY not found in environment variables. Please ensure it is configured in your .env file")
-    print("The application will show an error when trying to evaluate papers.")
+## Lazy initialisation
+# LangChain, LangGraph and the Groq client take seconds to import, so the model
+# clients, prompts, schemas, evaluation cache and compiled graphs are built on
+# first use instead of at import time: importing this module only reads the
+# settings (the caller loads any .env file first). Each of those module
+# attributes has a factory registered with @_lazy; _get() builds it once per
+# process (thread-safe) and stores it as a plain module global, so later reads,
+# and tests that monkeypatch it, see the stored object. Code in this module
+# reads them with _get("<name>"); other modules can use the attribute as usual
+# (module __getattr__). initialize() builds everything up front, e.g. when a
+# server starts.
+_LAZY_FACTORIES = {}
+_lazy_lock = threading.RLock()
+
+
+def _lazy(*names: str):
+    """Registers a factory returning {name: value} for the given module attributes."""
+
+    def register(factory):
+        for name in names:
+            _LAZY_FACTORIES[name] = factory
+        return factory
+
+    return register
+
+
+def _get(name: str):
+    """The lazily built module attribute `name`, building it on first use."""
+    try:
+        return globals()[name]
+    except KeyError:
+        pass
+    with _lazy_lock:
+        if name not in globals():
+            with telemetry.span("initialize", resource=name) as span:
+                values = _LAZY_FACTORIES[name]()
+                span.set_attribute("resources", ",".join(values))
+            globals().update(values)
+    return globals()[name]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_FACTORIES:
+        return _get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def initialize() -> None:
+    """Builds every lazily initialised resource now (model clients, cache, graphs)."""
+    for name in _LAZY_FACTORIES:
+        _get(name)
+
+
 # %%
-class State(TypedDict):
+## Criterion registry
+# The criteria (prompt, weight, output-token cap, input excerpt) are data from
+# utils/criteria.py. CRITERIA_CONFIG points to a JSON file that adds, removes
+# or adjusts criteria for a deployment; the graph, the single-call schema and
+# the final score below are all generated from CRITERIA.
+CRITERIA_CONFIG = os.getenv("CRITERIA_CONFIG", "")
+
+
+@_lazy("CRITERIA", "CRITERION_WEIGHTS", "CRITERIA_FINGERPRINT")
+def _build_criteria() -> dict:
+    """The criterion registry (read from CRITERIA_CONFIG) and its derived values."""
+    criteria: dict[str, Criterion] = {
+        criterion.name: criterion for criterion in load_criteria(CRITERIA_CONFIG)
+    }
+    total_weight = sum(c.weight for c in criteria.values())
+    return {
+        "CRITERIA": criteria,
+        # Normalised weights keep the final score between 0 and 1 whatever the criteria
+        "CRITERION_WEIGHTS": {
+            name: criterion.weight / total_weight
+            for name, criterion in criteria.items()
+        },
+        "CRITERIA_FINGERPRINT": registry_fingerprint(criteria.values()),
+    }
+
+
+# %%
+class BaseState(TypedDict):
     """
     Represents the state of the research paper evaluation process
-    in relation to a TCC theme, including multiple scores and their explanations.
+    in relation to a TCC theme. Each criterion in CRITERIA adds its score and
+    explanation keys (<name>_score, <name>_explanation), see State below.
     """
-    research_paper: str # The text of the research paper to be evaluated
-    article_theme: str      # The theme of the researcher's TCC (Final Project)
-    
-    relevance_score: float
-    relevance_explanation: str
 
-    originality_score: float
-    originality_explanation: str
+    research_paper: str  # The text of the research paper to be evaluated
+    article_theme: str  # The theme of the researcher's TCC (Final Project)
 
-    methodology_quality_score: float
-    methodology_quality_explanation: str
+    final_score: float
+    truncation_warning: str
+    # Detected sections of research_paper as {"name", "start", "end"} character
+    # offsets. When present, research_paper holds the full text and each
+    # criterion is sent only an excerpt of the sections it needs.
+    paper_sections: list[dict]
+    # Map-reduce mode: chunks of the full paper and their summaries
+    # ({"index", "summary"}, appended by parallel summarize_chunk nodes)
+    paper_chunks: list[str]
+    chunk_summaries: Annotated[list[dict], operator.add]
+    # Relevance gate: when relevance_threshold is set and the relevance score falls
+    # below it, the other criteria are not evaluated (listed in skipped_criteria,
+    # with the tokens their requests would have used in saved_tokens)
+    relevance_threshold: float | None
+    skipped_criteria: list[str]
+    saved_tokens: int
+    # Cascade mode: criteria run on the small model and are re-run on the large one
+    # when uncertain; every criterion call is recorded in model_calls
+    cascade: bool
+    model_calls: Annotated[list[dict], operator.add]
+    # Criteria whose answer could not be parsed and were re-asked
+    # ({"criterion", "attempts", "repaired"}, see _score_criterion)
+    parse_repairs: Annotated[list[dict], operator.add]
+    # Result reused from a near-duplicate paper: {"similarity", "title"}
+    near_duplicate: dict | None
 
-    results_discussion_quality_score: float
-    results_discussion_quality_explanation: str
 
-    potential_impact_score: float
-    potential_impact_explanation: str
+@_lazy("State")
+def _build_state() -> dict:
+    """The full graph state: the keys above plus two per criterion."""
+    criteria = _get("CRITERIA")
+    fields = {
+        **BaseState.__annotations__,
+        **{f"{name}_score": float for name in criteria},
+        **{f"{name}_explanation": str for name in criteria},
+    }
+    return {"State": TypedDict("State", fields)}
 
-    writing_clarity_score: float
-    writing_clarity_explanation: str
 
-    references_timeliness_score: float
-    references_timeliness_explanation: str
+if TYPE_CHECKING:
+    # Annotations name the lazily built State; for a type checker it is a BaseState
+    State = BaseState
+
 
-    final_score: float
-    truncation_warning: str
 # %%
 ## Groq model initialization
-# We use the 'gemma2-9b-it' model with a temperature of 0.3 for more consistent responses.
-llm = ChatGroq(model="llama-3.1-8b-instant", temperature=0.3)
+# We use 'llama-3.1-8b-instant' with a temperature of 0.3 for more consistent responses.
+# LLM_BACKEND selects where answers come from: "groq" (the real API), "fake" (a
+# deterministic offline model, see FAKE_LLM_*), "record" (the real API, saving every
+# answer to LLM_CASSETTE_PATH) or "replay" (answers served from that cassette only).
+MODEL_NAME = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+MODEL_TEMPERATURE = float(os.getenv("GROQ_TEMPERATURE", "0.3"))
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")
+LLM_CASSETTE_PATH = os.getenv(
+    "LLM_CASSETTE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "article_scout", "cassette.jsonl"),
+)
+FAKE_LLM_OPTIONS = {
+    "latency_distribution": os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "lognormal"),
+    "latency_mean": float(os.getenv("FAKE_LLM_LATENCY_MEAN", "0.0")),
+    "latency_stddev": float(os.getenv("FAKE_LLM_LATENCY_STDDEV", "0.0")),
+    "error_rate": float(os.getenv("FAKE_LLM_ERROR_RATE", "0.0")),
+    "error_kind": os.getenv("FAKE_LLM_ERROR_KIND", "rate_limit"),
+}
+
+
+@_lazy("llm")
+def _build_llm() -> dict:
+    from .utils.llm_backends import make_chat_model
+
+    if _API_BACKEND and not os.getenv("GROQ_API_KEY"):
+        telemetry.log(
+            "groq_api_key_missing",
+            logging.WARNING,
+            message="GROQ_API_KEY not found in environment variables. Please ensure "
+            "it is configured in your .env file. The application will show an error "
+            "when trying to evaluate papers.",
+        )
+    return {
+        "llm": make_chat_model(
+            MODEL_NAME,
+            MODEL_TEMPERATURE,
+            LLM_BACKEND,
+            LLM_CASSETTE_PATH,
+            **FAKE_LLM_OPTIONS,
+        )
+    }
+
+
+# %%
+## Rate limiting
+# Every model call goes through one shared limiter: requests and tokens per minute
+# are kept under the Groq account limits (defaults: llama-3.1-8b-instant free tier),
+# 429s and server errors are retried honouring Retry-After, and the number of
+# concurrent calls adapts (AIMD) to observed 429s and latency. 0 disables a limit.
+# Offline backends (fake, replay) are not limited unless the limits are set explicitly.
+_API_BACKEND = LLM_BACKEND in ("groq", "record")
+GROQ_REQUESTS_PER_MINUTE = int(
+    os.getenv("GROQ_REQUESTS_PER_MINUTE", "30" if _API_BACKEND else "0")
+)
+GROQ_TOKENS_PER_MINUTE = int(
+    os.getenv("GROQ_TOKENS_PER_MINUTE", "6000" if _API_BACKEND else "0")
+)
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "8"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "5"))
+
+
+@_lazy("rate_limiter")
+def _build_rate_limiter() -> dict:
+    return {
+        "rate_limiter": RateLimiter(
+            requests_per_minute=GROQ_REQUESTS_PER_MINUTE,
+            tokens_per_minute=GROQ_TOKENS_PER_MINUTE,
+            max_concurrency=GROQ_MAX_CONCURRENCY,
+            max_retries=GROQ_MAX_RETRIES,
+        )
+    }
+
+
+def _usage_metadata(result) -> dict | None:
+    """Token usage the API reported for a model answer (plain or structured-output)."""
+    message = result.get("raw") if isinstance(result, dict) else result
+    return getattr(message, "usage_metadata", None)
+
+
+def _usage_tokens(result) -> int | None:
+    """Total tokens the API reported for a model answer (plain or structured-output)."""
+    usage = _usage_metadata(result)
+    return usage["total_tokens"] if usage else None
+
+
+def _record_usage(call: telemetry.ModelCall, prompt: str, result) -> None:
+    usage = _usage_metadata(result)
+    if usage:
+        call.set_usage(usage["input_tokens"], usage["output_tokens"])
+    else:
+        call.set_usage(count_tokens(prompt), None)
+
+
+def _invoke(
+    runnable, prompt: str, output_tokens: int, limiter: RateLimiter | None = None
+):
+    """Blocking model call through the shared (or given) rate limiter, as a span."""
+    with telemetry.model_call() as call:
+        result = (limiter or _get("rate_limiter")).call(
+            call.wrap(lambda: runnable.invoke(prompt)),
+            count_tokens(prompt) + output_tokens,
+            usage=_usage_tokens,
+        )
+        _record_usage(call, prompt, result)
+        return result
+
+
+async def _ainvoke(
+    runnable, prompt: str, output_tokens: int, limiter: RateLimiter | None = None
+):
+    """Async model call through the shared (or given) rate limiter, as a span."""
+    with telemetry.model_call() as call:
+        result = await (limiter or _get("rate_limiter")).acall(
+            call.awrap(lambda: runnable.ainvoke(prompt)),
+            count_tokens(prompt) + output_tokens,
+            usage=_usage_tokens,
+        )
+        _record_usage(call, prompt, result)
+        return result
+
+
+# %%
+## Model cascade
+# In cascade mode each criterion is scored by the small model (llm) first and
+# re-run on CASCADE_MODEL_NAME only when the score falls inside the uncertain
+# band or the answer cannot be parsed. The large model has its own Groq limits,
+# so it gets its own rate limiter.
+CASCADE_MODEL_NAME = os.getenv("GROQ_CASCADE_MODEL", "llama-3.3-70b-versatile")
+CASCADE_UNCERTAIN_BAND = (
+    float(os.getenv("CASCADE_UNCERTAIN_LOW", "0.4")),
+    float(os.getenv("CASCADE_UNCERTAIN_HIGH", "0.7")),
+)
+
+
+@_lazy("cascade_llm")
+def _build_cascade_llm() -> dict:
+    from .utils.llm_backends import make_chat_model
+
+    return {
+        "cascade_llm": make_chat_model(
+            CASCADE_MODEL_NAME,
+            MODEL_TEMPERATURE,
+            LLM_BACKEND,
+            LLM_CASSETTE_PATH,
+            **FAKE_LLM_OPTIONS,
+        )
+    }
+
+
+CASCADE_REQUESTS_PER_MINUTE = int(
+    os.getenv("CASCADE_REQUESTS_PER_MINUTE", "30" if _API_BACKEND else "0")
+)
+CASCADE_TOKENS_PER_MINUTE = int(
+    os.getenv("CASCADE_TOKENS_PER_MINUTE", "12000" if _API_BACKEND else "0")
+)
+
+
+@_lazy("cascade_rate_limiter")
+def _build_cascade_rate_limiter() -> dict:
+    return {
+        "cascade_rate_limiter": RateLimiter(
+            requests_per_minute=CASCADE_REQUESTS_PER_MINUTE,
+            tokens_per_minute=CASCADE_TOKENS_PER_MINUTE,
+            max_concurrency=GROQ_MAX_CONCURRENCY,
+            max_retries=GROQ_MAX_RETRIES,
+        )
+    }
+
+
+# %%
+## Input budgeting
+# Every request (prompt + paper + answer) must fit both the model context window
+# and the per-request token limit of the Groq account (MAX_REQUEST_TOKENS). The
+# paper gets whatever the measured prompt and the reserved answer leave over.
+MAX_REQUEST_TOKENS = int(os.getenv("MAX_REQUEST_TOKENS", "6000"))
+# %%
+## Long-document (map-reduce) settings
+# The full paper is split into chunks that are summarised in parallel, and the
+# criteria are judged on the combined summaries instead of a truncated paper.
+MAP_REDUCE_CHUNK_TOKENS = int(os.getenv("MAP_REDUCE_CHUNK_TOKENS", "2000"))
+MAP_REDUCE_SUMMARY_TOKENS = int(os.getenv("MAP_REDUCE_SUMMARY_TOKENS", "300"))
+MAP_REDUCE_TOKEN_BUDGET = int(
+    os.getenv("MAP_REDUCE_TOKEN_BUDGET", "60000")
+)  # Estimated tokens per paper
+MAP_REDUCE_CONCURRENCY = int(os.getenv("MAP_REDUCE_CONCURRENCY", "4"))
+# %%
+## Evaluation cache
+# Results are cached on disk, keyed by the truncated paper, theme, model, temperature,
+# the criterion definitions (fingerprints from the registry) and PROMPT_VERSION.
+# Bump PROMPT_VERSION whenever the single-call or chunk prompt or the scoring
+# contract changes so answers produced by older prompts are not reused.
+# Set EVALUATION_CACHE_PATH to an empty string to disable caching.
+PROMPT_VERSION = "2"
+EVALUATION_CACHE_PATH = os.getenv(
+    "EVALUATION_CACHE_PATH",
+    os.path.join(
+        os.path.expanduser("~"), ".cache", "article_scout", "evaluations.sqlite3"
+    ),
+)
+
+
+@_lazy("evaluation_cache")
+def _build_evaluation_cache() -> dict:
+    """The SQLite result cache, or None when EVALUATION_CACHE_PATH is empty."""
+    return {
+        "evaluation_cache": (
+            EvaluationCache(
+                EVALUATION_CACHE_PATH,
+                max_entries=int(os.getenv("EVALUATION_CACHE_MAX_ENTRIES", "10000")),
+                ttl_seconds=float(
+                    os.getenv("EVALUATION_CACHE_TTL_SECONDS", str(30 * 24 * 3600))
+                ),
+                per_criterion=os.getenv(
+                    "EVALUATION_CACHE_PER_CRITERION", "false"
+                ).lower()
+                == "true",
+            )
+            if EVALUATION_CACHE_PATH
+            else None
+        )
+    }
+
+
+def _cache_model() -> str:
+    # Fake answers are never served as real ones (recorded/replayed answers are real)
+    return f"fake:{MODEL_NAME}" if LLM_BACKEND == "fake" else MODEL_NAME
+
+
+def _cache_key(state: State, scope: str) -> str:
+    """Content-addressed key of an evaluation scope ('criterion:<name>' or a mode)."""
+    return make_cache_key(
+        PROMPT_VERSION,
+        _cache_model(),
+        MODEL_TEMPERATURE,
+        scope,
+        bool(state.get("paper_sections")),
+        state["article_theme"],
+        state["research_paper"],
+    )
+
+
+# %%
+## Near-duplicate papers
+# The same paper arrives as a preprint, the camera-ready version or a re-upload
+# whose extracted text differs slightly, so the exact cache key misses. Every
+# cached result is also indexed by a MinHash signature of its paper text
+# (utils/near_duplicates.py); a paper at least NEAR_DUPLICATE_THRESHOLD similar
+# to one evaluated with the same theme, model, prompts and mode reuses that
+# stored result, and the match is reported in the result's near_duplicate key.
+# Needs the evaluation cache; set NEAR_DUPLICATE_INDEX_PATH to an empty string
+# to disable.
+NEAR_DUPLICATE_INDEX_PATH = os.getenv(
+    "NEAR_DUPLICATE_INDEX_PATH",
+    os.path.join(
+        os.path.expanduser("~"), ".cache", "article_scout", "near_duplicates.sqlite3"
+    ),
+)
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+
+@_lazy("near_duplicate_index")
+def _build_near_duplicate_index() -> dict:
+    """The MinHash/LSH index of cached papers, or None when disabled."""
+    return {
+        "near_duplicate_index": (
+            NearDuplicateIndex(
+                NEAR_DUPLICATE_INDEX_PATH,
+                threshold=NEAR_DUPLICATE_THRESHOLD,
+            )
+            if NEAR_DUPLICATE_INDEX_PATH and EVALUATION_CACHE_PATH
+            else None
+        )
+    }
+
+
+# %%
+## Checkpoints
+# An evaluation given an evaluation_id runs on the LangGraph thread of that id
+# and is checkpointed in CHECKPOINT_PATH (SQLite) after every step, including
+# the criteria that finished in a step where another one failed. Calling again
+# with the same id after a crash or a model-call timeout resumes the run: only
+# the nodes that had not completed are executed (and paid for). The thread is
+# deleted once the evaluation finishes. Set CHECKPOINT_PATH to an empty string
+# to disable checkpointing (evaluation ids are then ignored).
+CHECKPOINT_PATH = os.getenv(
+    "CHECKPOINT_PATH",
+    os.path.join(
+        os.path.expanduser("~"), ".cache", "article_scout", "checkpoints.sqlite3"
+    ),
+)
+
+
+@_lazy("checkpointer")
+def _build_checkpointer() -> dict:
+    """The SQLite graph checkpointer, or None when CHECKPOINT_PATH is empty."""
+    if not CHECKPOINT_PATH:
+        return {"checkpointer": None}
+    from .utils.checkpoints import SQLiteCheckpointer
+
+    return {"checkpointer": SQLiteCheckpointer(CHECKPOINT_PATH)}
+
+
+# %%
+## Request coalescing
+# Identical evaluations submitted at the same moment (two users uploading the
+# same PDF with the same theme, a double-click) are computed once: the first
+# caller leads, the others, threads or asyncio tasks, wait for it and get a
+# copy of its result (or its exception), marked with coalesced=True on their
+# telemetry span. The key covers the paper text, the theme and every setting
+# that changes the result, like the cache key. The leader stores the result in
+# the cache before releasing the followers, so a caller arriving just after
+# the flight ends finds it there.
+@_lazy("evaluation_flights")
+def _build_evaluation_flights() -> dict:
+    return {"evaluation_flights": SingleFlight()}
+
+
 # %%
 def extract_score_and_explanation(content: str) -> tuple[float, str]:
     """
     Extracts the numerical score and the explanation from the LLM's response.
-    Expects the format 'Score: X.X\nExplanation: YYY'.
-    """
-    score_match = re.search(r'Score:\s*(\d+(\.\d+)?)', content)
-    explanation_match = re.search(r'Explanation:\s*(.*)', content, re.DOTALL) # DOTALL to match across newlines
-
-    score = float(score_match.group(1)) if score_match else 0.0
-    explanation = explanation_match.group(1).strip() if explanation_match else "No explanation provided."
-    
-    if not score_match:
-        raise ValueError(f"Could not extract score from: {content}")
-        
-    return score, explanation
-# %%
-def check_relevance(state: State) -> State:
-    """
-    Checks the relevance of a research paper in relation to a TCC theme.
-    """
-    prompt = ChatPromptTemplate.from_template(
-        "Analyze the relevance of the following research paper to the provided TCC theme. "
-        "Identify keywords, central concepts, and the research area of both to determine the connection. "
-        "Provide a relevance score between 0 and 1, where 1 indicates high relevance. "
-        "Your response MUST start with 'Score: ' followed by the numerical score, "
-        "then a newline, and then 'Explanation: ' followed by your detailed explanation about the relevance and why the paper is (or is not) useful for the TCC.\n\n"
-        "Article Theme: {article_theme}\n\nResearch Paper: {research_paper}"
-    )
-    
-    result = llm.invoke(prompt.format(article_theme=state["article_theme"], research_paper=state["research_paper"]))
-    
-    try:
-        content = result.content if isinstance(result.content, str) else str(result.content)
-        score, explanation = extract_score_and_explanation(content)
-        state["relevance_score"] = score
-        state["relevance_explanation"] = explanation
-    except ValueError as e:
-        print(f"Error in check_relevance: {e}")
-        state["relevance_score"] = 0.0
-        state["relevance_explanation"] = f"Error: {e}"
-    return state
+    Expects the format 'Score: X.X\nExplanation: YYY', but also accepts JSON,
+    decorated labels and scores out of 10 or in percent (see utils/parsing.py);
+    the score is normalised to 0-1. Raises ValueError when no score is found.
+    """
+    return parse_score_response(content)
+
+
+# %%
+## Parse repair
+# An answer that cannot be parsed is not recorded as 0.0 straight away (which
+# would drag final_score down): the same model is re-asked, once by default, to
+# restate its previous answer in the expected format. The re-ask carries that
+# answer instead of the paper and has a small output cap, so it costs a fraction
+# of re-running the criterion. Repairs are listed in the result's parse_repairs
+# (see summarize_parse_repairs) and counted in the parse_repairs metric.
+PARSE_REPAIR_ATTEMPTS = int(os.getenv("PARSE_REPAIR_ATTEMPTS", "1"))
+PARSE_REPAIR_OUTPUT_TOKENS = int(os.getenv("PARSE_REPAIR_OUTPUT_TOKENS", "150"))
+REPAIR_TEMPLATE = (
+    "Your previous answer to a research paper evaluation ({summary}) could not be "
+    "read. Restate it in exactly this format, with a score between 0 and 1, where 1 is "
+    "best:\n"
+    "Score: <score>\n"
+    "Explanation: <your explanation in one or two sentences>\n\n"
+    "Previous answer: {answer}"
+)
+
+
+# %%
+## Section-aware routing
+# With the "sections" excerpt strategy a criterion is judged on its own sections
+# (Criterion.sections, in priority order), up to Criterion.input_tokens. Used only
+# when headings were detected in the paper.
 # %%
-def check_originality(state: State) -> State:
+def _response_text(result) -> str:
+    return result.content if isinstance(result.content, str) else str(result.content)
+
+
+def _parse_criterion_response(criterion: str, result) -> dict:
     """
-    Evaluates the originality/novelty of the work presented in the paper.
+    Turns the model response for one criterion into the State keys it owns.
+    Parse failures are returned as a 0.0 score with the error as explanation.
     """
-    prompt = ChatPromptTemplate.from_template(
-        "Evaluate the originality and novelty of the following research paper. "
-        "Does it introduce a new idea, methodology, or results that advance the field? "
-        "Provide an originality score between 0 and 1. "
-        "Your response MUST start with 'Score: ' followed by the numerical score, "
-        "then a newline, and then 'Explanation: ' followed by your detailed explanation.\n\nResearch Paper: {research_paper}"
-    )
-    result = llm.invoke(prompt.format(research_paper=state["research_paper"]))
     try:
-        content = result.content if isinstance(result.content, str) else str(result.content)
-        score, explanation = extract_score_and_explanation(content)
-        state["originality_score"] = score
-        state["originality_explanation"] = explanation
+        score, explanation = extract_score_and_explanation(_response_text(result))
     except ValueError as e:
-        print(f"Error in check_originality: {e}")
-        state["originality_score"] = 0.0
-        state["originality_explanation"] = f"Error: {e}"
-    return state
-# %%
-def check_methodology_quality(state: State) -> State:
+        score, explanation = 0.0, f"Error: {e}"
+    return {f"{criterion}_score": score, f"{criterion}_explanation": explanation}
+
+
+def _parse_failed(criterion: str, updates: dict) -> bool:
+    return updates[f"{criterion}_explanation"].startswith("Error:")
+
+
+def _repair_prompt(criterion: Criterion, answer: str) -> str:
+    return REPAIR_TEMPLATE.format(
+        summary=criterion.summary, answer=answer.strip() or "(empty)"
+    )
+
+
+def _finish_repairs(criterion: str, updates: dict, attempts: int) -> dict:
+    """Records a criterion's repair re-asks (and a parse failure if still unparsed)."""
+    failed = _parse_failed(criterion, updates)
+    if failed:
+        telemetry.record_parse_failure(
+            updates[f"{criterion}_explanation"].removeprefix("Error: ")
+        )
+    if attempts:
+        telemetry.PARSE_REPAIRS.inc(
+            node=telemetry.current_node(), outcome="failed" if failed else "repaired"
+        )
+        updates["parse_repairs"] = [
+            {"criterion": criterion, "attempts": attempts, "repaired": not failed}
+        ]
+    return updates
+
+
+def _score_criterion(
+    criterion: Criterion, prompt_text: str, model, limiter: RateLimiter | None = None
+) -> dict:
     """
-    Evaluates the quality and robustness of the methodology used in the paper.
+    Scores one criterion with a blocking call to model. An unparseable answer is
+    re-asked up to PARSE_REPAIR_ATTEMPTS times with the short repair prompt.
     """
-    prompt = ChatPromptTemplate.from_template(
-        "Evaluate the quality of the methodology presented in the following research paper. "
-        "Is the methodology clear, appropriate for the objectives, and robust? "
-        "Provide a methodology quality score between 0 and 1. "
-        "Your response MUST start with 'Score: ' followed by the numerical score, "
-        "then a newline, and then 'Explanation: ' followed by your detailed explanation.\n\nResearch Paper: {research_paper}"
+    result = _invoke(
+        model.bind(max_tokens=criterion.output_tokens),
+        prompt_text,
+        criterion.output_tokens,
+        limiter,
     )
-    result = llm.invoke(prompt.format(research_paper=state["research_paper"]))
-    try:
-        content = result.content if isinstance(result.content, str) else str(result.content)
-        score, explanation = extract_score_and_explanation(content)
-        state["methodology_quality_score"] = score
-        state["methodology_quality_explanation"] = explanation
-    except ValueError as e:
-        print(f"Error in check_methodology_quality: {e}")
-        state["methodology_quality_score"] = 0.0
-        state["methodology_quality_explanation"] = f"Error: {e}"
-    return state
-# %%
-def check_results_discussion_quality(state: State) -> State:
+    updates = _parse_criterion_response(criterion.name, result)
+    answer, attempts = _response_text(result), 0
+    while _parse_failed(criterion.name, updates) and attempts < PARSE_REPAIR_ATTEMPTS:
+        attempts += 1
+        result = _invoke(
+            model.bind(max_tokens=PARSE_REPAIR_OUTPUT_TOKENS),
+            _repair_prompt(criterion, answer),
+            PARSE_REPAIR_OUTPUT_TOKENS,
+            limiter,
+        )
+        updates = _parse_criterion_response(criterion.name, result)
+    return _finish_repairs(criterion.name, updates, attempts)
+
+
+async def _ascore_criterion(
+    criterion: Criterion, prompt_text: str, model, limiter: RateLimiter | None = None
+) -> dict:
+    """Async counterpart of _score_criterion."""
+    result = await _ainvoke(
+        model.bind(max_tokens=criterion.output_tokens),
+        prompt_text,
+        criterion.output_tokens,
+        limiter,
+    )
+    updates = _parse_criterion_response(criterion.name, result)
+    answer, attempts = _response_text(result), 0
+    while _parse_failed(criterion.name, updates) and attempts < PARSE_REPAIR_ATTEMPTS:
+        attempts += 1
+        result = await _ainvoke(
+            model.bind(max_tokens=PARSE_REPAIR_OUTPUT_TOKENS),
+            _repair_prompt(criterion, answer),
+            PARSE_REPAIR_OUTPUT_TOKENS,
+            limiter,
+        )
+        updates = _parse_criterion_response(criterion.name, result)
+    return _finish_repairs(criterion.name, updates, attempts)
+
+
+def _criterion_input(criterion: Criterion, state: State) -> str:
     """
-    Evaluates the clarity and soundness of the results and discussion in the paper.
+    The paper text sent for one criterion, built with its excerpt strategy:
+    "sections" sends an excerpt of Criterion.sections when sections were
+    detected, "head" the start of the paper up to Criterion.input_tokens and
+    "full" the paper cut to the request budget. Without detected sections the
+    paper was already cut to that budget by _prepare_initial_state.
     """
-    prompt = ChatPromptTemplate.from_template(
-        "Evaluate the quality of the results and discussion in the following research paper. "
-        "Are the results presented clearly? Does the discussion correctly interpret the results, and are the conclusions well-founded? "
-        "Provide a results and discussion quality score between 0 and 1. "
-        "Your response MUST start with 'Score: ' followed by the numerical score, "
-        "then a newline, and then 'Explanation: ' followed by your detailed explanation.\n\nResearch Paper: {research_paper}"
+    research_paper = state["research_paper"]
+    if not state.get("paper_sections") and criterion.excerpt in ("full", "sections"):
+        return research_paper
+    request_tokens = _paper_token_budget(
+        [criterion.prompt], state["article_theme"], criterion.output_tokens
     )
-    result = llm.invoke(prompt.format(research_paper=state["research_paper"]))
-    try:
-        content = result.content if isinstance(result.content, str) else str(result.content)
-        score, explanation = extract_score_and_explanation(content)
-        state["results_discussion_quality_score"] = score
-        state["results_discussion_quality_explanation"] = explanation
-    except ValueError as e:
-        print(f"Error in check_results_discussion_quality: {e}")
-        state["results_discussion_quality_score"] = 0.0
-        state["results_discussion_quality_explanation"] = f"Error: {e}"
-    return state
-    return state
-# %%
-def check_potential_impact(state: State) -> State:
+    if criterion.excerpt == "full":
+        # Section routing keeps the whole text in the state for the excerpts
+        return fit_to_tokens(research_paper, request_tokens)
+    max_tokens = min(criterion.input_tokens, request_tokens)
+    if criterion.excerpt == "head":
+        return fit_to_tokens(research_paper, max_tokens)
+    sections = [Section(**section) for section in state["paper_sections"]]
+    # Size the excerpt with this document's own chars-per-token ratio, then trim exactly
+    max_chars = int(max_tokens * chars_per_token(research_paper))
+    excerpt = build_excerpt(
+        research_paper, sections, list(criterion.sections), max_chars
+    )
+    return fit_to_tokens(excerpt, max_tokens)
+
+
+def _criterion_cache_key(criterion: Criterion, state: State) -> str | None:
+    """Cache key for a single criterion, or None when per-criterion caching is off."""
+    evaluation_cache = _get("evaluation_cache")
+    if evaluation_cache is None or not evaluation_cache.per_criterion:
+        return None
+    scope = f"criterion:{criterion.name}:{criterion.fingerprint}"
+    return _cache_key(state, f"{scope}:cascade" if state.get("cascade") else scope)
+
+
+def _store_criterion(cache_key: str | None, criterion: str, updates: dict) -> None:
+    # Failed parses are not cached, so the next run retries them
+    # Model call records describe this run only, so they are not cached
+    if cache_key and not updates[f"{criterion}_explanation"].startswith("Error:"):
+        _get("evaluation_cache").set(
+            cache_key,
+            {
+                key: value
+                for key, value in updates.items()
+                if key not in ("model_calls", "parse_repairs")
+            },
+        )
+
+
+def _cascade_tiers() -> list[tuple]:
+    """(tier, model, rate limiter, model name) in the order the cascade tries them."""
+    return [
+        ("small", _get("llm"), _get("rate_limiter"), MODEL_NAME),
+        (
+            "large",
+            _get("cascade_llm"),
+            _get("cascade_rate_limiter"),
+            CASCADE_MODEL_NAME,
+        ),
+    ]
+
+
+def _is_uncertain(criterion: str, updates: dict) -> bool:
+    """True when a criterion answer is unparsed or inside CASCADE_UNCERTAIN_BAND."""
+    low, high = CASCADE_UNCERTAIN_BAND
+    return (
+        _parse_failed(criterion, updates)
+        or low <= updates[f"{criterion}_score"] <= high
+    )
+
+
+def _model_call_record(
+    criterion: str, tier: str, model_name: str, start: float, updates: dict
+) -> dict:
+    return {
+        "criterion": criterion,
+        "tier": tier,
+        "model": model_name,
+        "latency": round(time.perf_counter() - start, 3),
+        "score": updates[f"{criterion}_score"],
+        "parsed": not _parse_failed(criterion, updates),
+    }
+
+
+def _run_cascade(criterion: Criterion, prompt_text: str) -> dict:
     """
-    Estimates the potential impact of the paper in the field of study or in practical applications.
+    Scores one criterion on the small model, escalating to the large one when uncertain.
+    A tier's unparseable answer is repaired on that tier before escalating.
     """
-    prompt = ChatPromptTemplate.from_template(
-        "Estimate the potential impact of the following research paper in its field of study or in practical applications. "
-        "Does it open new lines of research, solve a significant problem, or have important implications? "
-        "Provide a potential impact score between 0 and 1. "
-        "Your response MUST start with 'Score: ' followed by the numerical score, "
-        "then a newline, and then 'Explanation: ' followed by your detailed explanation.\n\nResearch Paper: {research_paper}"
+    records, repairs = [], []
+    for tier, model, limiter, model_name in _cascade_tiers():
+        start = time.perf_counter()
+        updates = _score_criterion(criterion, prompt_text, model, limiter)
+        repairs += updates.pop("parse_repairs", [])
+        records.append(
+            _model_call_record(criterion.name, tier, model_name, start, updates)
+        )
+        if not _is_uncertain(criterion.name, updates):
+            break
+    return {**updates, "model_calls": records, "parse_repairs": repairs}
+
+
+async def _arun_cascade(criterion: Criterion, prompt_text: str) -> dict:
+    """Async counterpart of _run_cascade."""
+    records, repairs = [], []
+    for tier, model, limiter, model_name in _cascade_tiers():
+        start = time.perf_counter()
+        updates = await _ascore_criterion(criterion, prompt_text, model, limiter)
+        repairs += updates.pop("parse_repairs", [])
+        records.append(
+            _model_call_record(criterion.name, tier, model_name, start, updates)
+        )
+        if not _is_uncertain(criterion.name, updates):
+            break
+    return {**updates, "model_calls": records, "parse_repairs": repairs}
+
+
+def _run_criterion(criterion: Criterion, state: State) -> dict:
+    """Evaluates one criterion with a blocking model call (or the cascade)."""
+    cache_key = _criterion_cache_key(criterion, state)
+    if cache_key and (cached := _get("evaluation_cache").get(cache_key)) is not None:
+        return cached
+    prompt_text = criterion.render(
+        state["article_theme"], _criterion_input(criterion, state)
     )
-    result = llm.invoke(prompt.format(research_paper=state["research_paper"]))
-    try:
-        content = result.content if isinstance(result.content, str) else str(result.content)
-        score, explanation = extract_score_and_explanation(content)
-        state["potential_impact_score"] = score
-        state["potential_impact_explanation"] = explanation
-    except ValueError as e:
-        print(f"Error in check_potential_impact: {e}")
-        state["potential_impact_score"] = 0.0
-        state["potential_impact_explanation"] = f"Error: {e}"
-    return state
+    if state.get("cascade"):
+        updates = _run_cascade(criterion, prompt_text)
+    else:
+        updates = _score_criterion(criterion, prompt_text, _get("llm"))
+    _store_criterion(cache_key, criterion.name, updates)
+    return updates
+
+
+async def _arun_criterion(criterion: Criterion, state: State) -> dict:
+    """Evaluates one criterion with an async model call (or the cascade)."""
+    cache_key = _criterion_cache_key(criterion, state)
+    if (
+        cache_key
+        and (cached := await asyncio.to_thread(_get("evaluation_cache").get, cache_key))
+        is not None
+    ):
+        return cached
+    prompt_text = criterion.render(
+        state["article_theme"], _criterion_input(criterion, state)
+    )
+    if state.get("cascade"):
+        updates = await _arun_cascade(criterion, prompt_text)
+    else:
+        updates = await _ascore_criterion(criterion, prompt_text, _get("llm"))
+    await asyncio.to_thread(_store_criterion, cache_key, criterion.name, updates)
+    return updates
+
+
+def _criterion_node_functions(criterion: Criterion) -> tuple:
+    """Sync and async node functions (check_<name>, acheck_<name>) of a criterion."""
+
+    def check(state: State) -> dict:
+        return _run_criterion(criterion, state)
+
+    async def acheck(state: State) -> dict:
+        return await _arun_criterion(criterion, state)
+
+    check.__name__ = check.__qualname__ = f"check_{criterion.name}"
+    acheck.__name__ = acheck.__qualname__ = f"acheck_{criterion.name}"
+    check.__doc__ = acheck.__doc__ = f"Evaluates the {criterion.summary} of the paper."
+    return check, acheck
+
+
 # %%
-def check_writing_clarity(state: State) -> State:
+@_lazy("CriterionAssessment", "PaperAssessment")
+def _build_assessment_models() -> dict:
+    """Structured-output schemas of the single-call mode (pydantic is imported here)."""
+    from pydantic import BaseModel, Field, create_model, field_validator
+
+    criteria = _get("CRITERIA")
+
+    class CriterionAssessment(BaseModel):
+        """Score and explanation for a single evaluation criterion."""
+
+        score: float = Field(
+            ge=0.0, le=1.0, description="Score between 0 and 1, where 1 is best"
+        )
+        explanation: str = Field(description="Detailed explanation of the score")
+
+        @field_validator("score", mode="before")
+        @classmethod
+        def _scale_score(cls, value):
+            # Models sometimes score out of 10 despite the schema
+            return (
+                normalize_score(value)
+                if isinstance(value, (int, float)) and value > 1
+                else value
+            )
+
+    # All criteria returned by a single model call. Field names match the State key
+    # prefixes (e.g. 'relevance' -> 'relevance_score').
+    paper_assessment = create_model(
+        "PaperAssessment",
+        __doc__=f"All {len(criteria)} criteria returned by a single model call.",
+        **{
+            name: (CriterionAssessment, Field(description=c.description))
+            for name, c in criteria.items()
+        },
+    )
+    return {
+        "CriterionAssessment": CriterionAssessment,
+        "PaperAssessment": paper_assessment,
+    }
+
+
+# %%
+_NUMBER_WORDS = [
+    "zero",
+    "one",
+    "two",
+    "three",
+    "four",
+    "five",
+    "six",
+    "seven",
+    "eight",
+    "nine",
+    "ten",
+]
+
+
+def _criteria_list(criteria) -> str:
+    """'a, b and c' from the criteria summaries."""
+    summaries = [c.summary for c in criteria]
+    return (
+        summaries[0]
+        if len(summaries) == 1
+        else f"{', '.join(summaries[:-1])} and {summaries[-1]}"
+    )
+
+
+@_lazy("ALL_CRITERIA_TEMPLATE", "ALL_CRITERIA_OUTPUT_TOKENS")
+def _build_all_criteria_template() -> dict:
+    """The single-call prompt, listing every criterion of the registry."""
+    criteria = _get("CRITERIA")
+    count = len(criteria)
+    return {
+        "ALL_CRITERIA_TEMPLATE": (
+            "Evaluate the following research paper against the provided TCC theme on "
+            f"{_NUMBER_WORDS[count] if count < len(_NUMBER_WORDS) else count} "
+            f"{'criterion' if count == 1 else 'criteria'}: "
+            f"{_criteria_list(criteria.values())}. For each criterion provide a score "
+            "between 0 and 1, where 1 is best, and a detailed explanation of the "
+            "score.\n\n"
+            "Article Theme: {article_theme}\n\nResearch Paper: {research_paper}"
+        ),
+        # Answer tokens reserved for a single-call request: every criterion's cap
+        "ALL_CRITERIA_OUTPUT_TOKENS": sum(c.output_tokens for c in criteria.values()),
+    }
+
+
+def _parse_all_criteria_response(result: dict) -> dict:
+    """
+    Maps a structured PaperAssessment response onto the State keys of every criterion.
+    A response that fails validation marks all criteria as 0.0 with the parsing error.
     """
-    Evaluates the overall clarity and readability of the technical paper's writing.
+    assessment = result["parsed"]
+    updates = {}
+    for criterion in _get("CRITERIA"):
+        if assessment is None:
+            updates[f"{criterion}_score"] = 0.0
+            updates[f"{criterion}_explanation"] = f"Error: {result['parsing_error']}"
+        else:
+            item = getattr(assessment, criterion)
+            updates[f"{criterion}_score"] = item.score
+            updates[f"{criterion}_explanation"] = item.explanation
+    if assessment is None:
+        telemetry.record_parse_failure(str(result["parsing_error"]))
+    return updates
+
+
+def evaluate_all_criteria(state: State) -> dict:
     """
-    prompt = ChatPromptTemplate.from_template(
-        "Evaluate the overall clarity, readability, and flow of the writing in the following technical research paper. "
-        "Is the language precise and concise? Are the ideas communicated effectively? "
-        "Provide a writing clarity score between 0 and 1. "
-        "Your response MUST start with 'Score: ' followed by the numerical score, "
-        "then a newline, and then 'Explanation: ' followed by your detailed explanation.\n\nResearch Paper: {research_paper}"
+    Evaluates every criterion with a single structured-output call.
+    Sends the paper once instead of once per criterion and fills the same
+    State keys as the check_* nodes.
+    """
+    structured_llm = _get("llm").with_structured_output(
+        _get("PaperAssessment"), include_raw=True
     )
-    result = llm.invoke(prompt.format(research_paper=state["research_paper"]))
-    try:
-        content = result.content if isinstance(result.content, str) else str(result.content)
-        score, explanation = extract_score_and_explanation(content)
-        state["writing_clarity_score"] = score
-        state["writing_clarity_explanation"] = explanation
-    except ValueError as e:
-        print(f"Error in check_writing_clarity: {e}")
-        state["writing_clarity_score"] = 0.0
-        state["writing_clarity_explanation"] = f"Error: {e}"
-    return state
+    result = _invoke(
+        structured_llm,
+        _get("ALL_CRITERIA_PROMPT").format(
+            article_theme=state["article_theme"], research_paper=state["research_paper"]
+        ),
+        _get("ALL_CRITERIA_OUTPUT_TOKENS"),
+    )
+    return _parse_all_criteria_response(result)
+
+
+async def aevaluate_all_criteria(state: State) -> dict:
+    """Async counterpart of evaluate_all_criteria."""
+    structured_llm = _get("llm").with_structured_output(
+        _get("PaperAssessment"), include_raw=True
+    )
+    result = await _ainvoke(
+        structured_llm,
+        _get("ALL_CRITERIA_PROMPT").format(
+            article_theme=state["article_theme"], research_paper=state["research_paper"]
+        ),
+        _get("ALL_CRITERIA_OUTPUT_TOKENS"),
+    )
+    return _parse_all_criteria_response(result)
+
+
 # %%
-def check_references_timeliness(state: State) -> State:
+CHUNK_SUMMARY_TEMPLATE = (
+    "You are reading part {index} of {total} of a research paper that will be "
+    "evaluated against the TCC theme below. Summarize this part concisely, preserving "
+    "what an evaluator needs: the research problem and its connection to the theme, "
+    "claimed contributions and novelty, methodology details, key results and how they "
+    "are interpreted, stated impact or limitations, notable writing issues, and any "
+    "cited references with their publication years.\n\n"
+    "Article Theme: {article_theme}\n\n"
+    "Paper part {index}/{total}: {chunk}"
+)
+
+
+@_lazy("ALL_CRITERIA_PROMPT", "CHUNK_SUMMARY_PROMPT")
+def _build_prompts() -> dict:
+    from langchain_core.prompts import ChatPromptTemplate
+
+    return {
+        "ALL_CRITERIA_PROMPT": ChatPromptTemplate.from_template(
+            _get("ALL_CRITERIA_TEMPLATE")
+        ),
+        "CHUNK_SUMMARY_PROMPT": ChatPromptTemplate.from_template(
+            CHUNK_SUMMARY_TEMPLATE
+        ),
+    }
+
+
+def _prompt_tokens(prompts, article_theme: str) -> int:
+    """Tokens of the longest given prompt with an empty paper (instructions + theme)."""
+    return max(
+        count_tokens(
+            prompt.format(
+                article_theme=article_theme,
+                research_paper="",
+                chunk="",
+                index=0,
+                total=0,
+            )
+        )
+        for prompt in prompts
+    )
+
+
+def _paper_token_budget(
+    prompts, article_theme: str, output_tokens: int, extra_prompt_tokens: int = 0
+) -> int:
+    """Tokens left for the paper in a request built from any of the given prompts."""
+    return input_token_budget(
+        MODEL_NAME,
+        _prompt_tokens(prompts, article_theme) + extra_prompt_tokens,
+        output_tokens,
+        MAX_REQUEST_TOKENS,
+    )
+
+
+def _mode_token_budget(mode: str, article_theme: str) -> int:
+    """Paper tokens that fit one request of the given evaluation mode."""
+    if mode == "single_call":
+        # The answer holds every criterion, and the JSON schema travels with the prompt
+        schema_tokens = count_tokens(
+            json.dumps(_get("PaperAssessment").model_json_schema())
+        )
+        return _paper_token_budget(
+            [_get("ALL_CRITERIA_PROMPT")],
+            article_theme,
+            _get("ALL_CRITERIA_OUTPUT_TOKENS"),
+            schema_tokens,
+        )
+    # Every criterion request must fit, each with its own prompt and answer cap
+    return min(
+        _paper_token_budget([criterion.prompt], article_theme, criterion.output_tokens)
+        for criterion in _get("CRITERIA").values()
+    )
+
+
+def _split_into_token_chunks(research_paper: str, max_tokens: int) -> list[str]:
+    """Splits the paper into consecutive chunks of at most max_tokens tokens."""
+    max_chars = max(int(max_tokens * chars_per_token(research_paper)), 1)
+    chunks = []
+    for chunk in split_into_chunks(research_paper, max_chars):
+        # Denser passages (tables, formulas) than the document average get split again
+        while count_tokens(chunk) > max_tokens:
+            head = fit_to_tokens(chunk, max_tokens)
+            chunks.append(head)
+            chunk = chunk[len(head) :].strip()
+        if chunk:
+            chunks.append(chunk)
+    return chunks
+
+
+def _plan_chunks(research_paper: str, article_theme: str) -> tuple[list[str], int]:
     """
-    Checks the timeliness and relevance of the references used in the paper.
+    Splits the paper into chunks and keeps as many as MAP_REDUCE_TOKEN_BUDGET allows.
+    Each chunk costs one summarisation call plus its summary in every criterion
+    prompt, and all summaries together must fit in one criterion request. When
+    chunks must be dropped the first and last are always kept and the rest are
+    evenly spaced. Returns the selected chunks and the total chunk count.
     """
-    prompt = ChatPromptTemplate.from_template(
-        "Evaluate the timeliness and relevance of the references cited in the following research paper. "
-        "Does the paper use recent and pertinent sources for the field of study? "
-        "Provide a references timeliness score between 0 and 1. "
-        "Your response MUST start with 'Score: ' followed by the numerical score, "
-        "then a newline, and then 'Explanation: ' followed by your detailed explanation.\n\nResearch Paper: {research_paper}"
+    chunk_tokens = min(
+        MAP_REDUCE_CHUNK_TOKENS,
+        _paper_token_budget(
+            [_get("CHUNK_SUMMARY_PROMPT")], article_theme, MAP_REDUCE_SUMMARY_TOKENS
+        ),
     )
-    result = llm.invoke(prompt.format(research_paper=state["research_paper"]))
-    try:
-        content = result.content if isinstance(result.content, str) else str(result.content)
-        score, explanation = extract_score_and_explanation(content)
-        state["references_timeliness_score"] = score
-        state["references_timeliness_explanation"] = explanation
-    except ValueError as e:
-        print(f"Error in check_references_timeliness: {e}")
-        state["references_timeliness_score"] = 0.0
-        state["references_timeliness_explanation"] = f"Error: {e}"
-    return state
+    chunks = _split_into_token_chunks(research_paper, chunk_tokens)
+    if not chunks:
+        return [], 0
+
+    criteria_count = len(_get("CRITERIA"))
+    summary_prompt_tokens = _prompt_tokens(
+        [_get("CHUNK_SUMMARY_PROMPT")], article_theme
+    )
+    average_chunk_tokens = sum(count_tokens(chunk) for chunk in chunks) / len(chunks)
+    per_chunk_tokens = (
+        average_chunk_tokens
+        + summary_prompt_tokens
+        + MAP_REDUCE_SUMMARY_TOKENS
+        + criteria_count * MAP_REDUCE_SUMMARY_TOKENS
+    )
+    fixed_tokens = sum(
+        _prompt_tokens([criterion.prompt], article_theme) + criterion.output_tokens
+        for criterion in _get("CRITERIA").values()
+    )
+    max_chunks = min(
+        int((MAP_REDUCE_TOKEN_BUDGET - fixed_tokens) // per_chunk_tokens),
+        _mode_token_budget("per_criterion", article_theme) // MAP_REDUCE_SUMMARY_TOKENS,
+    )
+    max_chunks = max(1, max_chunks)
+    if len(chunks) <= max_chunks:
+        return chunks, len(chunks)
+    if max_chunks == 1:
+        return chunks[:1], len(chunks)
+    step = (len(chunks) - 1) / (max_chunks - 1)
+    picks = sorted({round(i * step) for i in range(max_chunks)})
+    return [chunks[i] for i in picks], len(chunks)
+
+
+def _dispatch_chunks(state: State) -> list:
+    """Fans out one summarize_chunk task per planned chunk."""
+    from langgraph.types import Send
+
+    total = len(state["paper_chunks"])
+    if not total:
+        return ["combine_chunk_summaries"]
+    return [
+        Send(
+            "summarize_chunk",
+            {
+                "index": index,
+                "total": total,
+                "chunk": chunk,
+                "article_theme": state["article_theme"],
+            },
+        )
+        for index, chunk in enumerate(state["paper_chunks"])
+    ]
+
+
+def _chunk_summary_prompt(chunk_task: dict) -> str:
+    return _get("CHUNK_SUMMARY_PROMPT").format(
+        index=chunk_task["index"] + 1,
+        total=chunk_task["total"],
+        chunk=chunk_task["chunk"],
+        article_theme=chunk_task["article_theme"],
+    )
+
+
+def summarize_chunk(chunk_task: dict) -> dict:
+    """
+    Map step: summarises one chunk of the paper with a capped output length.
+    """
+    result = _invoke(
+        _get("llm").bind(max_tokens=MAP_REDUCE_SUMMARY_TOKENS),
+        _chunk_summary_prompt(chunk_task),
+        MAP_REDUCE_SUMMARY_TOKENS,
+    )
+    content = result.content if isinstance(result.content, str) else str(result.content)
+    return {
+        "chunk_summaries": [{"index": chunk_task["index"], "summary": content.strip()}]
+    }
+
+
+async def asummarize_chunk(chunk_task: dict) -> dict:
+    """Async counterpart of summarize_chunk."""
+    result = await _ainvoke(
+        _get("llm").bind(max_tokens=MAP_REDUCE_SUMMARY_TOKENS),
+        _chunk_summary_prompt(chunk_task),
+        MAP_REDUCE_SUMMARY_TOKENS,
+    )
+    content = result.content if isinstance(result.content, str) else str(result.content)
+    return {
+        "chunk_summaries": [{"index": chunk_task["index"], "summary": content.strip()}]
+    }
+
+
+def combine_chunk_summaries(state: State) -> dict:
+    """
+    Reduce step: joins the chunk summaries in document order into the text the
+    criteria are evaluated on.
+    """
+    summaries = sorted(state["chunk_summaries"], key=lambda item: item["index"])
+    digest = "\n\n".join(
+        f"[Part {item['index'] + 1}/{len(summaries)}]\n{item['summary']}"
+        for item in summaries
+    )
+    return {"research_paper": digest, "paper_sections": []}
+
+
 # %%
-def calculate_final_score(state: State) -> State:
+def calculate_final_score(state: State) -> dict:
     """
     Calculates the final score based on all individual scores.
-    Weights can be adjusted according to the importance of each criterion.
-    """
-    total_scores = (
-        state["relevance_score"] * 0.20 +
-        state["originality_score"] * 0.15 +
-        state["methodology_quality_score"] * 0.15 +
-        state["results_discussion_quality_score"] * 0.15 +
-        state["potential_impact_score"] * 0.15 +
-        state["writing_clarity_score"] * 0.10 +
-        state["references_timeliness_score"] * 0.10
-    )
-    state["final_score"] = total_scores
-    return state
-# %%
-# Definition of the workflow/execution of the evaluation process
-workflow = StateGraph(State)
-# %%
-# Adding nodes to the workflow
-workflow.add_node("check_relevance", check_relevance)
-workflow.add_node("check_originality", check_originality)
-workflow.add_node("check_methodology_quality", check_methodology_quality)
-workflow.add_node("check_results_discussion_quality", check_results_discussion_quality)
-workflow.add_node("check_potential_impact", check_potential_impact)
-workflow.add_node("check_writing_clarity", check_writing_clarity)
-workflow.add_node("check_references_timeliness", check_references_timeliness)
-workflow.add_node("calculate_final_score", calculate_final_score)
-# %%
-# Define edges for the sequential flow
-workflow.add_edge(START, "check_relevance")
-workflow.add_edge("check_relevance", "check_originality")
-workflow.add_edge("check_originality", "check_methodology_quality")
-workflow.add_edge("check_methodology_quality", "check_results_discussion_quality")
-workflow.add_edge("check_results_discussion_quality", "check_potential_impact")
-workflow.add_edge("check_potential_impact", "check_writing_clarity")
-workflow.add_edge("check_writing_clarity", "check_references_timeliness")
-workflow.add_edge("check_references_timeliness", "calculate_final_score")
-# %%
-# Define the exit point of the workflow
-workflow.add_edge("calculate_final_score", END)
-# %%
-# Compile the graph
-app = workflow.compile()
-# %%
-def evaluate_research_paper(research_paper: str, article_theme: str) -> dict:
+    Weights come from the criterion registry (normalized to sum to 1).
+    Runs once every check_* node has finished (fan-in of the parallel branches).
     """
-    Evaluates a research paper for an article theme using the compiled workflow,
-    considering multiple criteria. Handles potential input truncation due to API limits.
+    total_scores = sum(
+        state[f"{name}_score"] * weight
+        for name, weight in _get("CRITERION_WEIGHTS").items()
+    )
+    return {"final_score": total_scores}
+
+
+# %%
+## Relevance gate
+# For screening, a paper that is off-theme is not worth six more calls. In the
+# gated graphs check_relevance runs first and the other criteria only run when
+# its score reaches the caller's relevance_threshold; otherwise they are marked
+# "not evaluated" with a score of 0 and the evaluation goes straight to the final score.
+# The gate needs a relevance criterion; without one the gated graphs are not built.
+@_lazy("GATED_CRITERIA")
+def _build_gated_criteria() -> dict:
+    return {
+        "GATED_CRITERIA": [
+            criterion for criterion in _get("CRITERIA") if criterion != "relevance"
+        ]
+    }
+
+
+def relevance_gate(state: State) -> list[str]:
+    """The other criteria's nodes, or skip_remaining_criteria for an off-theme paper."""
+    # A failed relevance call says nothing about the paper, so it never closes the gate
+    failed = state["relevance_explanation"].startswith("Error:")
+    if not failed and state["relevance_score"] < state["relevance_threshold"]:
+        return ["skip_remaining_criteria"]
+    return [f"check_{criterion}" for criterion in _get("GATED_CRITERIA")]
+
+
+def skip_remaining_criteria(state: State) -> dict:
+    """Marks the gated criteria as not evaluated and records the tokens saved."""
+    explanation = (
+        f"Not evaluated: relevance {state['relevance_score']:.2f} is below the "
+        f"threshold of {state['relevance_threshold']:.2f}."
+    )
+    updates = {"skipped_criteria": list(_get("GATED_CRITERIA")), "saved_tokens": 0}
+    criteria = _get("CRITERIA")
+    for criterion in _get("GATED_CRITERIA"):
+        updates[f"{criterion}_score"] = 0.0
+        updates[f"{criterion}_explanation"] = explanation
+        prompt = criteria[criterion].render(
+            state["article_theme"], _criterion_input(criteria[criterion], state)
+        )
+        updates["saved_tokens"] += (
+            count_tokens(prompt) + criteria[criterion].output_tokens
+        )
+    return updates
+
+
+# %%
+## Evaluation graphs
+# The criteria are independent: no check_* node reads another node's output,
+# so they all run in the same step and each one writes only its own keys.
+# Every node carries a sync and an async implementation, so the same compiled
+# graph serves app.invoke (threads) and app.ainvoke (event loop).
+# Every node runs inside a telemetry span named after it (wall time, model
+# calls, tokens, retries and parse failures are attributed to the node).
+# LangGraph is imported and the graphs are compiled on first use (see _lazy).
+def _node(node_name: str, func, afunc=None):
+    """Graph node for func (and its async counterpart), recorded as a telemetry span."""
+    if afunc is None:
+        return telemetry.traced(node_name, func)
+    from langchain_core.runnables import RunnableLambda
+
+    return RunnableLambda(
+        telemetry.traced(node_name, func), afunc=telemetry.traced(node_name, afunc)
+    )
+
+
+def _add_map_steps(graph) -> None:
+    """Adds the map steps: START -> summarize_chunk* -> combine_chunk_summaries."""
+    from langgraph.graph import START
+
+    graph.add_node(
+        "summarize_chunk", _node("summarize_chunk", summarize_chunk, asummarize_chunk)
+    )
+    graph.add_node(
+        "combine_chunk_summaries",
+        _node("combine_chunk_summaries", combine_chunk_summaries),
+    )
+    graph.add_conditional_edges(
+        START, _dispatch_chunks, ["summarize_chunk", "combine_chunk_summaries"]
+    )
+    graph.add_edge("summarize_chunk", "combine_chunk_summaries")
+
+
+def _add_all_criteria(graph, criteria_nodes: dict, entry: str) -> None:
+    """Fans out from entry to every criterion, then fans in on the final score."""
+    from langgraph.graph import END
+
+    for node_name, node in criteria_nodes.items():
+        graph.add_node(node_name, node)
+        graph.add_edge(entry, node_name)
+    graph.add_node(
+        "calculate_final_score", _node("calculate_final_score", calculate_final_score)
+    )
+    graph.add_edge(list(criteria_nodes), "calculate_final_score")
+    graph.add_edge("calculate_final_score", END)
+
+
+def _add_gated_criteria(graph, criteria_nodes: dict, entry: str) -> None:
+    """Adds check_relevance after entry, the gate, other criteria and final score."""
+    from langgraph.graph import END
+
+    for node_name, node in criteria_nodes.items():
+        graph.add_node(node_name, node)
+    graph.add_node(
+        "skip_remaining_criteria",
+        _node("skip_remaining_criteria", skip_remaining_criteria),
+    )
+    graph.add_node(
+        "calculate_final_score", _node("calculate_final_score", calculate_final_score)
+    )
+    graph.add_edge(entry, "check_relevance")
+    gated_nodes = [f"check_{criterion}" for criterion in _get("GATED_CRITERIA")]
+    graph.add_conditional_edges(
+        "check_relevance", relevance_gate, [*gated_nodes, "skip_remaining_criteria"]
+    )
+    graph.add_edge(gated_nodes, "calculate_final_score")
+    graph.add_edge("skip_remaining_criteria", "calculate_final_score")
+    graph.add_edge("calculate_final_score", END)
+
+
+@_lazy(
+    "CRITERIA_NODES",
+    "app",
+    "single_call_app",
+    "map_reduce_app",
+    "gated_app",
+    "gated_map_reduce_app",
+)
+def _build_graphs() -> dict:
+    """Compiles the evaluation graph of every mode."""
+    from langgraph.graph import END, START, StateGraph
+
+    criteria_nodes = {
+        f"check_{name}": _node(f"check_{name}", *_criterion_node_functions(criterion))
+        for name, criterion in _get("CRITERIA").items()
+    }
+
+    # Per-criterion graph: every criterion in parallel
+    workflow = StateGraph(_get("State"))
+    _add_all_criteria(workflow, criteria_nodes, START)
+
+    # Single-call variant: one structured request returns every criterion
+    single_call_workflow = StateGraph(_get("State"))
+    single_call_workflow.add_node(
+        "evaluate_all_criteria",
+        _node("evaluate_all_criteria", evaluate_all_criteria, aevaluate_all_criteria),
+    )
+    single_call_workflow.add_node(
+        "calculate_final_score", _node("calculate_final_score", calculate_final_score)
+    )
+    single_call_workflow.add_edge(START, "evaluate_all_criteria")
+    single_call_workflow.add_edge("evaluate_all_criteria", "calculate_final_score")
+    single_call_workflow.add_edge("calculate_final_score", END)
+
+    # Map-reduce variant for long papers: summarise chunks in parallel, combine the
+    # summaries, then run the usual criteria fan-out on the combined text
+    map_reduce_workflow = StateGraph(_get("State"))
+    _add_map_steps(map_reduce_workflow)
+    _add_all_criteria(map_reduce_workflow, criteria_nodes, "combine_chunk_summaries")
+
+    graphs = {
+        "CRITERIA_NODES": criteria_nodes,
+        "app": workflow.compile(),
+        "single_call_app": single_call_workflow.compile(),
+        "map_reduce_app": map_reduce_workflow.compile(),
+        "gated_app": None,
+        "gated_map_reduce_app": None,
+    }
+    # Gated per-criterion and map-reduce graphs (only with a relevance criterion)
+    if "relevance" in _get("CRITERIA"):
+        gated_workflow = StateGraph(_get("State"))
+        _add_gated_criteria(gated_workflow, criteria_nodes, START)
+        graphs["gated_app"] = gated_workflow.compile()
+
+        gated_map_reduce_workflow = StateGraph(_get("State"))
+        _add_map_steps(gated_map_reduce_workflow)
+        _add_gated_criteria(
+            gated_map_reduce_workflow, criteria_nodes, "combine_chunk_summaries"
+        )
+        graphs["gated_map_reduce_app"] = gated_map_reduce_workflow.compile()
+    return graphs
+
+
+# %%
+def _prepare_initial_state(
+    research_paper: str,
+    article_theme: str,
+    mode: str = "per_criterion",
+    section_routing: bool = False,
+    relevance_threshold: float | None = None,
+    cascade: bool = False,
+) -> State:
+    """
+    Builds the initial graph state, fitting the paper into the token budget of
+    one request for the given mode (cut at a sentence boundary) and recording a
+    truncation warning when needed.
+
+    With section_routing (per-criterion mode), the paper is split into sections
+    first; if any are found the full text is kept and each criterion later gets
+    its own excerpt. In map_reduce mode the full text is kept and split into
+    chunks within MAP_REDUCE_TOKEN_BUDGET instead of being truncated.
     """
     original_research_paper_len = len(research_paper)
+    original_research_paper_tokens = count_tokens(research_paper)
     truncation_warning = ""
+    sections = (
+        split_into_sections(research_paper)
+        if section_routing and mode == "per_criterion"
+        else []
+    )
+    chunks = []
 
-    if original_research_paper_len > MAX_INPUT_CHARS:
-        research_paper = research_paper[:MAX_INPUT_CHARS]
-        truncation_warning = (
-            f"Warning: The research paper was truncated from {original_research_paper_len} "
-            f"to {MAX_INPUT_CHARS} characters due to API input limits. "
-            "The evaluation might be incomplete or less accurate for the full document."
+    if mode == "map_reduce":
+        chunks, total_chunks = _plan_chunks(research_paper, article_theme)
+        if len(chunks) < total_chunks:
+            truncation_warning = (
+                f"Warning: The research paper was split into {total_chunks} chunks, "
+                f"but the token budget ({MAP_REDUCE_TOKEN_BUDGET} tokens) allows "
+                f"{len(chunks)}. Evenly spaced chunks, including the first and the "
+                "last, were summarised for the evaluation."
+            )
+            telemetry.log(
+                "paper_truncated",
+                logging.WARNING,
+                mode=mode,
+                chunks=len(chunks),
+                total_chunks=total_chunks,
+                message=truncation_warning,
+            )
+    elif sections:
+        max_input_tokens = max(
+            criterion.input_tokens for criterion in _get("CRITERIA").values()
         )
-        # Note: In a production Streamlit app, you might use st.warning() here.
-        # For a test script, printing is fine.
-        print(truncation_warning) 
+        if original_research_paper_tokens > max_input_tokens:
+            truncation_warning = (
+                f"Note: The research paper has {original_research_paper_tokens} "
+                "tokens. Each criterion was evaluated on an excerpt of the sections "
+                f"relevant to it (up to {max_input_tokens} tokens)."
+            )
+    else:
+        max_tokens = _mode_token_budget(mode, article_theme)
+        if original_research_paper_tokens > max_tokens:
+            research_paper = fit_to_tokens(research_paper, max_tokens)
+            truncation_warning = (
+                "Warning: The research paper was truncated from "
+                f"{original_research_paper_tokens} to {count_tokens(research_paper)} "
+                f"tokens ({original_research_paper_len} to {len(research_paper)} "
+                f"characters) to fit the limit of {MAX_REQUEST_TOKENS} tokens per "
+                "request. The evaluation might be incomplete or less accurate for the "
+                "full document."
+            )
+            # Callers show truncation_warning to the user; the log is for operators
+            telemetry.log(
+                "paper_truncated",
+                logging.WARNING,
+                mode=mode,
+                tokens=original_research_paper_tokens,
+                kept_tokens=max_tokens,
+                message=truncation_warning,
+            )
 
-    initial_state = State(
+    criteria_state = {}
+    for name in _get("CRITERIA"):
+        criteria_state[f"{name}_score"] = 0.0
+        criteria_state[f"{name}_explanation"] = ""
+    return _get("State")(
         research_paper=research_paper,
         article_theme=article_theme,
-        relevance_score=0.0,
-        relevance_explanation="",
-        originality_score=0.0,
-        originality_explanation="",
-        methodology_quality_score=0.0,
-        methodology_quality_explanation="",
-        results_discussion_quality_score=0.0,
-        results_discussion_quality_explanation="",
-        potential_impact_score=0.0,
-        potential_impact_explanation="",
-        writing_clarity_score=0.0,
-        writing_clarity_explanation="",
-        references_timeliness_score=0.0,
-        references_timeliness_explanation="",
+        **criteria_state,
         final_score=0.0,
-        truncation_warning=truncation_warning
+        truncation_warning=truncation_warning,
+        paper_sections=[section._asdict() for section in sections],
+        paper_chunks=chunks,
+        chunk_summaries=[],
+        relevance_threshold=relevance_threshold,
+        skipped_criteria=[],
+        saved_tokens=0,
+        cascade=cascade,
+        model_calls=[],
+        parse_repairs=[],
+        near_duplicate=None,
+    )
+
+
+# %%
+def _evaluation_mode(
+    single_call: bool,
+    map_reduce: bool,
+    relevance_threshold: float | None = None,
+    cascade: bool = False,
+) -> str:
+    if single_call and map_reduce:
+        raise ValueError("single_call and map_reduce cannot be combined")
+    if relevance_threshold is not None and "relevance" not in _get("CRITERIA"):
+        raise ValueError(
+            "relevance_threshold needs a 'relevance' criterion, which is not configured"
+        )
+    if single_call and relevance_threshold is not None:
+        raise ValueError(
+            "relevance_threshold needs per-criterion calls and cannot be used with "
+            "single_call"
+        )
+    if single_call and cascade:
+        raise ValueError(
+            "cascade needs per-criterion calls and cannot be used with single_call"
+        )
+    if single_call:
+        return "single_call"
+    return "map_reduce" if map_reduce else "per_criterion"
+
+
+def _graph_for_mode(mode: str, gated: bool = False) -> tuple:
+    """Compiled graph and run config for an evaluation mode."""
+    if mode == "single_call":
+        return _get("single_call_app"), {}
+    if mode == "map_reduce":
+        graph = _get("gated_map_reduce_app" if gated else "map_reduce_app")
+        return graph, {"max_concurrency": MAP_REDUCE_CONCURRENCY}
+    # Run all criteria at once; LangGraph's default thread pool is sized from the
+    # CPU count, which would otherwise serialise part of the fan-out.
+    return _get("gated_app" if gated else "app"), {
+        "max_concurrency": len(_get("CRITERIA"))
+    }
+
+
+def _start_evaluation(
+    research_paper: str,
+    article_theme: str,
+    single_call: bool,
+    section_routing: bool,
+    map_reduce: bool,
+    relevance_threshold: float | None,
+    cascade: bool,
+    evaluation_id: str | None = None,
+) -> tuple:
+    """Initial state, result/coalescing keys and (graph, config) of an evaluation."""
+    mode = _evaluation_mode(single_call, map_reduce, relevance_threshold, cascade)
+    initial_state = _prepare_initial_state(
+        research_paper,
+        article_theme,
+        mode,
+        section_routing,
+        relevance_threshold,
+        cascade,
+    )
+    scope = (
+        mode
+        if relevance_threshold is None
+        else f"{mode}:relevance>={relevance_threshold}"
+    )
+    if cascade:
+        scope += f":cascade={CASCADE_MODEL_NAME}:{CASCADE_UNCERTAIN_BAND}"
+    fingerprint = _get("CRITERIA_FINGERPRINT")
+    graph, config = _graph_for_mode(mode, gated=relevance_threshold is not None)
+    if evaluation_id is not None and (checkpointer := _get("checkpointer")) is not None:
+        graph = graph.copy(update={"checkpointer": checkpointer})
+        config = {
+            **config,
+            "configurable": {"thread_id": evaluation_id},
+            # Stored with every checkpoint: one of other input or settings never resumes
+            "metadata": {
+                "evaluation_key": _cache_key(
+                    initial_state, f"checkpoint:{scope}:{fingerprint}"
+                )
+            },
+        }
+    flight_key = _cache_key(initial_state, f"flight:{scope}:{fingerprint}")
+    return (
+        initial_state,
+        _result_cache_key(initial_state, scope),
+        flight_key,
+        (graph, config),
+    )
+
+
+def _run_input(graph, config: dict, initial_state: State) -> State | None:
+    """
+    Graph input of an evaluation: None to resume its unfinished checkpointed run,
+    otherwise the initial state (after dropping any stale checkpoints of the id).
+    """
+    if "configurable" not in config:
+        return initial_state
+    snapshot = graph.get_state(config)
+    if (
+        snapshot.next
+        and snapshot.metadata.get("evaluation_key")
+        == config["metadata"]["evaluation_key"]
+    ):
+        telemetry.log(
+            "evaluation_resumed",
+            evaluation_id=config["configurable"]["thread_id"],
+            step=snapshot.metadata.get("step"),
+            pending=",".join(snapshot.next),
+        )
+        return None
+    if snapshot.created_at is not None:
+        graph.checkpointer.delete_thread(config["configurable"]["thread_id"])
+    return initial_state
+
+
+def _durability(config: dict) -> str | None:
+    # "sync" saves each finished node before the run goes on, so the criteria that
+    # completed are on disk even when a sibling in the same step fails
+    return "sync" if "configurable" in config else None
+
+
+def _resumed_events(graph, config: dict) -> list[dict]:
+    """
+    Criterion events of the criteria scored in the completed steps of a resumed
+    run. Criteria that finished in the interrupted step are left out: the graph
+    stream replays their saved updates itself.
+    """
+    snapshot = graph.get_state(config)
+    values, replayed = snapshot.values, {task.name for task in snapshot.tasks}
+    scored = {"skipped_criteria": values.get("skipped_criteria", [])}
+    for criterion in _get("CRITERIA"):
+        if (
+            values.get(f"{criterion}_explanation")
+            and f"check_{criterion}" not in replayed
+        ):
+            scored.update(
+                {
+                    key: values[key]
+                    for key in (f"{criterion}_score", f"{criterion}_explanation")
+                }
+            )
+    return _criterion_events(scored)
+
+
+def _shared_result(result: dict, root: telemetry.Span) -> dict:
+    """A follower's copy of the result of the identical evaluation it waited for."""
+    root.set_attribute("coalesced", True)
+    telemetry.COALESCED_EVALUATIONS.inc()
+    telemetry.log("evaluation_coalesced", final_score=result["final_score"])
+    return dict(result)
+
+
+def _finish_run(graph, config: dict) -> None:
+    """Deletes the checkpoints of a finished evaluation."""
+    if "configurable" in config:
+        graph.checkpointer.delete_thread(config["configurable"]["thread_id"])
+
+
+@contextmanager
+def _evaluation_span(entry_point: str, single_call: bool, map_reduce: bool):
+    """Root telemetry span of one evaluation, counted in the metrics once it ends."""
+    mode = (
+        "single_call"
+        if single_call
+        else "map_reduce" if map_reduce else "per_criterion"
+    )
+    with telemetry.span(entry_point, mode=mode, cached=False) as root:
+        yield root
+    telemetry.EVALUATIONS.inc(mode=mode, cached=str(root.attributes["cached"]).lower())
+    telemetry.EVALUATION_DURATION.observe(root.duration, mode=mode)
+    telemetry.log(
+        "evaluation_finished",
+        mode=mode,
+        cached=root.attributes["cached"],
+        seconds=round(root.duration, 3),
+        final_score=root.attributes.get("final_score"),
+    )
+
+
+class _ResultKey(NamedTuple):
+    key: str  # Key of the result in the evaluation cache
+    scope: str  # Everything in key but the paper: the near-duplicate index partition
+
+
+def _result_cache_key(state: State, mode: str) -> _ResultKey | None:
+    if _get("evaluation_cache") is None:
+        return None
+    # Whole results depend on every criterion and weight, so the key has the registry
+    scope = f"result:{mode}:{_get('CRITERIA_FINGERPRINT')}"
+    return _ResultKey(
+        _cache_key(state, scope),
+        make_cache_key(
+            PROMPT_VERSION,
+            _cache_model(),
+            MODEL_TEMPERATURE,
+            scope,
+            bool(state.get("paper_sections")),
+            state["article_theme"],
+        ),
+    )
+
+
+def _near_duplicate_result(cache_key: _ResultKey, state: State) -> dict | None:
+    """The cached result of a near-duplicate paper, with the match in near_duplicate."""
+    near_duplicate_index = _get("near_duplicate_index")
+    if near_duplicate_index is None:
+        return None
+    match = near_duplicate_index.query(state["research_paper"], cache_key.scope)
+    if match is None:
+        return None
+    cached = _get("evaluation_cache").get(match.key)
+    if cached is None:
+        # The matched result expired or was evicted from the cache
+        near_duplicate_index.remove(match.key)
+        return None
+    telemetry.NEAR_DUPLICATE_HITS.inc()
+    telemetry.log(
+        "near_duplicate_reused",
+        similarity=round(match.similarity, 3),
+        title=match.title,
+    )
+    return {
+        **cached,
+        "near_duplicate": {
+            "similarity": round(match.similarity, 3),
+            "title": match.title,
+        },
+    }
+
+
+def _cached_result(cache_key: _ResultKey | None, state: State) -> dict | None:
+    """A cached evaluation of the paper (or a near-duplicate) over the initial state."""
+    if not cache_key:
+        return None
+    cached = _get("evaluation_cache").get(cache_key.key)
+    if cached is None:
+        cached = _near_duplicate_result(cache_key, state)
+    return {**state, **cached} if cached is not None else None
+
+
+def _store_result(
+    cache_key: _ResultKey | None, result: dict, research_paper: str
+) -> None:
+    """
+    Caches a finished evaluation unless one of its criteria failed, and indexes
+    research_paper (the initial state's text, which near-duplicate queries use:
+    map-reduce replaces the result's paper with the chunk summaries).
+    """
+    if not cache_key:
+        return
+    if any(
+        result[f"{criterion}_explanation"].startswith("Error:")
+        for criterion in _get("CRITERIA")
+    ):
+        return
+    # Input-derived keys (paper text, warning, sections, chunks) are not cached
+    _get("evaluation_cache").set(
+        cache_key.key,
+        {
+            key: value
+            for key, value in result.items()
+            if key
+            not in (
+                "research_paper",
+                "truncation_warning",
+                "paper_sections",
+                "paper_chunks",
+                "model_calls",
+                "parse_repairs",
+                "near_duplicate",
+            )
+        },
     )
-    result = app.invoke(initial_state)
+    if (near_duplicate_index := _get("near_duplicate_index")) is not None:
+        near_duplicate_index.add(cache_key.key, cache_key.scope, research_paper)
+
+
+# %%
+def evaluate_research_paper(
+    research_paper: str,
+    article_theme: str,
+    single_call: bool = False,
+    section_routing: bool = True,
+    map_reduce: bool = False,
+    relevance_threshold: float | None = None,
+    cascade: bool = False,
+    evaluation_id: str | None = None,
+) -> dict:
+    """
+    Evaluates a research paper for an article theme using the compiled workflow,
+    considering multiple criteria. Handles potential input truncation due to API limits.
+
+    With single_call=True all criteria are scored by one structured-output request
+    instead of one request per criterion; the returned keys are the same.
+    With section_routing (per-criterion mode only) each criterion is sent only the
+    sections of the paper it needs, e.g. the references for references timeliness.
+    With map_reduce=True long papers are not truncated: chunks of the full text are
+    summarised in parallel (up to MAP_REDUCE_CONCURRENCY at a time, within
+    MAP_REDUCE_TOKEN_BUDGET) and the criteria are judged on the combined summaries.
+    With relevance_threshold (not with single_call) relevance is scored first and,
+    if it falls below the threshold, the other criteria are skipped and reported as
+    "not evaluated" (see skipped_criteria and saved_tokens in the result).
+    With cascade=True (not with single_call) each criterion is scored by the small
+    model and re-run on CASCADE_MODEL_NAME only when its score is inside
+    CASCADE_UNCERTAIN_BAND or the answer cannot be parsed; every call is listed in
+    model_calls (see summarize_model_calls).
+    With an evaluation_id the run is checkpointed (see CHECKPOINT_PATH): calling
+    again with the same id after a failure resumes it from the last completed
+    node(s) instead of paying for every model call again.
+    An identical evaluation already running in this process (same paper, theme
+    and settings) is waited for and its result shared instead of run twice.
+    """
+    with _evaluation_span("evaluate_research_paper", single_call, map_reduce) as root:
+        initial_state, cache_key, flight_key, (graph, config) = _start_evaluation(
+            research_paper,
+            article_theme,
+            single_call,
+            section_routing,
+            map_reduce,
+            relevance_threshold,
+            cascade,
+            evaluation_id,
+        )
+        if (cached := _cached_result(cache_key, initial_state)) is not None:
+            root.set_attribute("cached", True)
+            result = cached
+        else:
+            flight, shared = _get("evaluation_flights").lead_or_wait(flight_key)
+            if flight is None:
+                result = _shared_result(shared, root)
+            else:
+                with flight:
+                    result = graph.invoke(
+                        _run_input(graph, config, initial_state),
+                        config,
+                        durability=_durability(config),
+                    )
+                    _finish_run(graph, config)
+                    _store_result(cache_key, result, initial_state["research_paper"])
+                    flight.resolve(result)
+        root.set_attribute("final_score", result["final_score"])
     return result
+
+
+# %%
+async def aevaluate_research_paper(
+    research_paper: str,
+    article_theme: str,
+    single_call: bool = False,
+    section_routing: bool = True,
+    map_reduce: bool = False,
+    relevance_threshold: float | None = None,
+    cascade: bool = False,
+    evaluation_id: str | None = None,
+) -> dict:
+    """
+    Async counterpart of evaluate_research_paper.
+    Runs the same graph with ainvoke and async model calls, so many evaluations
+    can share one event loop and the model client's connection pool. The SQLite
+    cache and checkpoint queries run in worker threads, off the event loop.
+    """
+    with _evaluation_span("aevaluate_research_paper", single_call, map_reduce) as root:
+        initial_state, cache_key, flight_key, (graph, config) = await asyncio.to_thread(
+            _start_evaluation,
+            research_paper,
+            article_theme,
+            single_call,
+            section_routing,
+            map_reduce,
+            relevance_threshold,
+            cascade,
+            evaluation_id,
+        )
+        if (
+            cached := await asyncio.to_thread(_cached_result, cache_key, initial_state)
+        ) is not None:
+            root.set_attribute("cached", True)
+            result = cached
+        else:
+            flight, shared = await _get("evaluation_flights").alead_or_wait(flight_key)
+            if flight is None:
+                result = _shared_result(shared, root)
+            else:
+                with flight:
+                    run_input = await asyncio.to_thread(
+                        _run_input, graph, config, initial_state
+                    )
+                    result = await graph.ainvoke(
+                        run_input, config, durability=_durability(config)
+                    )
+                    await asyncio.to_thread(_finish_run, graph, config)
+                    await asyncio.to_thread(
+                        _store_result,
+                        cache_key,
+                        result,
+                        initial_state["research_paper"],
+                    )
+                    flight.resolve(result)
+        root.set_attribute("final_score", result["final_score"])
+    return result
+
+
+# %%
+## Streaming API
+# Yields each criterion as soon as its node finishes instead of waiting for all of
+# them. Events are dicts:
+#   {"event": "criterion", "criterion": "relevance", "score": 0.8,
+#    "explanation": "...", "evaluated": True}
+#   {"event": "final", "final_score": 0.72, "result": {...}}  (always last)
+# "result" holds the same dict evaluate_research_paper returns.
+def _criterion_events(updates: dict) -> list[dict]:
+    """Criterion events for the criterion keys present in one node's update."""
+    return [
+        {
+            "event": "criterion",
+            "criterion": criterion,
+            "score": updates[f"{criterion}_score"],
+            "explanation": updates[f"{criterion}_explanation"],
+            # False for criteria skipped by the relevance gate
+            "evaluated": criterion not in updates.get("skipped_criteria", []),
+        }
+        for criterion in _get("CRITERIA")
+        if f"{criterion}_score" in updates
+    ]
+
+
+def _final_event(result: dict) -> dict:
+    return {"event": "final", "final_score": result["final_score"], "result": result}
+
+
+# The leader of a streamed evaluation runs the graph apart from its consumer (a
+# thread, or a task for the async stream) and resolves the flight as soon as the
+# result is known: a slow or closed stream never holds up the callers waiting
+# for the same evaluation. The consumer reads the criterion events from a queue,
+# which ends with the run's outcome.
+class _StreamOutcome(NamedTuple):
+    result: dict | None
+    error: BaseException | None
+
+
+def _lead_stream(
+    flight,
+    graph,
+    config: dict,
+    initial_state: State,
+    cache_key: _ResultKey | None,
+    emit,
+) -> _StreamOutcome:
+    """Runs a streamed evaluation the caller leads, passing criterion events to emit."""
+    try:
+        with flight:
+            result = initial_state
+            if (run_input := _run_input(graph, config, initial_state)) is None:
+                for event in _resumed_events(graph, config):
+                    emit(event)
+            for stream_mode, chunk in graph.stream(
+                run_input,
+                config,
+                stream_mode=["updates", "values"],
+                durability=_durability(config),
+            ):
+                if stream_mode == "values":
+                    result = chunk
+                    continue
+                for updates in chunk.values():
+                    if updates:
+                        for event in _criterion_events(updates):
+                            emit(event)
+            _finish_run(graph, config)
+            _store_result(cache_key, result, initial_state["research_paper"])
+            flight.resolve(result)
+    except Exception as error:
+        return _StreamOutcome(None, error)
+    return _StreamOutcome(result, None)
+
+
+async def _alead_stream(
+    flight,
+    graph,
+    config: dict,
+    initial_state: State,
+    cache_key: _ResultKey | None,
+    emit,
+) -> _StreamOutcome:
+    """Async counterpart of _lead_stream."""
+    try:
+        with flight:
+            result = initial_state
+            if (
+                run_input := await asyncio.to_thread(
+                    _run_input, graph, config, initial_state
+                )
+            ) is None:
+                for event in await asyncio.to_thread(_resumed_events, graph, config):
+                    emit(event)
+            async for stream_mode, chunk in graph.astream(
+                run_input,
+                config,
+                stream_mode=["updates", "values"],
+                durability=_durability(config),
+            ):
+                if stream_mode == "values":
+                    result = chunk
+                    continue
+                for updates in chunk.values():
+                    if updates:
+                        for event in _criterion_events(updates):
+                            emit(event)
+            await asyncio.to_thread(_finish_run, graph, config)
+            await asyncio.to_thread(
+                _store_result, cache_key, result, initial_state["research_paper"]
+            )
+            flight.resolve(result)
+    except Exception as error:
+        return _StreamOutcome(None, error)
+    return _StreamOutcome(result, None)
+
+
+def _start_stream_thread(*args) -> queue.Queue:
+    """Runs _lead_stream in a thread (caller's telemetry context); returns a queue."""
+    events = queue.Queue()
+
+    def run():
+        try:
+            outcome = _lead_stream(*args, events.put)
+        except BaseException as error:
+            outcome = _StreamOutcome(None, error)
+        events.put(outcome)
+
+    context = contextvars.copy_context()
+    threading.Thread(
+        target=context.run, args=(run,), name="evaluation-stream", daemon=True
+    ).start()
+    return events
+
+
+# Running stream tasks; the event loop keeps only weak references to its tasks
+_stream_tasks = set()
+
+
+def _start_stream_task(*args) -> asyncio.Queue:
+    """Starts _alead_stream as a task of the running loop; returns its event queue."""
+    events = asyncio.Queue()
+
+    async def run():
+        try:
+            outcome = await _alead_stream(*args, events.put_nowait)
+        except BaseException as error:
+            events.put_nowait(_StreamOutcome(None, error))
+            raise
+        events.put_nowait(outcome)
+
+    task = asyncio.get_running_loop().create_task(run())
+    _stream_tasks.add(task)
+    task.add_done_callback(_stream_tasks.discard)
+    return events
+
+
+def stream_research_paper_evaluation(
+    research_paper: str,
+    article_theme: str,
+    single_call: bool = False,
+    section_routing: bool = True,
+    map_reduce: bool = False,
+    relevance_threshold: float | None = None,
+    cascade: bool = False,
+    evaluation_id: str | None = None,
+):
+    """
+    Generator variant of evaluate_research_paper (same arguments).
+    Yields a "criterion" event per criterion as soon as it is scored, then a
+    "final" event with final_score and the full result. A cached result is
+    replayed as events immediately, and so are the criteria a resumed run
+    (evaluation_id) had already scored. Once started, the evaluation runs to the
+    end even if the caller stops iterating, so its result is still cached and
+    shared with identical evaluations.
+    """
+    with _evaluation_span(
+        "stream_research_paper_evaluation", single_call, map_reduce
+    ) as root:
+        initial_state, cache_key, flight_key, (graph, config) = _start_evaluation(
+            research_paper,
+            article_theme,
+            single_call,
+            section_routing,
+            map_reduce,
+            relevance_threshold,
+            cascade,
+            evaluation_id,
+        )
+        if (cached := _cached_result(cache_key, initial_state)) is not None:
+            root.set_attribute("cached", True)
+            yield from _criterion_events(cached)
+            result = cached
+        else:
+            flight, shared = _get("evaluation_flights").lead_or_wait(flight_key)
+            if flight is None:
+                result = _shared_result(shared, root)
+                yield from _criterion_events(result)
+            else:
+                events = _start_stream_thread(
+                    flight, graph, config, initial_state, cache_key
+                )
+                while not isinstance(event := events.get(), _StreamOutcome):
+                    yield event
+                if event.error is not None:
+                    raise event.error
+                result = event.result
+        root.set_attribute("final_score", result["final_score"])
+    yield _final_event(result)
+
+
+async def astream_research_paper_evaluation(
+    research_paper: str,
+    article_theme: str,
+    single_call: bool = False,
+    section_routing: bool = True,
+    map_reduce: bool = False,
+    relevance_threshold: float | None = None,
+    cascade: bool = False,
+    evaluation_id: str | None = None,
+):
+    """Async-iterator counterpart of stream_research_paper_evaluation."""
+    with _evaluation_span(
+        "astream_research_paper_evaluation", single_call, map_reduce
+    ) as root:
+        initial_state, cache_key, flight_key, (graph, config) = await asyncio.to_thread(
+            _start_evaluation,
+            research_paper,
+            article_theme,
+            single_call,
+            section_routing,
+            map_reduce,
+            relevance_threshold,
+            cascade,
+            evaluation_id,
+        )
+        if (
+            cached := await asyncio.to_thread(_cached_result, cache_key, initial_state)
+        ) is not None:
+            root.set_attribute("cached", True)
+            for event in _criterion_events(cached):
+                yield event
+            result = cached
+        else:
+            flight, shared = await _get("evaluation_flights").alead_or_wait(flight_key)
+            if flight is None:
+                result = _shared_result(shared, root)
+                for event in _criterion_events(result):
+                    yield event
+            else:
+                events = _start_stream_task(
+                    flight, graph, config, initial_state, cache_key
+                )
+                while not isinstance(event := await events.get(), _StreamOutcome):
+                    yield event
+                if event.error is not None:
+                    raise event.error
+                result = event.result
+        root.set_attribute("final_score", result["final_score"])
+    yield _final_event(result)
+
+
+# %%
+def summarize_model_calls(results) -> dict:
+    """
+    Per-tier call counts and latency from the model_calls of one evaluation
+    result or an iterable of them, plus how many criteria were escalated.
+    """
+    if isinstance(results, dict):
+        results = [results]
+    summary = {"escalations": 0, "criteria": 0}
+    for result in results:
+        for call in result.get("model_calls", []):
+            tier = summary.setdefault(
+                call["tier"], {"calls": 0, "total_latency": 0.0, "mean_latency": 0.0}
+            )
+            tier["calls"] += 1
+            tier["total_latency"] = round(tier["total_latency"] + call["latency"], 3)
+            tier["mean_latency"] = round(tier["total_latency"] / tier["calls"], 3)
+            if call["tier"] == "small":
+                summary["criteria"] += 1
+            else:
+                summary["escalations"] += 1
+    summary["escalation_rate"] = (
+        summary["escalations"] / summary["criteria"] if summary["criteria"] else 0.0
+    )
+    return summary
+
+
+def summarize_parse_repairs(results) -> dict:
+    """
+    Repair re-asks in one evaluation result or an iterable of them: how many of
+    the evaluated criteria needed one (repair_rate) and how many of those were
+    rescued (repair_success_rate).
+    """
+    if isinstance(results, dict):
+        results = [results]
+    summary = {"criteria": 0, "repairs": 0, "repaired": 0}
+    for result in results:
+        summary["criteria"] += len(_get("CRITERIA")) - len(
+            result.get("skipped_criteria", [])
+        )
+        for repair in result.get("parse_repairs", []):
+            summary["repairs"] += 1
+            summary["repaired"] += repair["repaired"]
+    summary["repair_rate"] = (
+        summary["repairs"] / summary["criteria"] if summary["criteria"] else 0.0
+    )
+    summary["repair_success_rate"] = (
+        summary["repaired"] / summary["repairs"] if summary["repairs"] else 0.0
+    )
+    return summary
+
+
 # %%
 def format_results_for_display(results: dict) -> dict:
     """
     Formats the raw results dictionary into a more readable format for pprint,
     scaling scores and including explanations.
     """
-    formatted = {
-        "Final Score": f"{results['final_score'] * 10:.2f}",
-        "Relevance to TCC": {
-            "Score": f"{results['relevance_score'] * 10:.2f}",
-            "Explanation": results['relevance_explanation']
-        },
-        "Originality": {
-            "Score": f"{results['originality_score'] * 10:.2f}",
-            "Explanation": results['originality_explanation']
-        },
-        "Methodology Quality": {
-            "Score": f"{results['methodology_quality_score'] * 10:.2f}",
-            "Explanation": results['methodology_quality_explanation']
-        },
-        "Results and Discussion Quality": {
-            "Score": f"{results['results_discussion_quality_score'] * 10:.2f}",
-            "Explanation": results['results_discussion_quality_explanation']
-        },
-        "Potential Impact": {
-            "Score": f"{results['potential_impact_score'] * 10:.2f}",
-            "Explanation": results['potential_impact_explanation']
-        },
-        "Writing Clarity": {
-            "Score": f"{results['writing_clarity_score'] * 10:.2f}",
-            "Explanation": results['writing_clarity_explanation']
-        },
-        "References Timeliness": {
-            "Score": f"{results['references_timeliness_score'] * 10:.2f}",
-            "Explanation": results['references_timeliness_explanation']
+    formatted = {"Final Score": f"{results['final_score'] * 10:.2f}"}
+    for name, criterion in _get("CRITERIA").items():
+        formatted[criterion.label] = {
+            "Score": f"{results[f'{name}_score'] * 10:.2f}",
+            "Explanation": results[f"{name}_explanation"],
         }
-    }
     return formatted
+
+
 # %%
 # Example usage (commented out to avoid undefined variable errors)
 # To test the evaluation function, use the test_integration.py file
-# 
+#
 # Example:
-# result = evaluate_research_paper("Your research paper text here", "Your TCC theme here")
+# result = evaluate_research_paper("Your paper text here", "Your TCC theme here")
 # formatted_result = format_results_for_display(result)
 # pprint.pprint(formatted_result)
 # %%
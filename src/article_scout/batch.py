@@ -0,0 +1,575 @@
+"""
+Batch evaluation of many (paper, theme) jobs with bounded concurrency.
+
+Each job is a (source, theme) pair where source is either the paper text or
+the path to a PDF file. Results are yielded as soon as each job finishes (not
+in input order) and a failing job is reported in its BatchResult instead of
+stopping the batch.
+
+Before a large batch, prefilter_jobs ranks the papers against the theme with
+the local lexical index (utils/lexical_index.py) so that only the best
+matches are sent to the model.
+
+For large PDF batches, evaluate_pipeline extracts the PDFs in a process pool
+(extraction is CPU-bound) while a thread pool evaluates the papers already
+extracted (evaluation waits on the network), with a bounded queue between the
+two stages.
+"""
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Iterator
+
+from .article_scout_agent import aevaluate_research_paper, evaluate_research_paper
+from .utils import telemetry
+from .utils.lexical_index import LexicalIndex
+from .utils.pdf_extractor import (
+    DEFAULT_MAX_TOKENS,
+    extract_text_from_pdf,
+    extract_text_timed,
+    extraction_max_tokens,
+)
+
+DEFAULT_BATCH_CONCURRENCY = 4
+DEFAULT_EXTRACT_WORKERS = os.cpu_count() or 1
+
+# SQLite BM25 index of the extracted texts of screened papers. PDFs are only
+# extracted again when their size or modification time changes, so screening
+# the same folder twice costs one query. An empty string keeps the index in
+# memory for the duration of the call.
+PREFILTER_INDEX_PATH = os.getenv(
+    "PREFILTER_INDEX_PATH",
+    str(Path.home() / ".cache" / "article_scout" / "prefilter.sqlite3"),
+)
+
+
+# Result keys that echo the input paper; left out of saved or served results
+_INPUT_KEYS = ("research_paper", "paper_sections", "paper_chunks", "chunk_summaries")
+
+
+def public_result(result: dict) -> dict:
+    """The evaluation result without the copies of the paper text it carries."""
+    return {key: value for key, value in result.items() if key not in _INPUT_KEYS}
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one batch job; exactly one of result/error is set."""
+
+    index: int  # Position of the job in the input iterable
+    source: str  # PDF path or a short preview of the paper text
+    article_theme: str
+    result: dict | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def calls_saved(self) -> int:
+        """Criterion calls skipped by the relevance gate."""
+        return len(self.result.get("skipped_criteria", [])) if self.result else 0
+
+    @property
+    def tokens_saved(self) -> int:
+        """Estimated tokens of the skipped criterion calls."""
+        return self.result.get("saved_tokens", 0) if self.result else 0
+
+    @property
+    def parse_repairs(self) -> int:
+        """Criteria whose unparseable answer was re-asked."""
+        return len(self.result.get("parse_repairs", [])) if self.result else 0
+
+
+def summarize_batch(results: Iterable[BatchResult]) -> dict:
+    """
+    Totals for a finished batch: job counts, how many papers the relevance
+    gate stopped early and the model calls and tokens that saved, and how many
+    criterion answers needed a parse repair.
+    """
+    summary = {
+        "jobs": 0,
+        "succeeded": 0,
+        "failed": 0,
+        "gated": 0,
+        "calls_saved": 0,
+        "tokens_saved": 0,
+        "parse_repairs": 0,
+    }
+    for batch_result in results:
+        summary["jobs"] += 1
+        summary["succeeded" if batch_result.ok else "failed"] += 1
+        summary["gated"] += batch_result.calls_saved > 0
+        summary["calls_saved"] += batch_result.calls_saved
+        summary["tokens_saved"] += batch_result.tokens_saved
+        summary["parse_repairs"] += batch_result.parse_repairs
+    return summary
+
+
+def _is_pdf_path(source) -> bool:
+    """
+    A source is treated as a PDF when it is a path, or a one-line string, ending
+    in .pdf. The file need not exist: loading a missing one fails the job.
+    """
+    if isinstance(source, str):
+        return "\n" not in source and source.lower().endswith(".pdf")
+    return isinstance(source, os.PathLike) and str(source).lower().endswith(".pdf")
+
+
+def _check_pdf_exists(source) -> None:
+    if not os.path.isfile(source):
+        raise FileNotFoundError(f"No such PDF file: {source}")
+
+
+def _describe_source(source) -> str:
+    if _is_pdf_path(source):
+        return str(source)
+    text = str(source)
+    return text[:60] + "..." if len(text) > 60 else text
+
+
+def _load_paper(source, max_tokens: int | None = DEFAULT_MAX_TOKENS) -> str:
+    """Returns the paper text for a job, extracting it first when given a PDF path."""
+    if not _is_pdf_path(source):
+        return source
+    _check_pdf_exists(source)
+    text = extract_text_from_pdf(str(source), max_tokens)
+    if not text:
+        raise ValueError(f"Could not extract text from {source}")
+    return text
+
+
+@dataclass
+class RankedPaper:
+    """A paper's lexical match with the theme, as ranked by rank_papers."""
+
+    source: str  # The source as given (PDF path or paper text)
+    score: float  # BM25 score against the theme; 0 when no theme term occurs
+    relative_score: float  # score divided by the best score of the ranking (0..1)
+
+
+def _index_source(index: LexicalIndex, source) -> str:
+    """Adds a source to the index unless it is there unchanged; returns its doc id."""
+    if _is_pdf_path(source):
+        doc_id = os.path.abspath(source)
+        stat = os.stat(source)
+        fingerprint = f"{stat.st_size}:{stat.st_mtime_ns}"
+        if index.fingerprint(doc_id) != fingerprint:
+            index.add(doc_id, _load_paper(source), fingerprint)
+        return doc_id
+    fingerprint = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    doc_id = f"text:{fingerprint}"
+    if doc_id not in index:
+        index.add(doc_id, source, fingerprint)
+    return doc_id
+
+
+def rank_papers(
+    sources: Iterable[str], article_theme: str, index: LexicalIndex | None = None
+) -> list[RankedPaper]:
+    """
+    Ranks papers (texts or PDF paths) by their BM25 match with the theme, best
+    first, without calling the model. Papers are added to the index (by default
+    the one at PREFILTER_INDEX_PATH) as needed; a PDF that cannot be extracted
+    or is missing ranks last with score 0, so evaluate_batch still reports its error.
+    """
+    owned = index is None
+    if owned:
+        index = LexicalIndex(PREFILTER_INDEX_PATH or ":memory:")
+    try:
+        doc_ids: dict[str, list] = {}
+        unreadable = []
+        for source in sources:
+            try:
+                doc_ids.setdefault(_index_source(index, source), []).append(source)
+            except (OSError, ValueError):
+                unreadable.append(source)
+        hits = index.search(article_theme, doc_ids=doc_ids)
+    finally:
+        if owned:
+            index.close()
+
+    best = hits[0].score if hits else 0.0
+    ranked = [
+        RankedPaper(source, hit.score, hit.score / best)
+        for hit in hits
+        for source in doc_ids.pop(hit.doc_id)
+    ]
+    unmatched = [source for group in doc_ids.values() for source in group] + unreadable
+    return ranked + [RankedPaper(source, 0.0, 0.0) for source in unmatched]
+
+
+def prefilter_jobs(
+    sources: Iterable[str],
+    article_theme: str,
+    top_k: int | None = None,
+    min_score: float | None = None,
+    index: LexicalIndex | None = None,
+) -> list[tuple[str, str]]:
+    """
+    The (source, theme) jobs worth evaluating, best lexical match first: at most
+    top_k papers, and only those whose relative_score reaches min_score (a
+    fraction of the best match). Papers sharing no word with the theme are
+    always dropped. The result can be passed straight to evaluate_batch.
+    """
+    if top_k is not None and top_k < 1:
+        raise ValueError("top_k must be at least 1")
+    kept = [
+        paper
+        for paper in rank_papers(sources, article_theme, index)
+        if paper.score > 0 and (min_score is None or paper.relative_score >= min_score)
+    ]
+    return [(paper.source, article_theme) for paper in kept[:top_k]]
+
+
+def _run_job(
+    index: int, source, article_theme: str, evaluate_kwargs: dict
+) -> BatchResult:
+    batch_result = BatchResult(
+        index=index, source=_describe_source(source), article_theme=article_theme
+    )
+    try:
+        research_paper = _load_paper(
+            source, extraction_max_tokens(evaluate_kwargs.get("map_reduce", False))
+        )
+        batch_result.result = evaluate_research_paper(
+            research_paper, article_theme, **evaluate_kwargs
+        )
+    except Exception as e:
+        batch_result.error = f"{type(e).__name__}: {e}"
+    return batch_result
+
+
+def evaluate_batch(
+    jobs: Iterable[tuple[str, str]],
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    **evaluate_kwargs,
+) -> Iterator[BatchResult]:
+    """
+    Evaluates (text or PDF path, theme) jobs on a thread pool, keeping at most
+    max_concurrency jobs in flight, and yields each BatchResult as it completes.
+    The jobs iterable is consumed lazily, so very large batches are fine.
+    Extra keyword arguments (single_call, section_routing, ...) are passed on
+    to evaluate_research_paper.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    job_iter = enumerate(jobs)
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        pending = set()
+
+        def submit_next() -> bool:
+            try:
+                index, (source, article_theme) = next(job_iter)
+            except StopIteration:
+                return False
+            pending.add(
+                executor.submit(_run_job, index, source, article_theme, evaluate_kwargs)
+            )
+            return True
+
+        try:
+            while len(pending) < max_concurrency and submit_next():
+                pass
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.discard(future)
+                    yield future.result()
+                    submit_next()
+        finally:
+            # The consumer stopped early: drop jobs that have not started yet
+            for future in pending:
+                future.cancel()
+
+
+async def _arun_job(
+    index: int, source, article_theme: str, evaluate_kwargs: dict
+) -> BatchResult:
+    batch_result = BatchResult(
+        index=index, source=_describe_source(source), article_theme=article_theme
+    )
+    try:
+        # PDF extraction is blocking CPU work; keep it off the event loop
+        research_paper = await asyncio.to_thread(
+            _load_paper,
+            source,
+            extraction_max_tokens(evaluate_kwargs.get("map_reduce", False)),
+        )
+        batch_result.result = await aevaluate_research_paper(
+            research_paper, article_theme, **evaluate_kwargs
+        )
+    except Exception as e:
+        batch_result.error = f"{type(e).__name__}: {e}"
+    return batch_result
+
+
+async def aevaluate_batch(
+    jobs: Iterable[tuple[str, str]],
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    **evaluate_kwargs,
+) -> AsyncIterator[BatchResult]:
+    """
+    Async counterpart of evaluate_batch: runs up to max_concurrency jobs as tasks
+    on the current event loop and yields each BatchResult as it completes.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    job_iter = enumerate(jobs)
+    pending = set()
+
+    def submit_next() -> bool:
+        try:
+            index, (source, article_theme) = next(job_iter)
+        except StopIteration:
+            return False
+        pending.add(
+            asyncio.create_task(
+                _arun_job(index, source, article_theme, evaluate_kwargs)
+            )
+        )
+        return True
+
+    try:
+        while len(pending) < max_concurrency and submit_next():
+            pass
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                pending.discard(task)
+                yield task.result()
+                submit_next()
+    finally:
+        # The consumer stopped early: do not leave orphaned evaluations running
+        for task in pending:
+            task.cancel()
+
+
+@dataclass
+class StageStats:
+    """Live counters of one pipeline stage."""
+
+    workers: int = 0
+    active: int = 0  # Papers being processed right now
+    completed: int = 0
+    busy_seconds: float = 0.0  # Summed processing time of the completed papers
+
+
+@dataclass
+class PipelineStats:
+    """
+    Live view of an evaluate_pipeline run, updated as papers move through it.
+    Pass one in to watch a running pipeline (e.g. for a progress display).
+    """
+
+    extraction: StageStats = field(default_factory=StageStats)
+    evaluation: StageStats = field(default_factory=StageStats)
+    queue_size: int = 0
+    queued: int = 0  # Extracted papers waiting for an evaluation slot
+    peak_queued: int = 0
+    started_at: float = field(default_factory=time.perf_counter)
+    finished_at: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+    def occupancy(self) -> dict[str, float]:
+        """
+        Share of each stage's capacity (workers x elapsed time) spent processing
+        papers. A stage near 1.0 is the bottleneck; an evaluation stage well below
+        1.0 with a busy extraction stage is starved, and vice versa.
+        """
+        elapsed = max(self.elapsed, 1e-9)
+        return {
+            name: (
+                stage.busy_seconds / (stage.workers * elapsed) if stage.workers else 0.0
+            )
+            for name, stage in (
+                ("extraction", self.extraction),
+                ("evaluation", self.evaluation),
+            )
+        }
+
+
+def _run_evaluation(
+    index: int, source, article_theme: str, research_paper: str, evaluate_kwargs: dict
+) -> tuple[BatchResult, float]:
+    batch_result = BatchResult(
+        index=index, source=_describe_source(source), article_theme=article_theme
+    )
+    start = time.perf_counter()
+    try:
+        batch_result.result = evaluate_research_paper(
+            research_paper, article_theme, **evaluate_kwargs
+        )
+    except Exception as e:
+        batch_result.error = f"{type(e).__name__}: {e}"
+    return batch_result, time.perf_counter() - start
+
+
+def evaluate_pipeline(
+    jobs: Iterable[tuple[str, str]],
+    max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    extract_workers: int = DEFAULT_EXTRACT_WORKERS,
+    queue_size: int | None = None,
+    stats: PipelineStats | None = None,
+    **evaluate_kwargs,
+) -> Iterator[BatchResult]:
+    """
+    Like evaluate_batch, but PDFs are extracted by extract_workers processes
+    while up to max_concurrency threads evaluate the papers extracted earlier,
+    so CPU-bound extraction and network-bound evaluation overlap.
+
+    At most queue_size papers (default: extract_workers + max_concurrency) are
+    extracted or being extracted ahead of the evaluation stage; when they are
+    waiting for an evaluation slot, no further job is read, so memory stays
+    flat whatever the batch size. Text jobs skip the extraction stage. The
+    optional stats object is updated live (see PipelineStats.occupancy).
+    """
+    if max_concurrency < 1 or extract_workers < 1:
+        raise ValueError("max_concurrency and extract_workers must be at least 1")
+    queue_size = (
+        queue_size if queue_size is not None else extract_workers + max_concurrency
+    )
+    if queue_size < 1:
+        raise ValueError("queue_size must be at least 1")
+    stats = stats if stats is not None else PipelineStats()
+    stats.started_at = time.perf_counter()
+    stats.extraction.workers, stats.evaluation.workers, stats.queue_size = (
+        extract_workers,
+        max_concurrency,
+        queue_size,
+    )
+
+    job_iter = enumerate(jobs)
+    next_job, exhausted = None, False
+    ready = deque()  # (index, source, theme, text) waiting for an evaluation slot
+    extracting = {}  # extraction future -> (index, source, theme)
+    evaluating = set()
+    max_tokens = extraction_max_tokens(evaluate_kwargs.get("map_reduce", False))
+
+    # spawn: the workers only import the extractor, and forking a process that
+    # runs model-client threads is unsafe
+    extract_pool = ProcessPoolExecutor(
+        extract_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    evaluate_pool = ThreadPoolExecutor(max_workers=max_concurrency)
+    try:
+        while True:
+            # Read jobs while extraction and the queue have room (backpressure)
+            while not exhausted and len(ready) + len(extracting) < queue_size:
+                if next_job is None:
+                    next_job = next(job_iter, None)
+                    if next_job is None:
+                        exhausted = True
+                        break
+                index, (source, article_theme) = next_job
+                if _is_pdf_path(source):
+                    try:
+                        _check_pdf_exists(source)
+                    except FileNotFoundError as e:
+                        next_job = None
+                        yield BatchResult(
+                            index=index,
+                            source=_describe_source(source),
+                            article_theme=article_theme,
+                            error=f"{type(e).__name__}: {e}",
+                        )
+                        continue
+                    if len(extracting) >= extract_workers:
+                        break
+                    future = extract_pool.submit(
+                        extract_text_timed, str(source), max_tokens
+                    )
+                    extracting[future] = (index, source, article_theme)
+                else:
+                    ready.append((index, source, article_theme, source))
+                next_job = None
+
+            while ready and len(evaluating) < max_concurrency:
+                index, source, article_theme, text = ready.popleft()
+                evaluating.add(
+                    evaluate_pool.submit(
+                        _run_evaluation,
+                        index,
+                        source,
+                        article_theme,
+                        text,
+                        evaluate_kwargs,
+                    )
+                )
+
+            stats.extraction.active, stats.evaluation.active = len(extracting), len(
+                evaluating
+            )
+            stats.queued = len(ready)
+            stats.peak_queued = max(stats.peak_queued, stats.queued)
+            if not extracting and not evaluating:
+                if exhausted:
+                    break
+                # Everything read so far is done; read more before waiting
+                continue
+
+            done, _ = wait(set(extracting) | evaluating, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in evaluating:
+                    evaluating.discard(future)
+                    batch_result, seconds = future.result()
+                    stats.evaluation.completed += 1
+                    stats.evaluation.busy_seconds += seconds
+                    yield batch_result
+                    continue
+                index, source, article_theme = extracting.pop(future)
+                try:
+                    text, seconds = future.result()
+                except Exception as e:
+                    text, seconds = "", 0.0
+                    telemetry.log(
+                        "pipeline_extraction_failed",
+                        path=str(source),
+                        error=f"{type(e).__name__}: {e}",
+                    )
+                stats.extraction.completed += 1
+                stats.extraction.busy_seconds += seconds
+                if not text:
+                    # Reported like evaluate_batch; a failure never takes a queue place
+                    yield BatchResult(
+                        index=index,
+                        source=_describe_source(source),
+                        article_theme=article_theme,
+                        error=f"ValueError: Could not extract text from {source}",
+                    )
+                    continue
+                ready.append((index, source, article_theme, text))
+    finally:
+        # The consumer stopped early (or the batch is done): drop unstarted work
+        evaluate_pool.shutdown(wait=True, cancel_futures=True)
+        extract_pool.shutdown(wait=True, cancel_futures=True)
+        stats.finished_at = time.perf_counter()
+        telemetry.log(
+            "pipeline_finished",
+            seconds=round(stats.elapsed, 3),
+            evaluated=stats.evaluation.completed,
+            extracted=stats.extraction.completed,
+            peak_queued=stats.peak_queued,
+            **{
+                f"{stage}_occupancy": round(value, 3)
+                for stage, value in stats.occupancy().items()
+            },
+        )
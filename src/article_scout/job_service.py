@@ -0,0 +1,546 @@
+"""
+HTTP job service: papers submitted over HTTP are evaluated by a worker pool.
+
+The Streamlit app evaluates a paper inside the script run of the user who
+uploaded it. This service lets other systems submit papers and scales
+independently: a submission is queued and answered at once with a job id,
+worker threads extract the text and evaluate it (sharing the process's rate
+limiter, cache and request coalescing), and clients poll the job or follow
+its criteria as server-sent events.
+
+    POST /jobs              Submit a paper; 202 with {"job_id", "status", ...}
+                            - multipart/form-data: file (PDF) or text, theme,
+                              options
+                            - application/pdf body: ?theme=...&<options>
+                            - application/json: {"text" or "pdf_base64", "theme",
+                              <options>}
+                            Options: single_call, map_reduce, cascade (true/false),
+                            relevance_threshold (0..1); single_call and map_reduce
+                            exclude each other. A Content-Length is required (411).
+                            503 when the queue is full.
+    GET  /jobs/<id>         Status, criterion events so far, and the result or error
+    GET  /jobs/<id>/events  text/event-stream of status, criterion and final/error
+                            events (replayed from the start, or after Last-Event-ID)
+    GET  /health            Queue and worker occupancy
+    GET  /metrics           Prometheus metrics of the process
+
+Jobs are kept in memory, so run one service process (with as many workers as
+the model quota allows) and keep finished jobs for JOB_RETENTION of them.
+
+Usage:
+    uv run article-scout serve [--host 0.0.0.0] [--port 8000] [--workers 4]
+"""
+
+import argparse
+import base64
+import itertools
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .article_scout_agent import stream_research_paper_evaluation
+from .batch import public_result
+from .utils import telemetry
+from .utils.pdf_extractor import extract_text_from_pdf, extraction_max_tokens
+
+JOB_SERVICE_PORT = int(os.getenv("JOB_SERVICE_PORT", "8000"))
+JOB_SERVICE_WORKERS = int(os.getenv("JOB_SERVICE_WORKERS", "4"))
+# Submissions waiting for a worker; beyond this POST /jobs answers 503
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+# Finished jobs kept for polling before the oldest are forgotten
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", "1000"))
+JOB_MAX_UPLOAD_BYTES = int(float(os.getenv("JOB_MAX_UPLOAD_MB", "20")) * 2**20)
+# Seconds between keep-alive comments on an idle event stream
+SSE_KEEPALIVE_SECONDS = 15.0
+
+_BOOLEAN_OPTIONS = ("single_call", "map_reduce", "cascade")
+
+
+class JobRejected(Exception):
+    """A submission that cannot be accepted; status is the HTTP status to answer."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Job:
+    """One submitted paper: its input, progress events and outcome."""
+
+    article_theme: str
+    options: dict
+    text: str | None = None  # Exactly one of text/pdf is set until the job starts
+    pdf: bytes | None = None
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"  # queued, running, succeeded or failed
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    events: list = field(
+        default_factory=lambda: [{"event": "status", "status": "queued"}]
+    )
+    result: dict | None = None
+    error: str | None = None
+    changed: threading.Condition = field(
+        default_factory=threading.Condition, repr=False
+    )
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed")
+
+    def publish(self, event: dict) -> None:
+        with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+
+    def set_status(self, status: str, **outcome) -> None:
+        with self.changed:
+            self.status = status
+            for name, value in outcome.items():
+                setattr(self, name, value)
+            self.events.append({"event": "status", "status": status})
+            self.changed.notify_all()
+
+    def events_after(self, index: int, timeout: float) -> tuple[list[dict], bool]:
+        """Events from index on (up to timeout for one) and whether the job is done."""
+        with self.changed:
+            self.changed.wait_for(
+                lambda: len(self.events) > index or self.done, timeout
+            )
+            return self.events[index:], self.done
+
+    def to_dict(self) -> dict:
+        with self.changed:
+            return {
+                "job_id": self.job_id,
+                "status": self.status,
+                "article_theme": self.article_theme,
+                "options": self.options,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "events": [
+                    event for event in self.events if event["event"] == "criterion"
+                ],
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+class JobService:
+    """
+    Bounded queue of evaluation jobs and the worker threads that run them.
+    submit() never blocks: it raises JobRejected(status=503) when the queue is full.
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_SERVICE_WORKERS,
+        queue_size: int = JOB_QUEUE_SIZE,
+        retention: int = JOB_RETENTION,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.workers = workers
+        self.retention = retention
+        self._queue: queue.Queue[Job | None] = queue.Queue(maxsize=queue_size)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+        self._running = 0
+        self._threads = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        article_theme: str,
+        options: dict,
+        text: str | None = None,
+        pdf: bytes | None = None,
+    ) -> Job:
+        if not article_theme or not article_theme.strip():
+            raise JobRejected("A theme is required")
+        if (text is None) == (pdf is None):
+            raise JobRejected("Send either a PDF file or the paper text")
+        if text is not None and not text.strip():
+            raise JobRejected("The paper text is empty")
+        if options.get("single_call") and options.get("map_reduce"):
+            raise JobRejected("single_call and map_reduce cannot be combined")
+        job = Job(
+            article_theme=article_theme.strip(), options=options, text=text, pdf=pdf
+        )
+        with self._lock:
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                telemetry.JOBS.inc(status="rejected")
+                raise JobRejected(
+                    "The job queue is full, retry later", status=503
+                ) from None
+            self._jobs[job.job_id] = job
+            self._forget_finished()
+        telemetry.JOBS.inc(status="accepted")
+        telemetry.log(
+            "job_accepted",
+            job_id=job.job_id,
+            source="pdf" if pdf is not None else "text",
+            queued=self._queue.qsize(),
+        )
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "running": self._running,
+                "queued": self._queue.qsize(),
+                "queue_size": self._queue.maxsize,
+                "jobs": len(self._jobs),
+            }
+
+    def close(self, timeout: float | None = None) -> None:
+        """Stops the workers once the jobs already queued have run."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _forget_finished(self) -> None:
+        # Caller holds the lock; unfinished jobs are never dropped
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[: max(len(finished) - self.retention, 0)]:
+            del self._jobs[job_id]
+
+    def _work(self) -> None:
+        while (job := self._queue.get()) is not None:
+            with self._lock:
+                self._running += 1
+            try:
+                self._run(job)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+    def _run(self, job: Job) -> None:
+        job.set_status("running", started_at=time.time())
+        try:
+            with telemetry.span("job", job_id=job.job_id):
+                research_paper = (
+                    job.text
+                    if job.text is not None
+                    else _extract_pdf(
+                        job.pdf,
+                        extraction_max_tokens(job.options.get("map_reduce", False)),
+                    )
+                )
+                job.text = job.pdf = None  # The input is not needed any more; free it
+                for event in stream_research_paper_evaluation(
+                    research_paper, job.article_theme, **job.options
+                ):
+                    if event["event"] == "final":
+                        result = public_result(event["result"])
+                        job.publish(
+                            {
+                                "event": "final",
+                                "final_score": event["final_score"],
+                                "result": result,
+                            }
+                        )
+                    else:
+                        job.publish(event)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            job.publish({"event": "error", "error": error})
+            job.set_status("failed", error=error, finished_at=time.time())
+            telemetry.JOBS.inc(status="failed")
+            telemetry.log("job_failed", logging.WARNING, job_id=job.job_id, error=error)
+        else:
+            job.set_status("succeeded", result=result, finished_at=time.time())
+            telemetry.JOBS.inc(status="succeeded")
+
+
+def _extract_pdf(pdf: bytes, max_tokens: int | None) -> str:
+    """Text of an uploaded PDF (the extractors read from a file)."""
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+        f.write(pdf)
+    try:
+        text = extract_text_from_pdf(f.name, max_tokens)
+    finally:
+        os.unlink(f.name)
+    if not text:
+        raise ValueError("Could not extract text from the PDF")
+    return text
+
+
+def _parse_options(fields: dict) -> dict:
+    """Evaluation options of a submission, from form, query or JSON fields."""
+    options = {}
+    for name in _BOOLEAN_OPTIONS:
+        value = fields.get(name)
+        if value is not None:
+            options[name] = (
+                value
+                if isinstance(value, bool)
+                else str(value).lower() in ("1", "true", "yes", "on")
+            )
+    threshold = fields.get("relevance_threshold")
+    if threshold not in (None, ""):
+        try:
+            options["relevance_threshold"] = float(threshold)
+        except (TypeError, ValueError):
+            raise JobRejected("relevance_threshold must be a number") from None
+        if not 0 <= options["relevance_threshold"] <= 1:
+            raise JobRejected("relevance_threshold must be between 0 and 1")
+    return options
+
+
+def _parse_multipart(content_type: str, body: bytes) -> dict:
+    """Fields of a multipart/form-data body; files as bytes, other fields as str."""
+    message = BytesParser(policy=policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+    )
+    if not message.is_multipart():
+        raise JobRejected("Malformed multipart body")
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        payload = part.get_payload(decode=True) or b""
+        fields[name] = (
+            payload
+            if part.get_filename()
+            else payload.decode(part.get_content_charset() or "utf-8")
+        )
+    return fields
+
+
+class _JobHandler(BaseHTTPRequestHandler):
+    server_version = "ArticleScoutJobs/1.0"
+
+    @property
+    def service(self) -> JobService:
+        return self.server.service
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            self._send_json(404, {"error": "Not found"})
+            return
+        try:
+            job = self.service.submit(**self._read_submission(parse_qs(url.query)))
+        except JobRejected as e:
+            headers = {"Retry-After": "5"} if e.status == 503 else {}
+            self._send_json(e.status, {"error": str(e)}, headers)
+            return
+        self._send_json(
+            202,
+            {
+                "job_id": job.job_id,
+                "status": job.status,
+                "queued": self.service.stats()["queued"],
+                "links": {
+                    "self": f"/jobs/{job.job_id}",
+                    "events": f"/jobs/{job.job_id}/events",
+                },
+            },
+            {"Location": f"/jobs/{job.job_id}"},
+        )
+
+    def do_GET(self):
+        parts = urlsplit(self.path).path.strip("/").split("/")
+        if parts == ["health"]:
+            self._send_json(200, {"status": "ok", **self.service.stats()})
+        elif parts == ["metrics"]:
+            self._send(
+                200,
+                telemetry.render_metrics().encode("utf-8"),
+                "text/plain; version=0.0.4; charset=utf-8",
+            )
+        elif (
+            len(parts) in (2, 3)
+            and parts[0] == "jobs"
+            and parts[2:] in ([], ["events"])
+        ):
+            job = self.service.get(parts[1])
+            if job is None:
+                self._send_json(404, {"error": "Unknown job"})
+            elif len(parts) == 2:
+                self._send_json(200, job.to_dict())
+            else:
+                self._stream_events(job)
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def _read_submission(self, query: dict) -> dict:
+        header = self.headers.get("Content-Length")
+        if header is None:
+            raise JobRejected("Content-Length is required", status=411)
+        if not header.strip().isdigit():
+            raise JobRejected("Content-Length must be a non-negative integer")
+        length = int(header)
+        if length > JOB_MAX_UPLOAD_BYTES:
+            raise JobRejected(
+                f"The upload exceeds {JOB_MAX_UPLOAD_BYTES // 2 ** 20} MB", status=413
+            )
+        body = self.rfile.read(length)
+        content_type = self.headers.get("Content-Type", "")
+        fields = {name: values[-1] for name, values in query.items()}
+        text = pdf = None
+        if content_type.startswith("multipart/form-data"):
+            fields.update(_parse_multipart(content_type, body))
+            pdf, text = fields.get("file"), fields.get("text")
+        elif content_type.startswith("application/json"):
+            try:
+                fields.update(json.loads(body or b"{}"))
+                pdf = (
+                    base64.b64decode(fields["pdf_base64"], validate=True)
+                    if "pdf_base64" in fields
+                    else None
+                )
+            except (ValueError, TypeError):
+                raise JobRejected("Malformed JSON body") from None
+            text = fields.get("text")
+        elif content_type.startswith("application/pdf"):
+            pdf = body
+        else:
+            raise JobRejected(
+                "Send multipart/form-data, application/json or application/pdf",
+                status=415,
+            )
+        theme = fields.get("theme")
+        if theme is not None and not isinstance(theme, str):
+            raise JobRejected("theme must be a string")
+        if text is not None and not isinstance(text, str):
+            raise JobRejected("text must be a string")
+        if pdf is not None and not isinstance(pdf, bytes):
+            raise JobRejected("file must be an uploaded PDF")
+        return {
+            "article_theme": theme or "",
+            "options": _parse_options(fields),
+            "text": text,
+            "pdf": pdf,
+        }
+
+    def _stream_events(self, job: Job) -> None:
+        try:
+            index = int(self.headers.get("Last-Event-ID", "-1")) + 1
+        except ValueError:
+            index = 0
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("X-Accel-Buffering", "no")
+        self.end_headers()
+        try:
+            while True:
+                events, done = job.events_after(index, SSE_KEEPALIVE_SECONDS)
+                for event_id, event in zip(itertools.count(index), events):
+                    data = json.dumps(event, default=str)
+                    message = f"id: {event_id}\nevent: {event['event']}\ndata: {data}"
+                    self.wfile.write(f"{message}\n\n".encode("utf-8"))
+                index += len(events)
+                if done and not events:
+                    return
+                if not events:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; the job keeps running
+            return
+
+    def _send_json(
+        self, status: int, payload: dict, headers: dict | None = None
+    ) -> None:
+        self._send(
+            status,
+            json.dumps(payload, default=str).encode("utf-8"),
+            "application/json",
+            headers,
+        )
+
+    def _send(
+        self, status: int, body: bytes, content_type: str, headers: dict | None = None
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Requests are logged as structured events; polling would flood an access log
+        pass
+
+
+def make_server(
+    service: JobService, host: str = "0.0.0.0", port: int = JOB_SERVICE_PORT
+) -> ThreadingHTTPServer:
+    """HTTP server for the service's endpoints (call serve_forever() on it)."""
+    server = ThreadingHTTPServer((host, port), _JobHandler)
+    server.daemon_threads = True
+    server.service = service
+    return server
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="article-scout serve",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=JOB_SERVICE_PORT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=JOB_SERVICE_WORKERS,
+        help="Concurrent evaluations",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=JOB_QUEUE_SIZE,
+        help="Jobs waiting for a worker",
+    )
+    args = parser.parse_args(argv)
+
+    service = JobService(workers=args.workers, queue_size=args.queue_size)
+    server = make_server(service, args.host, args.port)
+    telemetry.log(
+        "job_service_started",
+        host=args.host,
+        port=server.server_address[1],
+        workers=args.workers,
+        queue_size=args.queue_size,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
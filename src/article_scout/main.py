@@ -1,30 +1,262 @@
 """
 Main entry point for Article Scout application
+
+    article-scout                                   validate the configuration
+    article-scout batch <dir> --theme "..." [--workers N] [--out results.jsonl]
+    article-scout serve [--port 8000] [--workers 4]  run the HTTP job service
+
+The batch command scores every PDF in a directory with evaluate_pipeline and
+appends one JSON line per paper to the output file as soon as it is evaluated.
+Papers already in the output for the same theme are skipped, so an
+interrupted run resumes where it stopped when the same command is run again.
+
+Variables in a .env file of the working directory are loaded before the
+settings are read.
 """
 
-import sys
+import argparse
+import json
 import os
+import sys
 from pathlib import Path
 
-# Add the project root to Python path
-project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
+from dotenv import load_dotenv
+
+
+def find_pdfs(directory: Path, recursive: bool = False) -> list[Path]:
+    """PDF files of a directory in a stable (sorted) order."""
+    pattern = "**/*" if recursive else "*"
+    return sorted(
+        path
+        for path in directory.glob(pattern)
+        if path.suffix.lower() == ".pdf" and path.is_file()
+    )
+
 
-from config.settings import validate_config
-from article_scout import evaluate_research_paper, extract_text_from_pdf
+def load_finished(
+    out_path: Path, article_theme: str, retry_failed: bool = False
+) -> set[str]:
+    """
+    Paths already scored for article_theme in a JSONL output file. The last
+    record of a path wins; a line cut short by an interrupted run is ignored.
+    With retry_failed, papers whose last attempt failed are not counted.
+    """
+    if not out_path.exists():
+        return set()
+    outcome = {}
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if (
+                isinstance(record, dict)
+                and record.get("theme") == article_theme
+                and "path" in record
+            ):
+                outcome[record["path"]] = record.get("ok", False)
+    return {path for path, ok in outcome.items() if ok or not retry_failed}
 
 
-def main():
+def _ends_mid_line(path: Path) -> bool:
+    """True when a previous run was killed in the middle of writing a line of path."""
+    if not path.exists() or path.stat().st_size == 0:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """
+    Scores the PDFs of args.directory; returns the exit code (1 when any paper
+    failed or did not come back from the pipeline).
+    """
+    from .batch import PipelineStats, evaluate_pipeline, public_result, summarize_batch
+
+    out_path = Path(args.out)
+    pdfs = [path.resolve() for path in find_pdfs(Path(args.directory), args.recursive)]
+    finished = load_finished(out_path, args.theme, args.retry_failed)
+    todo = [path for path in pdfs if str(path) not in finished]
+    print(
+        f"📄 {len(pdfs)} PDFs in {args.directory}, {len(pdfs) - len(todo)} already in "
+        f"{out_path}, {len(todo)} to evaluate",
+        file=sys.stderr,
+    )
+    if not todo:
+        return 0
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    starts_mid_line = _ends_mid_line(out_path)
+    stats = PipelineStats()
+    results = evaluate_pipeline(
+        ((str(path), args.theme) for path in todo),
+        max_concurrency=args.workers,
+        extract_workers=args.extract_workers,
+        stats=stats,
+    )
+    done = []
+    try:
+        with open(out_path, "a", encoding="utf-8") as out:
+            if starts_mid_line:
+                out.write("\n")
+            for batch_result in results:
+                record = {
+                    "path": batch_result.source,
+                    "theme": batch_result.article_theme,
+                    "ok": batch_result.ok,
+                    "final_score": (
+                        batch_result.result.get("final_score")
+                        if batch_result.ok
+                        else None
+                    ),
+                    "error": batch_result.error,
+                    "result": (
+                        public_result(batch_result.result) if batch_result.ok else None
+                    ),
+                }
+                out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                out.flush()
+                done.append(batch_result)
+
+                rate = len(done) / max(stats.elapsed, 1e-9)
+                eta = (len(todo) - len(done)) / rate
+                outcome = (
+                    f"{record['final_score']:.2f}" if batch_result.ok else "failed"
+                )
+                print(
+                    f"[{len(done):>{len(str(len(todo)))}}/{len(todo)}] {rate:.2f} "
+                    f"papers/s, ETA {_format_duration(eta)}  {outcome:>6}  "
+                    f"{Path(batch_result.source).name}",
+                    file=sys.stderr,
+                )
+    except KeyboardInterrupt:
+        print(
+            f"\n⏹️  Interrupted after {len(done)} papers; run the same command "
+            "again to resume",
+            file=sys.stderr,
+        )
+        return 130
+    finally:
+        results.close()
+
+    if len(done) != len(todo):
+        # Never report a run as complete while papers are missing from the output
+        print(
+            f"❌ The batch returned {len(done)} results for {len(todo)} papers; the "
+            "output is incomplete, run the same command again to evaluate the "
+            "missing papers",
+            file=sys.stderr,
+        )
+        return 1
+
+    summary = summarize_batch(done)
+    occupancy = ", ".join(
+        f"{stage} {value:.0%}" for stage, value in stats.occupancy().items()
+    )
+    print(
+        f"✅ {summary['succeeded']} evaluated, {summary['failed']} failed in "
+        f"{_format_duration(stats.elapsed)} "
+        f"({len(done) / max(stats.elapsed, 1e-9):.2f} papers/s; "
+        f"stage occupancy: {occupancy})"
+    )
+    print(f"Results written to {out_path}")
+    return 1 if summary["failed"] else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from .batch import DEFAULT_BATCH_CONCURRENCY, DEFAULT_EXTRACT_WORKERS
+
+    parser = argparse.ArgumentParser(
+        prog="article-scout",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command")
+    batch_parser = commands.add_parser(
+        "batch", help="Score every PDF in a directory into a JSONL file"
+    )
+    batch_parser.add_argument("directory", help="Directory with the PDFs to evaluate")
+    batch_parser.add_argument(
+        "--theme", required=True, help="Theme the papers are evaluated against"
+    )
+    batch_parser.add_argument(
+        "--out", default="results.jsonl", help="JSONL file the results are appended to"
+    )
+    batch_parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_BATCH_CONCURRENCY,
+        help="Concurrent evaluations",
+    )
+    batch_parser.add_argument(
+        "--extract-workers",
+        type=int,
+        default=DEFAULT_EXTRACT_WORKERS,
+        help="Processes extracting PDF text",
+    )
+    batch_parser.add_argument(
+        "--recursive", action="store_true", help="Include PDFs in subdirectories"
+    )
+    batch_parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Evaluate again the papers whose last attempt failed",
+    )
+    # The job service parses its own options (article-scout serve --help)
+    commands.add_parser("serve", help="Run the HTTP job service", add_help=False)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
     """Main entry point for the application"""
+    parser = build_parser()
+    args, serve_options = parser.parse_known_args(argv)
+    if serve_options and args.command != "serve":
+        parser.error(f"unrecognized arguments: {' '.join(serve_options)}")
+    if args.command == "batch":
+        if not Path(args.directory).is_dir():
+            parser.error(f"{args.directory} is not a directory")
+        if args.workers < 1 or args.extract_workers < 1:
+            parser.error("--workers and --extract-workers must be at least 1")
+
+    # The settings are read when their modules are imported, so .env goes first
+    load_dotenv()
+    from .settings import validate_config
+
     try:
-        # Validate configuration
-        validate_config()
-        
+        # Validate configuration (offline model backends need no API key)
+        if os.getenv("LLM_BACKEND", "groq") in ("groq", "record"):
+            validate_config()
+
+        if args.command == "batch":
+            return run_batch(args)
+        if args.command == "serve":
+            from .job_service import main as serve
+
+            serve(serve_options)
+            return 0
+
         print("🚀 Article Scout - Research Paper Evaluator")
         print("=" * 50)
         print("Configuration validated successfully!")
-        print("Use 'uv run streamlit run src/article_scout/streamlit_app.py' to start the web interface")
-        
+        print(
+            "Use 'uv run streamlit run src/article_scout/streamlit_app.py' to start "
+            "the web interface"
+        )
+        print(
+            "Use 'article-scout batch <dir> --theme \"...\"' to score a folder of PDFs"
+        )
+        print("Use 'article-scout serve' to start the HTTP job service")
+        return 0
+
     except ValueError as e:
         print(f"❌ Configuration Error: {e}")
         sys.exit(1)
@@ -34,4 +266,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Configuration settings for Article Scout
+"""
+
+import os
+from pathlib import Path
+
+# Base paths (of a source checkout)
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+SRC_DIR = BASE_DIR / "src" / "article_scout"
+DATA_DIR = BASE_DIR / "data"
+CONFIG_DIR = BASE_DIR / "config"
+
+# Environment variables
+GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+GROQ_TEMPERATURE = float(os.getenv("GROQ_TEMPERATURE", "0.3"))
+
+# PDF extraction settings
+MAX_TOKENS = int(os.getenv("MAX_TOKENS", "5000"))
+MAX_REQUEST_TOKENS = int(os.getenv("MAX_REQUEST_TOKENS", "6000"))
+
+# Rate limiting (defaults: llama-3.1-8b-instant free tier; 0 disables a limit)
+GROQ_REQUESTS_PER_MINUTE = int(os.getenv("GROQ_REQUESTS_PER_MINUTE", "30"))
+GROQ_TOKENS_PER_MINUTE = int(os.getenv("GROQ_TOKENS_PER_MINUTE", "6000"))
+GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "8"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "5"))
+
+# Model backend settings (groq, fake, record or replay)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "groq")
+LLM_CASSETTE_PATH = os.getenv(
+    "LLM_CASSETTE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "article_scout", "cassette.jsonl"),
+)
+FAKE_LLM_LATENCY_DISTRIBUTION = os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "lognormal")
+FAKE_LLM_LATENCY_MEAN = float(os.getenv("FAKE_LLM_LATENCY_MEAN", "0.0"))
+FAKE_LLM_LATENCY_STDDEV = float(os.getenv("FAKE_LLM_LATENCY_STDDEV", "0.0"))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0.0"))
+FAKE_LLM_ERROR_KIND = os.getenv("FAKE_LLM_ERROR_KIND", "rate_limit")
+
+# Model cascade settings
+GROQ_CASCADE_MODEL = os.getenv("GROQ_CASCADE_MODEL", "llama-3.3-70b-versatile")
+CASCADE_UNCERTAIN_LOW = float(os.getenv("CASCADE_UNCERTAIN_LOW", "0.4"))
+CASCADE_UNCERTAIN_HIGH = float(os.getenv("CASCADE_UNCERTAIN_HIGH", "0.7"))
+CASCADE_REQUESTS_PER_MINUTE = int(os.getenv("CASCADE_REQUESTS_PER_MINUTE", "30"))
+CASCADE_TOKENS_PER_MINUTE = int(os.getenv("CASCADE_TOKENS_PER_MINUTE", "12000"))
+
+# Criterion registry: JSON file that adds, removes or adjusts criteria (see criteria.py)
+CRITERIA_CONFIG = os.getenv("CRITERIA_CONFIG", "")
+
+# Parse repair: re-asks of unparseable criterion answers
+PARSE_REPAIR_ATTEMPTS = int(os.getenv("PARSE_REPAIR_ATTEMPTS", "1"))
+PARSE_REPAIR_OUTPUT_TOKENS = int(os.getenv("PARSE_REPAIR_OUTPUT_TOKENS", "150"))
+
+# Long-document (map-reduce) settings
+MAP_REDUCE_CHUNK_TOKENS = int(os.getenv("MAP_REDUCE_CHUNK_TOKENS", "2000"))
+MAP_REDUCE_SUMMARY_TOKENS = int(os.getenv("MAP_REDUCE_SUMMARY_TOKENS", "300"))
+MAP_REDUCE_TOKEN_BUDGET = int(os.getenv("MAP_REDUCE_TOKEN_BUDGET", "60000"))
+MAP_REDUCE_CONCURRENCY = int(os.getenv("MAP_REDUCE_CONCURRENCY", "4"))
+
+# Evaluation cache settings
+EVALUATION_CACHE_PATH = os.getenv(
+    "EVALUATION_CACHE_PATH",
+    str(Path.home() / ".cache" / "article_scout" / "evaluations.sqlite3"),
+)
+EVALUATION_CACHE_MAX_ENTRIES = int(os.getenv("EVALUATION_CACHE_MAX_ENTRIES", "10000"))
+EVALUATION_CACHE_TTL_SECONDS = float(
+    os.getenv("EVALUATION_CACHE_TTL_SECONDS", str(30 * 24 * 3600))
+)
+EVALUATION_CACHE_PER_CRITERION = (
+    os.getenv("EVALUATION_CACHE_PER_CRITERION", "false").lower() == "true"
+)
+
+# Near-duplicate papers reuse the cached result of the paper they match
+NEAR_DUPLICATE_INDEX_PATH = os.getenv(
+    "NEAR_DUPLICATE_INDEX_PATH",
+    str(Path.home() / ".cache" / "article_scout" / "near_duplicates.sqlite3"),
+)
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+
+# Lexical index of screened papers, used to prefilter a batch by theme
+PREFILTER_INDEX_PATH = os.getenv(
+    "PREFILTER_INDEX_PATH",
+    str(Path.home() / ".cache" / "article_scout" / "prefilter.sqlite3"),
+)
+
+# Checkpoints of evaluations run with an evaluation_id, so a retry resumes them
+CHECKPOINT_PATH = os.getenv(
+    "CHECKPOINT_PATH",
+    str(Path.home() / ".cache" / "article_scout" / "checkpoints.sqlite3"),
+)
+
+# HTTP job service settings
+JOB_SERVICE_PORT = int(os.getenv("JOB_SERVICE_PORT", "8000"))
+JOB_SERVICE_WORKERS = int(os.getenv("JOB_SERVICE_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", "1000"))
+JOB_MAX_UPLOAD_MB = float(os.getenv("JOB_MAX_UPLOAD_MB", "20"))
+
+# Telemetry settings
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" (logfmt) or "json"
+METRICS_PORT = (
+    int(os.getenv("METRICS_PORT", "0")) or None
+)  # Prometheus endpoint, off when unset
+TELEMETRY_SPANS_PATH = os.getenv("TELEMETRY_SPANS_PATH", "")
+TELEMETRY_MAX_SPANS = int(os.getenv("TELEMETRY_MAX_SPANS", "1000"))
+
+# Streamlit settings
+STREAMLIT_SERVER_PORT = int(os.getenv("STREAMLIT_SERVER_PORT", "8501"))
+STREAMLIT_SERVER_ADDRESS = os.getenv("STREAMLIT_SERVER_ADDRESS", "0.0.0.0")
+
+
+# Validation
+def validate_config():
+    """Validate that required configuration is present"""
+    if not GROQ_API_KEY:
+        raise ValueError(
+            "GROQ_API_KEY not found in environment variables. "
+            "Please ensure it is configured in your .env file"
+        )
+
+    if GROQ_API_KEY == "your_groq_api_key_here":
+        raise ValueError(
+            "Please set your actual GROQ_API_KEY in the .env file. "
+            "Get your API key from: https://console.groq.com/"
+        )
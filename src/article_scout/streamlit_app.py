@@ -1,63 +1,94 @@
-import streamlit as st
 import os
 import sys
 import tempfile
-import pprint
 
-# Add the parent directory to sys.path to allow relative imports
-# This is important if 'utils' and 'article_scout_agent' are not at the same level
-# or if you are running Streamlit from a different directory.
-current_dir = os.path.dirname(os.path.abspath(__file__))
-if current_dir not in sys.path:
-    sys.path.append(current_dir)
+import streamlit as st
+from dotenv import load_dotenv
+
+# Streamlit runs this file as a script, outside the package; add the directory
+# that contains the article_scout package to sys.path so it can be imported
+# when the project is not installed, whatever the working directory.
+src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if src_dir not in sys.path:
+    sys.path.append(src_dir)
 
 # Import the PDF extractor from the utils folder
 try:
-    from .utils.pdf_extractor import extract_text_from_pdf
+    from article_scout.utils.pdf_extractor import extract_text_from_pdf
 except ImportError:
+    st.error("Error: Could not import 'extract_text_from_pdf' from the 'utils' folder.")
+    st.info(
+        "Please ensure that the 'utils' folder exists and contains the "
+        "'pdf_extractor.py' file."
+    )
+    st.stop()
+
+# The agent reads its settings from the environment; the .env file is loaded
+# here because the agent itself is only imported once a paper is evaluated
+load_dotenv()
+
+
+# Importing the agent pulls in LangChain, LangGraph and the Groq client, which
+# takes seconds. It is deferred until the first evaluation so the page paints
+# immediately, and st.cache_resource builds the model client and the compiled
+# graphs once per server process instead of on every rerun or session.
+@st.cache_resource(show_spinner="Loading the evaluation model...")
+def load_agent():
+    """The Article Scout agent module, fully initialised."""
     try:
-        from utils.pdf_extractor import extract_text_from_pdf
+        from article_scout import article_scout_agent
     except ImportError:
-        st.error("Error: Could not import 'extract_text_from_pdf' from the 'utils' folder.")
-        st.info("Please ensure that the 'utils' folder exists and contains the 'pdf_extractor.py' file.")
+        st.error(
+            "Error: Could not import the evaluation agent from "
+            "'article_scout_agent.py'."
+        )
+        st.info(
+            "Please ensure that 'article_scout_agent.py' is in the same folder as "
+            "'streamlit_app.py'."
+        )
         st.stop()
+    article_scout_agent.initialize()
+    return article_scout_agent
 
-# Import the evaluation function from your Article Scout agent
-try:
-    from .article_scout_agent import evaluate_research_paper
-except ImportError:
-    try:
-        from article_scout_agent import evaluate_research_paper
-    except ImportError:
-        st.error("Error: Could not import 'evaluate_research_paper' from 'article_scout_agent.py'.")
-        st.info("Please ensure that 'article_scout_agent.py' is in the same folder as 'streamlit_app.py'.")
-        st.stop()
+
+# Serve the evaluation metrics (Prometheus text format) for scraping, once per process
+metrics_port = os.getenv("METRICS_PORT")
+if metrics_port:
+    from article_scout.utils.telemetry import start_metrics_server
+
+    start_metrics_server(int(metrics_port))
 
 # Streamlit page configurations
 st.set_page_config(page_title="Article Scout - Article Evaluator", layout="centered")
 
 st.title("📚 Article Scout - Research Paper Evaluator for TCC")
-st.markdown("""
+st.markdown(
+    """
     Upload a research paper in PDF format and provide your TCC (Final Project) theme.
-    **Article Scout** will evaluate the relevance and other criteria of the paper for your work!
-""")
+    **Article Scout** will evaluate the relevance and other criteria of the paper
+    for your work!
+"""
+)
 
 # Input for the TCC theme
 tcc_theme = st.text_input(
     "Your Article Theme:",
     placeholder="Ex: Applications of Machine Learning in Data Engineering",
-    help="Describe the main theme of your Final Project (Article)."
+    help="Describe the main theme of your Final Project (Article).",
 )
 
 # PDF file upload
 uploaded_file = st.file_uploader("Upload the research paper in PDF", type="pdf")
 
 # Check if API key is configured
-api_key_configured = os.getenv('GROQ_API_KEY') and os.getenv('GROQ_API_KEY') != 'your_groq_api_key_here'
+api_key_configured = (
+    os.getenv("GROQ_API_KEY") and os.getenv("GROQ_API_KEY") != "your_groq_api_key_here"
+)
 
 if not api_key_configured:
     st.warning("⚠️ **API Key Not Configured**")
-    st.info("""
+    st.info(
+        """
     To use Article Scout, you need to configure your Groq API key:
     
     1. Copy `config/env.example` to `.env`
@@ -65,7 +96,8 @@ if not api_key_configured:
     3. Get your API key from: https://console.groq.com/
     
     The application will show a demo mode until the API key is configured.
-    """)
+    """
+    )
 
 # Button to start evaluation
 if st.button("Evaluate Paper"):
@@ -85,49 +117,49 @@ if st.button("Evaluate Paper"):
             if article_text:
                 if not api_key_configured:
                     st.error("❌ **API Key Required**")
-                    st.info("Please configure your Groq API key in the `.env` file to evaluate papers.")
+                    st.info(
+                        "Please configure your Groq API key in the `.env` file to "
+                        "evaluate papers."
+                    )
                     st.stop()
-                
-                # Call the agent to evaluate the paper
-                results = evaluate_research_paper(article_text, tcc_theme)
+
+                agent = load_agent()
+                # Display names of the configured criteria, in the order they are shown
+                criterion_labels = {
+                    name: criterion.label for name, criterion in agent.CRITERIA.items()
+                }
+
+                # Evaluate the paper, showing each criterion as soon as it is scored
+                st.subheader("Criteria evaluated so far:")
+                progress = st.progress(0.0)
+                scored = 0
+                results = None
+                for event in agent.stream_research_paper_evaluation(
+                    article_text, tcc_theme
+                ):
+                    if event["event"] == "criterion":
+                        scored += 1
+                        progress.progress(scored / len(criterion_labels))
+                        label = criterion_labels[event["criterion"]]
+                        st.markdown(f"**{label}**: {event['score'] * 10:.2f}")
+                    else:
+                        results = event["result"]
 
                 st.success("Evaluation completed!")
+                if results.get("near_duplicate"):
+                    match = results["near_duplicate"]
+                    st.info(
+                        "Reused the evaluation of a near-duplicate paper "
+                        f"({match['similarity']:.0%} similar): {match['title']}"
+                    )
+
+                # Format the results for display
+                formatted_results = agent.format_results_for_display(results)
 
-                # Format the results for display with pprint
-                formatted_results = {
-                    "Final Score": f"{results['final_score'] * 10:.2f}",
-                    "Relevance to TCC": {
-                        "Score": f"{results['relevance_score'] * 10:.2f}",
-                        "Explanation": results['relevance_explanation']
-                    },
-                    "Originality": {
-                        "Score": f"{results['originality_score'] * 10:.2f}",
-                        "Explanation": results['originality_explanation']
-                    },
-                    "Methodology Quality": {
-                        "Score": f"{results['methodology_quality_score'] * 10:.2f}",
-                        "Explanation": results['methodology_quality_explanation']
-                    },
-                    "Results and Discussion Quality": {
-                        "Score": f"{results['results_discussion_quality_score'] * 10:.2f}",
-                        "Explanation": results['results_discussion_quality_explanation']
-                    },
-                    "Potential Impact": {
-                        "Score": f"{results['potential_impact_score'] * 10:.2f}",
-                        "Explanation": results['potential_impact_explanation']
-                    },
-                    "Writing Clarity": {
-                        "Score": f"{results['writing_clarity_score'] * 10:.2f}",
-                        "Explanation": results['writing_clarity_explanation']
-                    },
-                    "References Timeliness": {
-                        "Score": f"{results['references_timeliness_score'] * 10:.2f}",
-                        "Explanation": results['references_timeliness_explanation']
-                    },
-                }
-                
                 st.subheader("Evaluation Results:")
-                st.json(formatted_results) # Use st.json for formatted and expandable output
+                st.json(
+                    formatted_results
+                )  # Use st.json for formatted and expandable output
 
                 # Optional: Display the extracted text for debugging
                 with st.expander("View Full Extracted Text from PDF"):
@@ -138,4 +170,4 @@ if st.button("Evaluate Paper"):
     elif uploaded_file is None:
         st.warning("Please upload a PDF file.")
     elif not tcc_theme:
-        st.warning("Please enter your TCC theme.")
\ No newline at end of file
+        st.warning("Please enter your TCC theme.")
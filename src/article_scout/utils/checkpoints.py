@@ -0,0 +1,370 @@
+"""
+SQLite checkpointer for the evaluation graphs.
+
+LangGraph saves a checkpoint after every step of a run that has a thread id,
+plus the writes of each task that finished inside a step that did not. A run
+that crashed (e.g. the fifth model call timed out) can then be resumed on the
+same thread: finished nodes are not run again. SQLiteCheckpointer stores those
+checkpoints in a local SQLite file with the semantics of LangGraph's
+InMemorySaver, so they survive the process; it follows the layout of the
+official langgraph-checkpoint-sqlite saver, which is not a dependency here.
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+    writes_sort_key,
+)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS checkpoints ("
+    " thread_id TEXT NOT NULL,"
+    " checkpoint_ns TEXT NOT NULL,"
+    " checkpoint_id TEXT NOT NULL,"
+    " parent_checkpoint_id TEXT,"
+    " type TEXT NOT NULL,"
+    " checkpoint BLOB NOT NULL,"
+    " metadata_type TEXT NOT NULL,"
+    " metadata BLOB NOT NULL,"
+    " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))",
+    "CREATE TABLE IF NOT EXISTS blobs ("
+    " thread_id TEXT NOT NULL,"
+    " checkpoint_ns TEXT NOT NULL,"
+    " channel TEXT NOT NULL,"
+    " version TEXT NOT NULL,"
+    " type TEXT NOT NULL,"
+    " blob BLOB,"
+    " PRIMARY KEY (thread_id, checkpoint_ns, channel, version))",
+    "CREATE TABLE IF NOT EXISTS writes ("
+    " thread_id TEXT NOT NULL,"
+    " checkpoint_ns TEXT NOT NULL,"
+    " checkpoint_id TEXT NOT NULL,"
+    " task_id TEXT NOT NULL,"
+    " idx INTEGER NOT NULL,"
+    " channel TEXT NOT NULL,"
+    " type TEXT NOT NULL,"
+    " value BLOB,"
+    " task_path TEXT NOT NULL DEFAULT '',"
+    " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx))",
+)
+
+
+class SQLiteCheckpointer(BaseCheckpointSaver[str]):
+    """
+    LangGraph checkpoint saver backed by a SQLite file (or ":memory:").
+
+    Safe to share between threads and between the sync and async graph
+    methods; the async methods run the same queries in a worker thread, so a
+    slow disk never blocks the event loop.
+    """
+
+    def __init__(self, path: str, *, serde=None):
+        super().__init__(serde=serde)
+        self.path = path if path == ":memory:" else os.path.expanduser(path)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    # -- reads ---------------------------------------------------------------
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        """The checkpoint of config's checkpoint_id, or the thread's latest one."""
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        query = "SELECT * FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+        params: tuple = (thread_id, checkpoint_ns)
+        if checkpoint_id := get_checkpoint_id(config):
+            query += " AND checkpoint_id = ?"
+            params += (checkpoint_id,)
+        query += " ORDER BY checkpoint_id DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+            return self._tuple(row) if row is not None else None
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        """Checkpoints matching config (and filter's metadata), newest first."""
+        clauses, params = [], []
+        if config is not None:
+            configurable = config["configurable"]
+            clauses.append("thread_id = ?")
+            params.append(configurable["thread_id"])
+            if (checkpoint_ns := configurable.get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before is not None and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        query = "SELECT * FROM checkpoints"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        for row in rows:
+            if limit is not None and limit <= 0:
+                break
+            if filter:
+                metadata = self.serde.loads_typed((row[6], row[7]))
+                if not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+            with self._lock:
+                checkpoint_tuple = self._tuple(row)
+            if limit is not None:
+                limit -= 1
+            yield checkpoint_tuple
+
+    def _tuple(self, row) -> CheckpointTuple:
+        # Caller holds the lock
+        (
+            thread_id,
+            checkpoint_ns,
+            checkpoint_id,
+            parent_id,
+            type_,
+            checkpoint_b,
+            metadata_type,
+            metadata_b,
+        ) = row
+        checkpoint: Checkpoint = self.serde.loads_typed((type_, checkpoint_b))
+        writes = self._conn.execute(
+            "SELECT task_id, idx, channel, type, value, task_path FROM writes"
+            " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        writes.sort(key=lambda w: writes_sort_key(w[5], w[0], w[1]))
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "channel_values": self._load_blobs(
+                    thread_id, checkpoint_ns, checkpoint["channel_versions"]
+                ),
+            },
+            metadata=self.serde.loads_typed((metadata_type, metadata_b)),
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_id,
+                    }
+                }
+                if parent_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((type_, value)))
+                for task_id, _, channel, type_, value, _ in writes
+            ],
+        )
+
+    def _load_blobs(
+        self, thread_id: str, checkpoint_ns: str, versions: ChannelVersions
+    ) -> dict[str, Any]:
+        # Caller holds the lock
+        values = {}
+        for channel, version in versions.items():
+            row = self._conn.execute(
+                "SELECT type, blob FROM blobs"
+                " WHERE thread_id = ? AND checkpoint_ns = ?"
+                " AND channel = ? AND version = ?",
+                (thread_id, checkpoint_ns, channel, str(version)),
+            ).fetchone()
+            if row is not None and row[0] != "empty":
+                values[channel] = self.serde.loads_typed(row)
+        return values
+
+    # -- writes --------------------------------------------------------------
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Saves a checkpoint; channel values are stored once per (channel, version)."""
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint = checkpoint.copy()
+        values = checkpoint.pop("channel_values")
+        blobs = [
+            (
+                thread_id,
+                checkpoint_ns,
+                channel,
+                str(version),
+                *(
+                    self.serde.dumps_typed(values[channel])
+                    if channel in values
+                    else ("empty", None)
+                ),
+            )
+            for channel, version in new_versions.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?, ?, ?)", blobs
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    configurable.get("checkpoint_id"),
+                    *self.serde.dumps_typed(checkpoint),
+                    *self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+                ),
+            )
+            self._conn.commit()
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Saves a task's writes; special ones (errors, interrupts) replace old ones."""
+        configurable = config["configurable"]
+        key = (
+            configurable["thread_id"],
+            configurable.get("checkpoint_ns", ""),
+            configurable["checkpoint_id"],
+        )
+        rows = [
+            (
+                *key,
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                *self.serde.dumps_typed(value),
+                task_path,
+            )
+            for idx, (channel, value) in enumerate(writes)
+        ]
+        # Like InMemorySaver, regular writes are kept as first saved and special
+        # ones (negative idx) are replaced
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [r for r in rows if r[4] >= 0],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [r for r in rows if r[4] < 0],
+            )
+            self._conn.commit()
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Deletes every checkpoint and write of a thread."""
+        with self._lock:
+            for table in ("checkpoints", "blobs", "writes"):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,)
+                )
+            self._conn.commit()
+
+    def get_next_version(self, current: str | None, channel: None = None) -> str:
+        # Zero-padded, so versions also sort correctly as text; the random
+        # suffix keeps concurrent branches of a thread from colliding
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -- async API (the same queries, in a worker thread) --------------------
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        checkpoint_tuples = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint_tuple in checkpoint_tuples:
+            yield checkpoint_tuple
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
@@ -0,0 +1,285 @@
+"""
+Registry of evaluation criteria.
+
+Each criterion is plain data: its prompt template, display label, weight in
+the final score, output-token cap and how the paper excerpt it is judged on is
+built. The agent generates its graph nodes, single-call schema and final score
+from the registry, so a deployment can add, remove or cheapen criteria with a
+JSON file (see load_criteria) instead of code edits.
+
+Prompt templates are pre-rendered once, when the Criterion is created; render()
+is a plain str.format on that text and produces exactly what the equivalent
+ChatPromptTemplate.format() would. The module does not import LangChain, so
+loading the registry stays cheap; Criterion.prompt builds the
+ChatPromptTemplate on first access.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field, fields
+from functools import cached_property
+
+# How the paper text sent with a criterion is built:
+# - "sections": an excerpt of the criterion's sections (when headings were
+#   detected), otherwise the paper as fitted to the request budget
+# - "head": the start of the paper, up to input_tokens
+# - "full": the whole paper, ignoring sections and input_tokens, cut only where
+#   it does not fit one request
+EXCERPT_STRATEGIES = ("sections", "head", "full")
+DEFAULT_OUTPUT_TOKENS = 400  # Room for a score + explanation answer
+DEFAULT_INPUT_TOKENS = 1500
+
+_SCORE_FORMAT = (
+    "Your response MUST start with 'Score: ' followed by the numerical score, "
+    "then a newline, and then 'Explanation: ' followed by your detailed explanation"
+)
+
+DEFAULT_CRITERIA = [
+    {
+        "name": "relevance",
+        "label": "Relevance to TCC",
+        "summary": "relevance to the theme",
+        "description": (
+            "Relevance of the paper to the TCC theme and why it is "
+            "(or is not) useful for the TCC"
+        ),
+        "template": (
+            "Analyze the relevance of the following research paper to the provided "
+            "TCC theme. Identify keywords, central concepts, and the research area of "
+            "both to determine the connection. Provide a relevance score between 0 "
+            f"and 1, where 1 indicates high relevance. {_SCORE_FORMAT} about the "
+            "relevance and why the paper is (or is not) useful for the TCC.\n\n"
+            "Article Theme: {article_theme}\n\nResearch Paper: {research_paper}"
+        ),
+        "weight": 0.20,
+        "input_tokens": 1500,
+        "sections": ["abstract", "introduction", "conclusion"],
+    },
+    {
+        "name": "originality",
+        "label": "Originality",
+        "summary": "originality",
+        "description": (
+            "Originality and novelty: new ideas, methodology or results "
+            "that advance the field"
+        ),
+        "template": (
+            "Evaluate the originality and novelty of the following research paper. "
+            "Does it introduce a new idea, methodology, or results that advance the "
+            f"field? Provide an originality score between 0 and 1. {_SCORE_FORMAT}.\n\n"
+            f"Research Paper: {{research_paper}}"
+        ),
+        "weight": 0.15,
+        "input_tokens": 1500,
+        "sections": ["abstract", "introduction", "background", "conclusion"],
+    },
+    {
+        "name": "methodology_quality",
+        "label": "Methodology Quality",
+        "summary": "methodology quality",
+        "description": (
+            "Whether the methodology is clear, appropriate for the "
+            "objectives and robust"
+        ),
+        "template": (
+            "Evaluate the quality of the methodology presented in the following "
+            "research paper. Is the methodology clear, appropriate for the "
+            "objectives, and robust? Provide a methodology quality score between 0 "
+            f"and 1. {_SCORE_FORMAT}.\n\n"
+            f"Research Paper: {{research_paper}}"
+        ),
+        "weight": 0.15,
+        "input_tokens": 2000,
+        "sections": ["methods"],
+    },
+    {
+        "name": "results_discussion_quality",
+        "label": "Results and Discussion Quality",
+        "summary": "results and discussion quality",
+        "description": (
+            "Clarity of the results and soundness of the discussion and conclusions"
+        ),
+        "template": (
+            "Evaluate the quality of the results and discussion in the following "
+            "research paper. Are the results presented clearly? Does the discussion "
+            "correctly interpret the results, and are the conclusions well-founded? "
+            "Provide a results and discussion quality score between 0 and 1. "
+            f"{_SCORE_FORMAT}.\n\n"
+            f"Research Paper: {{research_paper}}"
+        ),
+        "weight": 0.15,
+        "input_tokens": 2000,
+        "sections": ["results", "discussion", "conclusion"],
+    },
+    {
+        "name": "potential_impact",
+        "label": "Potential Impact",
+        "summary": "potential impact",
+        "description": (
+            "Potential impact on the field of study or in practical applications"
+        ),
+        "template": (
+            "Estimate the potential impact of the following research paper in its "
+            "field of study or in practical applications. Does it open new lines of "
+            "research, solve a significant problem, or have important implications? "
+            f"Provide a potential impact score between 0 and 1. {_SCORE_FORMAT}.\n\n"
+            f"Research Paper: {{research_paper}}"
+        ),
+        "weight": 0.15,
+        "input_tokens": 1500,
+        "sections": ["abstract", "discussion", "conclusion"],
+    },
+    {
+        "name": "writing_clarity",
+        "label": "Writing Clarity",
+        "summary": "writing clarity",
+        "description": "Clarity, readability and flow of the writing",
+        "template": (
+            "Evaluate the overall clarity, readability, and flow of the writing in "
+            "the following technical research paper. Is the language precise and "
+            "concise? Are the ideas communicated effectively? Provide a writing "
+            f"clarity score between 0 and 1. {_SCORE_FORMAT}.\n\n"
+            f"Research Paper: {{research_paper}}"
+        ),
+        "weight": 0.10,
+        "input_tokens": 1000,
+        "sections": ["abstract", "introduction"],
+    },
+    {
+        "name": "references_timeliness",
+        "label": "References Timeliness",
+        "summary": "references timeliness",
+        "description": "Timeliness and relevance of the references cited",
+        "template": (
+            "Evaluate the timeliness and relevance of the references cited in the "
+            "following research paper. Does the paper use recent and pertinent "
+            "sources for the field of study? Provide a references timeliness score "
+            f"between 0 and 1. {_SCORE_FORMAT}.\n\n"
+            f"Research Paper: {{research_paper}}"
+        ),
+        "weight": 0.10,
+        "input_tokens": 1500,
+        "sections": ["references"],
+    },
+]
+
+
+@dataclass(frozen=True)
+class Criterion:
+    """
+    One evaluation criterion. Its answers fill the State keys <name>_score and
+    <name>_explanation; the template receives {research_paper} and optionally
+    {article_theme}. excerpt picks the paper text sent with it: "full" is the
+    paper cut to what fits one request with this template and output_tokens.
+    """
+
+    name: str
+    label: str
+    template: str
+    weight: float
+    description: str = ""
+    # Short noun phrase listing the criterion in the single-call prompt
+    summary: str = ""
+    output_tokens: int = DEFAULT_OUTPUT_TOKENS
+    input_tokens: int = DEFAULT_INPUT_TOKENS
+    sections: tuple[str, ...] = ()
+    excerpt: str = "sections"
+
+    fingerprint: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if not self.name.isidentifier():
+            raise ValueError(f"Criterion name {self.name!r} must be a valid identifier")
+        if "{research_paper}" not in self.template:
+            raise ValueError(
+                f"The template of criterion {self.name!r} must contain "
+                f"{{research_paper}}"
+            )
+        if self.excerpt not in EXCERPT_STRATEGIES:
+            raise ValueError(
+                f"Criterion {self.name!r}: excerpt must be one of {EXCERPT_STRATEGIES}"
+            )
+        if self.weight < 0 or self.output_tokens <= 0 or self.input_tokens <= 0:
+            raise ValueError(
+                f"Criterion {self.name!r}: weight must be >= 0 and token limits > 0"
+            )
+        object.__setattr__(self, "sections", tuple(self.sections))
+        object.__setattr__(self, "description", self.description or self.label)
+        object.__setattr__(self, "summary", self.summary or self.label.lower())
+        # What get_buffer_string() makes of the single human message of the template
+        object.__setattr__(self, "_text", f"Human: {self.template}")
+        # Everything that changes the answer (the label and weight do not)
+        definition = {
+            "template": self.template,
+            "output_tokens": self.output_tokens,
+            "input_tokens": self.input_tokens,
+            "sections": self.sections,
+            "excerpt": self.excerpt,
+        }
+        object.__setattr__(
+            self,
+            "fingerprint",
+            hashlib.sha256(
+                json.dumps(definition, sort_keys=True).encode("utf-8")
+            ).hexdigest()[:16],
+        )
+
+    @cached_property
+    def prompt(self):
+        """The template as a ChatPromptTemplate (imports LangChain on first use)."""
+        from langchain_core.prompts import ChatPromptTemplate
+
+        return ChatPromptTemplate.from_template(self.template)
+
+    def render(self, article_theme: str, research_paper: str) -> str:
+        """The prompt text for one paper, identical to prompt.format(...)."""
+        return self._text.format(
+            article_theme=article_theme, research_paper=research_paper
+        )
+
+    def to_dict(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.init}
+
+
+def load_criteria(path: str | None = None) -> list[Criterion]:
+    """
+    The default criteria, adjusted by the JSON file at path when given.
+
+    The file maps criterion names to overrides, e.g.
+        {"writing_clarity": {"weight": 0.05, "excerpt": "head",
+                             "input_tokens": 500},
+         "references_timeliness": null,
+         "reproducibility": {"label": "Reproducibility", "template": "...",
+                             "weight": 0.1}}
+    null removes a criterion; unknown names add one (label, template and weight
+    are then required). Added criteria come after the defaults, in file order.
+    """
+    definitions = {item["name"]: dict(item) for item in DEFAULT_CRITERIA}
+    if path:
+        with open(os.path.expanduser(path), encoding="utf-8") as f:
+            overrides = json.load(f)
+        for name, override in overrides.items():
+            if override is None:
+                definitions.pop(name, None)
+            else:
+                definitions[name] = {
+                    **definitions.get(name, {}),
+                    **override,
+                    "name": name,
+                }
+    if not definitions:
+        raise ValueError("At least one criterion must be configured")
+    try:
+        criteria = [Criterion(**definition) for definition in definitions.values()]
+    except TypeError as e:
+        raise ValueError(f"Invalid criterion definition: {e}") from e
+    if not sum(criterion.weight for criterion in criteria):
+        raise ValueError("The criterion weights must not all be zero")
+    return criteria
+
+
+def registry_fingerprint(criteria) -> str:
+    """Hash of a set of criteria and weights, for whole-evaluation cache keys."""
+    payload = [(c.name, c.fingerprint, c.weight) for c in criteria]
+    return hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()[:16]
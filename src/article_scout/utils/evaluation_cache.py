@@ -0,0 +1,152 @@
+"""
+Persistent, content-addressed cache for evaluation results.
+
+Entries live in a SQLite file keyed by a SHA-256 hash of everything that
+determines a model answer (paper text, theme, model, temperature, prompt
+version, ...). Entries expire after a TTL and the least recently used ones are
+evicted once the cache grows past max_entries.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_MAX_ENTRIES = 10000
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600  # 30 days
+
+
+def make_cache_key(*parts) -> str:
+    """Hashes the given JSON-serialisable parts into a stable cache key."""
+    payload = json.dumps(
+        parts, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EvaluationCache:
+    """
+    SQLite-backed key/value store for evaluation results (JSON dicts).
+
+    Safe to share between threads; hit/miss/eviction counters are kept per
+    process and reported by stats().
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float | None = DEFAULT_TTL_SECONDS,
+        per_criterion: bool = False,
+    ):
+        self.path = path if path == ":memory:" else os.path.expanduser(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # When True the graph nodes also cache each criterion separately, so a
+        # re-run only pays for the criteria that are missing or failed.
+        self.per_criterion = per_criterion
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS evaluations ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_evaluations_accessed"
+            " ON evaluations (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> dict | None:
+        """Returns the cached value for key, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM evaluations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self._expired(row[1], now):
+                self._conn.execute("DELETE FROM evaluations WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE evaluations SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: dict) -> None:
+        """Stores value under key, then applies TTL and size eviction."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO evaluations"
+                " (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Removes every entry (counters are kept)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM evaluations")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus the current number of entries."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM evaluations").fetchone()[
+                0
+            ]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _evict(self, now: float) -> None:
+        # Caller holds the lock
+        if self.ttl_seconds is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM evaluations WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            )
+            self.evictions += cursor.rowcount
+        overflow = (
+            self._conn.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+            - self.max_entries
+        )
+        if overflow > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM evaluations WHERE key IN "
+                "(SELECT key FROM evaluations ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+            self.evictions += cursor.rowcount
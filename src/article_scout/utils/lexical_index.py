@@ -0,0 +1,183 @@
+"""
+Local lexical index for screening papers against a theme before any model call.
+
+Screening a corpus with evaluate_research_paper costs one model call per
+criterion per paper, although most papers are obviously off-theme. The index
+keeps BM25 term statistics of the extracted texts in a SQLite file: papers are
+added incrementally (an unchanged paper is recognised by its fingerprint and
+not re-read), and ranking the corpus against a theme is one query over the
+postings of the theme's terms, which takes milliseconds.
+
+Tokens are lowercased, stripped of accents, filtered against English and
+Portuguese stopwords and crudely de-pluralised, so "Redes Neurais" and "redes
+neurais" or "networks" and "network" match. There is no translation: a theme
+written in Portuguese only matches papers that use the same words.
+"""
+
+import math
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import Counter
+from typing import Iterable, NamedTuple
+
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9]+")
+_STOPWORDS = frozenset(
+    """
+a an and are as at be been but by can for from has have in into is it its of on or
+our such than that the their them then there these they this those through to using
+via was we were which while with within without
+uma umas uns um o os as ao aos de da das do dos e em na nas no nos para por pelo pela
+pelos pelas com sem sobre que se ou mas como entre sua seu suas seus ser sao estudo
+analise uso
+""".split()
+)
+
+
+class SearchHit(NamedTuple):
+    doc_id: str
+    score: float  # BM25 score of the document for the query
+
+
+def tokenize(text: str) -> list[str]:
+    """Index terms of a text: lowercase ASCII words, no stopwords or plural 's'."""
+    text = (
+        unicodedata.normalize("NFKD", text.lower())
+        .encode("ascii", "ignore")
+        .decode("ascii")
+    )
+    terms = []
+    for token in _TOKEN_RE.findall(text):
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+
+class LexicalIndex:
+    """
+    SQLite-backed BM25 index of paper texts, keyed by a caller-chosen doc_id
+    (e.g. the PDF path). Safe to share between threads.
+    """
+
+    def __init__(self, path: str, k1: float = DEFAULT_K1, b: float = DEFAULT_B):
+        self.path = path if path == ":memory:" else os.path.expanduser(path)
+        self.k1 = k1
+        self.b = b
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            " doc_id TEXT PRIMARY KEY,"
+            " length INTEGER NOT NULL,"
+            " fingerprint TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " term TEXT NOT NULL,"
+            " doc_id TEXT NOT NULL,"
+            " tf INTEGER NOT NULL,"
+            " PRIMARY KEY (term, doc_id)) WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_id)"
+        )
+        self._conn.commit()
+
+    def fingerprint(self, doc_id: str) -> str | None:
+        """Fingerprint the document was indexed with, or None when it is not indexed."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint FROM documents WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def add(self, doc_id: str, text: str, fingerprint: str = "") -> None:
+        """Indexes (or re-indexes) a document."""
+        counts = Counter(tokenize(text))
+        with self._lock:
+            self._delete(doc_id)
+            self._conn.execute(
+                "INSERT INTO documents (doc_id, length, fingerprint) VALUES (?, ?, ?)",
+                (doc_id, sum(counts.values()), fingerprint),
+            )
+            self._conn.executemany(
+                "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                [(term, doc_id, tf) for term, tf in counts.items()],
+            )
+            self._conn.commit()
+
+    def remove(self, doc_id: str) -> None:
+        with self._lock:
+            self._delete(doc_id)
+            self._conn.commit()
+
+    def search(
+        self, query: str, doc_ids: Iterable[str] | None = None, top_k: int | None = None
+    ) -> list[SearchHit]:
+        """
+        Documents matching any query term, best BM25 score first. With doc_ids
+        only those documents are ranked (the statistics still cover the whole
+        index); documents sharing no term with the query are not returned.
+        """
+        terms = Counter(tokenize(query))
+        if not terms:
+            return []
+        allowed = set(doc_ids) if doc_ids is not None else None
+        with self._lock:
+            count, total_length = self._conn.execute(
+                "SELECT COUNT(*), SUM(length) FROM documents"
+            ).fetchone()
+            if not count:
+                return []
+            average_length = (total_length or 0) / count or 1.0
+            placeholders = ",".join("?" * len(terms))
+            postings = self._conn.execute(
+                "SELECT p.term, p.doc_id, p.tf, d.length"
+                " FROM postings p JOIN documents d USING (doc_id)"
+                f" WHERE p.term IN ({placeholders})",
+                list(terms),
+            ).fetchall()
+        document_frequency = Counter(term for term, *_ in postings)
+        scores: dict[str, float] = {}
+        for term, doc_id, tf, length in postings:
+            if allowed is not None and doc_id not in allowed:
+                continue
+            df = document_frequency[term]
+            idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+            norm = tf + self.k1 * (1 - self.b + self.b * length / average_length)
+            scores[doc_id] = (
+                scores.get(doc_id, 0.0) + terms[term] * idf * tf * (self.k1 + 1) / norm
+            )
+        hits = sorted(
+            (SearchHit(doc_id, score) for doc_id, score in scores.items()),
+            key=lambda h: -h.score,
+        )
+        return hits[:top_k] if top_k is not None else hits
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def __contains__(self, doc_id: str) -> bool:
+        return self.fingerprint(doc_id) is not None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _delete(self, doc_id: str) -> None:
+        # Caller holds the lock
+        self._conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+        self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
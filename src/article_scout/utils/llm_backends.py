@@ -0,0 +1,359 @@
+"""
+Pluggable chat-model backends for the evaluation graph.
+
+- "groq": the real ChatGroq client.
+- "fake": FakeChatModel, a deterministic offline model that follows the
+  'Score: X\\nExplanation: Y' contract (and answers structured-output/tool
+  requests), with configurable latency distributions and error injection.
+- "record" / "replay": CassetteChatModel, which stores every answer of the
+  real model in a JSON Lines cassette and later serves the same requests from
+  it, so the full pipeline can be benchmarked offline.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+from .evaluation_cache import make_cache_key
+from .tokens import count_tokens
+
+BACKENDS = ("groq", "fake", "record", "replay")
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal", "exponential")
+ERROR_KINDS = ("rate_limit", "server", "malformed")
+
+_CHUNK_PART_RE = re.compile(r"Paper part (\d+)/(\d+):\s*(.*)", re.DOTALL)
+
+
+class FakeAPIError(Exception):
+    """Injected API failure shaped like the Groq client's errors (status, headers)."""
+
+    def __init__(self, status_code: int, retry_after: float | None = None):
+        super().__init__(f"Injected API error {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": f"{retry_after:g}"} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+class CassetteMissError(LookupError):
+    """A replayed request has no recorded answer in the cassette."""
+
+
+def _prompt_text(messages) -> str:
+    return "\n".join(
+        m.content if isinstance(m.content, str) else str(m.content) for m in messages
+    )
+
+
+def _unit_hash(*parts: str) -> float:
+    """Deterministic number in [0, 1) derived from the given strings."""
+    digest = hashlib.sha256("\x00".join(parts).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2**64
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic offline stand-in for ChatGroq.
+
+    The score for a prompt is derived from a hash of the prompt (or fixed with
+    `score`), so repeated runs give identical results. Chunk-summary prompts
+    get a short summary instead of a score. Latency is sampled from
+    `latency_distribution` with the given mean and standard deviation, and a
+    fraction `error_rate` of calls fails with `error_kind`. Sampling uses a
+    seeded generator, so a run is reproducible for a given call order.
+    """
+
+    model_name: str = "fake"
+    score: float | None = None
+    latency_distribution: str = "constant"
+    latency_mean: float = 0.0
+    latency_stddev: float = 0.0
+    error_rate: float = 0.0
+    error_kind: str = "rate_limit"
+    retry_after: float | None = None
+    seed: int = 0
+
+    _rng: random.Random = PrivateAttr()
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _calls: int = PrivateAttr(default=0)
+    _errors: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any) -> None:
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"latency_distribution must be one of {LATENCY_DISTRIBUTIONS}"
+            )
+        if self.error_kind not in ERROR_KINDS:
+            raise ValueError(f"error_kind must be one of {ERROR_KINDS}")
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    @property
+    def stats(self) -> dict:
+        return {"calls": self._calls, "errors": self._errors}
+
+    def bind_tools(self, tools, tool_choice=None, **kwargs):
+        return self.bind(
+            tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs
+        )
+
+    def _sample(self) -> tuple[float, bool]:
+        """Latency for the next call and whether it fails."""
+        mean, stddev = self.latency_mean, self.latency_stddev
+        with self._lock:
+            self._calls += 1
+            if self.latency_distribution == "uniform":
+                half_width = stddev * math.sqrt(3)
+                latency = self._rng.uniform(mean - half_width, mean + half_width)
+            elif self.latency_distribution == "normal":
+                latency = self._rng.gauss(mean, stddev)
+            elif self.latency_distribution == "lognormal" and mean > 0:
+                sigma2 = math.log(1 + (stddev / mean) ** 2)
+                latency = self._rng.lognormvariate(
+                    math.log(mean) - sigma2 / 2, math.sqrt(sigma2)
+                )
+            elif self.latency_distribution == "exponential" and mean > 0:
+                latency = self._rng.expovariate(1 / mean)
+            else:
+                latency = mean
+            failed = self._rng.random() < self.error_rate
+            self._errors += failed
+        return max(latency, 0.0), failed
+
+    def _score_for(self, *parts: str) -> float:
+        if self.score is not None:
+            return self.score
+        return round(_unit_hash(self.model_name, *parts), 2)
+
+    def _answer(self, messages, failed: bool, **kwargs) -> AIMessage:
+        if failed and self.error_kind == "rate_limit":
+            raise FakeAPIError(429, self.retry_after)
+        if failed and self.error_kind == "server":
+            raise FakeAPIError(500)
+
+        prompt = _prompt_text(messages)
+        tool_calls = []
+        if failed:
+            content = "I am unable to evaluate this paper."
+        elif chunk := _CHUNK_PART_RE.search(prompt):
+            index, total, text = chunk.groups()
+            content = f"Summary of part {index}/{total}: {' '.join(text.split()[:40])}"
+        elif kwargs.get("tools"):
+            content = ""
+            function = kwargs["tools"][0]["function"]
+            args = {
+                field: {
+                    "score": self._score_for(prompt, field),
+                    "explanation": (
+                        f"Deterministic fake assessment of {field} "
+                        f"({len(prompt)} characters)."
+                    ),
+                }
+                for field in function.get("parameters", {}).get("properties", {})
+            }
+            tool_calls = [
+                {
+                    "name": function["name"],
+                    "args": args,
+                    "id": "call_fake",
+                    "type": "tool_call",
+                }
+            ]
+        else:
+            content = (
+                f"Score: {self._score_for(prompt)}\n"
+                "Explanation: Deterministic fake assessment of "
+                f"{len(prompt)} characters."
+            )
+
+        input_tokens = count_tokens(prompt)
+        output_tokens = count_tokens(content) + (
+            40 * len(tool_calls[0]["args"]) if tool_calls else 0
+        )
+        return AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            response_metadata={"model_name": self.model_name},
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        latency, failed = self._sample()
+        time.sleep(latency)
+        return ChatResult(
+            generations=[
+                ChatGeneration(message=self._answer(messages, failed, **kwargs))
+            ]
+        )
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        latency, failed = self._sample()
+        await asyncio.sleep(latency)
+        return ChatResult(
+            generations=[
+                ChatGeneration(message=self._answer(messages, failed, **kwargs))
+            ]
+        )
+
+
+class CassetteChatModel(BaseChatModel):
+    """
+    Record/replay wrapper around a chat model.
+
+    In "record" mode every request is sent to `inner` and its answer appended
+    to the cassette file (requests already in the cassette are served from it).
+    In "replay" mode only the cassette is used and an unknown request raises
+    CassetteMissError. Requests are keyed by model name, messages and call
+    options (max_tokens, tools, ...).
+    """
+
+    model_name: str
+    path: str
+    mode: str = "replay"
+    inner: BaseChatModel | None = None
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _entries: dict = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any) -> None:
+        if self.mode not in ("record", "replay"):
+            raise ValueError("mode must be 'record' or 'replay'")
+        if self.mode == "record" and self.inner is None:
+            raise ValueError("record mode needs an inner model")
+        self.path = os.path.expanduser(self.path)
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry["message"]
+
+    @property
+    def _llm_type(self) -> str:
+        return "cassette-chat-model"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def bind_tools(self, tools, tool_choice=None, **kwargs):
+        # The real model translates the tools, so recorded requests match its own
+        if self.inner is not None:
+            return self.bind(
+                **self.inner.bind_tools(tools, tool_choice=tool_choice, **kwargs).kwargs
+            )
+        bound = {"tools": [convert_to_openai_tool(tool) for tool in tools], **kwargs}
+        if tool_choice is not None:
+            bound["tool_choice"] = tool_choice
+        return self.bind(**bound)
+
+    def _key(self, messages, stop, kwargs: dict) -> str:
+        # Tools are keyed by name only (the real model and replay format them apart)
+        options = {
+            k: v
+            for k, v in kwargs.items()
+            if k not in ("tools", "tool_choice", "ls_structured_output_format")
+        }
+        tools = [
+            convert_to_openai_tool(tool)["function"]["name"]
+            for tool in kwargs.get("tools") or []
+        ]
+        return make_cache_key(
+            self.model_name,
+            [(m.type, m.content) for m in messages],
+            stop,
+            tools,
+            json.loads(json.dumps(options, sort_keys=True, default=str)),
+        )
+
+    def _lookup(self, key: str) -> AIMessage | None:
+        with self._lock:
+            stored = self._entries.get(key)
+        if stored is not None:
+            return messages_from_dict([stored])[0]
+        if self.mode == "replay":
+            raise CassetteMissError(
+                f"No recorded answer in {self.path} for request {key[:12]}"
+            )
+        return None
+
+    def _record(self, key: str, message: AIMessage) -> None:
+        stored = message_to_dict(message)
+        with self._lock:
+            self._entries[key] = stored
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(
+                    json.dumps({"key": key, "message": stored}, ensure_ascii=False)
+                    + "\n"
+                )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = self._key(messages, stop, kwargs)
+        message = self._lookup(key)
+        if message is None:
+            message = self.inner.invoke(messages, stop=stop, **kwargs)
+            self._record(key, message)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        key = self._key(messages, stop, kwargs)
+        message = self._lookup(key)
+        if message is None:
+            message = await self.inner.ainvoke(messages, stop=stop, **kwargs)
+            self._record(key, message)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def make_chat_model(
+    model_name: str,
+    temperature: float,
+    backend: str = "groq",
+    cassette_path: str | None = None,
+    **fake_options,
+) -> BaseChatModel:
+    """
+    Builds the chat model for one backend. fake_options are passed to
+    FakeChatModel (latency_distribution, latency_mean, error_rate, ...).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend {backend!r}; expected one of {BACKENDS}")
+    if backend == "fake":
+        return FakeChatModel(model_name=model_name, **fake_options)
+    if backend == "replay":
+        return CassetteChatModel(
+            model_name=model_name, path=cassette_path, mode="replay"
+        )
+
+    from langchain_groq import ChatGroq
+
+    # Retries are left to the agent's rate limiter, which also paces the calls
+    groq_model = ChatGroq(model=model_name, temperature=temperature, max_retries=0)
+    if backend == "record":
+        return CassetteChatModel(
+            model_name=model_name, path=cassette_path, mode="record", inner=groq_model
+        )
+    return groq_model
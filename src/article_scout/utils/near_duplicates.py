@@ -0,0 +1,232 @@
+"""
+Near-duplicate detection of paper texts (MinHash with LSH banding).
+
+The same paper arrives as an arXiv preprint, the camera-ready version or a
+re-upload with different bytes, so the exact-text cache key misses although
+the evaluation would be the same. Texts are normalised (lowercase, words
+only, line-break hyphenation joined, so PDF layout does not matter) and cut
+into overlapping word shingles; a MinHash signature estimates the Jaccard
+similarity of two shingle sets and LSH banding finds the candidates sharing a
+band without comparing against every stored paper.
+
+Signatures use one-permutation hashing with rotation densification: each
+shingle is hashed once and kept in one of num_perm bins, which costs one pass
+over the text instead of num_perm hash functions per shingle.
+
+Entries live in a SQLite file and point at the key of the stored result (see
+EvaluationCache); they are partitioned by a scope string, so only papers
+evaluated with the same theme, model, prompts and mode are ever matched.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+from typing import NamedTuple
+
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 16  # 16 bands of 8 rows: pairs above ~0.7 similarity become candidates
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_SHINGLE_SIZE = 5
+
+_MAX_HASH = (1 << 64) - 1
+_WORD_RE = re.compile(r"\w+")
+# A word hyphenated at a line break ("evalu-\nation")
+_HYPHENATION_RE = re.compile(r"(\w)-[ \t]*\r?\n\s*(\w)")
+
+
+class NearDuplicate(NamedTuple):
+    key: str  # Key the matched paper's result was stored under
+    similarity: float  # Estimated Jaccard similarity of the two shingle sets
+    title: str  # First line of the matched paper, to report the match
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+def shingles(text: str, size: int = DEFAULT_SHINGLE_SIZE) -> set[bytes]:
+    """Overlapping word n-grams of the normalised text (or the whole, if shorter)."""
+    words = _WORD_RE.findall(_HYPHENATION_RE.sub(r"\1\2", text).lower())
+    if len(words) <= size:
+        return {" ".join(words).encode("utf-8")} if words else set()
+    return {
+        " ".join(words[i : i + size]).encode("utf-8")
+        for i in range(len(words) - size + 1)
+    }
+
+
+def minhash_signature(
+    text: str,
+    num_perm: int = DEFAULT_NUM_PERM,
+    shingle_size: int = DEFAULT_SHINGLE_SIZE,
+) -> list[int]:
+    """
+    MinHash signature of the text's shingles (one-permutation hashing). Empty
+    bins take the value of the next non-empty bin, offset by the distance, so
+    every position stays comparable between signatures.
+    """
+    bins = [_MAX_HASH] * num_perm
+    for shingle in shingles(text, shingle_size):
+        value = _hash64(shingle)
+        index, rest = value % num_perm, value // num_perm
+        if rest < bins[index]:
+            bins[index] = rest
+    if all(value == _MAX_HASH for value in bins):
+        return bins
+    signature = []
+    for index in range(num_perm):
+        offset = 0
+        while bins[(index + offset) % num_perm] == _MAX_HASH:
+            offset += 1
+        signature.append(
+            bins[(index + offset) % num_perm] + offset * (_MAX_HASH // num_perm)
+        )
+    return signature
+
+
+def estimate_similarity(signature_a: list[int], signature_b: list[int]) -> float:
+    """Fraction of equal signature positions, an estimate of the Jaccard similarity."""
+    if not signature_a or len(signature_a) != len(signature_b):
+        return 0.0
+    return sum(a == b for a, b in zip(signature_a, signature_b)) / len(signature_a)
+
+
+def _title(text: str) -> str:
+    return next((line.strip() for line in text.splitlines() if line.strip()), "")[:120]
+
+
+class NearDuplicateIndex:
+    """
+    SQLite-backed MinHash/LSH index from paper texts to stored result keys.
+
+    Safe to share between threads. query() returns the most similar stored
+    paper of the same scope whose estimated similarity reaches threshold.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        threshold: float = DEFAULT_THRESHOLD,
+        num_perm: int = DEFAULT_NUM_PERM,
+        bands: int = DEFAULT_BANDS,
+        shingle_size: int = DEFAULT_SHINGLE_SIZE,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.path = path if path == ":memory:" else os.path.expanduser(path)
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS papers ("
+            " key TEXT PRIMARY KEY,"
+            " scope TEXT NOT NULL,"
+            " signature BLOB NOT NULL,"
+            " title TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bands ("
+            " scope TEXT NOT NULL,"
+            " band INTEGER NOT NULL,"
+            " hash TEXT NOT NULL,"
+            " key TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_bands_lookup ON bands (scope, band, hash)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_bands_key ON bands (key)")
+        self._conn.commit()
+
+    def signature(self, text: str) -> list[int]:
+        return minhash_signature(text, self.num_perm, self.shingle_size)
+
+    def add(self, key: str, scope: str, text: str) -> None:
+        """Indexes text as the paper stored under key (replacing an earlier entry)."""
+        signature = self.signature(text)
+        with self._lock:
+            self._conn.execute("DELETE FROM bands WHERE key = ?", (key,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO papers"
+                " (key, scope, signature, title, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, scope, self._pack(signature), _title(text), time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO bands (scope, band, hash, key) VALUES (?, ?, ?, ?)",
+                [
+                    (scope, band, band_hash, key)
+                    for band, band_hash in enumerate(self._band_hashes(signature))
+                ],
+            )
+            self._conn.commit()
+
+    def query(self, text: str, scope: str) -> NearDuplicate | None:
+        """The most similar paper of scope at or above the threshold, or None."""
+        signature = self.signature(text)
+        with self._lock:
+            candidates = set()
+            for band, band_hash in enumerate(self._band_hashes(signature)):
+                candidates.update(
+                    row[0]
+                    for row in self._conn.execute(
+                        "SELECT key FROM bands"
+                        " WHERE scope = ? AND band = ? AND hash = ?",
+                        (scope, band, band_hash),
+                    )
+                )
+            best = None
+            for key in candidates:
+                stored, title = self._conn.execute(
+                    "SELECT signature, title FROM papers WHERE key = ?", (key,)
+                ).fetchone()
+                similarity = estimate_similarity(signature, self._unpack(stored))
+                if similarity >= self.threshold and (
+                    best is None or similarity > best.similarity
+                ):
+                    best = NearDuplicate(key, similarity, title)
+        return best
+
+    def remove(self, key: str) -> None:
+        """Drops the entry of key (e.g. when its stored result has expired)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM papers WHERE key = ?", (key,))
+            self._conn.execute("DELETE FROM bands WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _band_hashes(self, signature: list[int]) -> list[str]:
+        rows = self.num_perm // self.bands
+        return [
+            hashlib.blake2b(
+                self._pack(signature[band * rows : (band + 1) * rows]), digest_size=8
+            ).hexdigest()
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def _pack(signature: list[int]) -> bytes:
+        return struct.pack(f">{len(signature)}Q", *signature)
+
+    @staticmethod
+    def _unpack(data: bytes) -> list[int]:
+        return list(struct.unpack(f">{len(data) // 8}Q", data))
@@ -0,0 +1,133 @@
+"""
+Tolerant parsing of criterion answers.
+
+The criterion prompts ask for 'Score: X\nExplanation: Y' with a score between
+0 and 1, but models drift: they answer in JSON (sometimes inside a Markdown
+code fence), decorate the labels ('**Score:** 0.8', 'Rating - 7'), or score
+out of 10 or as a percentage. parse_score_response accepts all of these and
+normalises the score to 0-1; it raises ValueError only when no usable score
+can be found, so the caller can re-ask the model (see the agent's repair step).
+"""
+
+import json
+import re
+
+DEFAULT_EXPLANATION = "No explanation provided."
+
+_SCORE_KEYS = ("score", "rating", "grade")
+_EXPLANATION_KEYS = (
+    "explanation",
+    "justification",
+    "reasoning",
+    "reason",
+    "rationale",
+    "comment",
+)
+
+_NUMBER = r"(\d+(?:[.,]\d+)?)"
+# A score label, optional Markdown emphasis and separator, the number and a scale
+_SCORE_RE = re.compile(
+    r"\b(?:score|rating|grade)\b[*_\s]*(?:\([^)]*\))?[*_\s]*(?:[:=\-–]|is|of)?[*_\s]*"
+    + _NUMBER
+    + r"\s*(%|/\s*(?:10|1|100)\b|out\s+of\s+(?:10|1|100)\b)?",
+    re.IGNORECASE,
+)
+# A bare '7/10' or '0.8 out of 1' anywhere in the text
+_FRACTION_RE = re.compile(
+    _NUMBER + r"\s*(/\s*(?:10|100)\b|out\s+of\s+(?:10|100)\b)", re.IGNORECASE
+)
+# The contract's own label, anywhere; then other labels at the start of a line
+_CONTRACT_EXPLANATION_RE = re.compile(r"Explanation:[*_\s]*(.*)", re.DOTALL)
+_EXPLANATION_RE = re.compile(
+    r"(?:^|\n)[#*_\s]*(?:explanation|justification|reasoning|reason|rationale)"
+    r"[*_\s]*[:\-–][*_\s]*(.*)",
+    re.IGNORECASE | re.DOTALL,
+)
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def normalize_score(value: float, scale: str | None = None) -> float:
+    """
+    Maps a score to 0-1. An explicit scale ('/10', 'out of 100', '%') is
+    honoured; otherwise scores above 1 are read as out of 10. Raises
+    ValueError for negative scores or scores beyond the scale.
+    """
+    if scale:
+        scale = scale.replace(" ", "").lower()
+        divisor = (
+            100
+            if scale == "%" or scale.endswith("100")
+            else 10 if scale.endswith("10") else 1
+        )
+    else:
+        divisor = 1 if value <= 1 else 10
+    score = value / divisor
+    if not 0 <= score <= 1:
+        raise ValueError(f"Score {value} is outside the expected range")
+    return score
+
+
+def _to_number(text: str) -> float:
+    return float(text.replace(",", "."))
+
+
+def _parse_json(content: str) -> tuple[float, str] | None:
+    """Score and explanation from a JSON object in the answer, or None without one."""
+    match = _JSON_OBJECT_RE.search(content)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    fields = {str(key).lower(): value for key, value in data.items()}
+    raw_score = next((fields[key] for key in _SCORE_KEYS if key in fields), None)
+    if raw_score is None:
+        return None
+    if isinstance(raw_score, str):
+        text_score = _SCORE_RE.search(f"score: {raw_score}")
+        if not text_score:
+            return None
+        score = normalize_score(_to_number(text_score.group(1)), text_score.group(2))
+    elif isinstance(raw_score, (int, float)) and not isinstance(raw_score, bool):
+        score = normalize_score(float(raw_score))
+    else:
+        return None
+    explanation = next(
+        (fields[key] for key in _EXPLANATION_KEYS if key in fields), None
+    )
+    return score, str(explanation).strip() if explanation else DEFAULT_EXPLANATION
+
+
+def parse_score_response(content: str) -> tuple[float, str]:
+    """
+    The (score, explanation) of a criterion answer, score normalised to 0-1.
+    Tries, in order: a JSON object, a labelled score ('Score: 0.8',
+    '**Rating:** 7/10', 'score = 80%') and a bare fraction ('7/10').
+    The explanation is the labelled explanation when present, otherwise the
+    rest of the answer. Raises ValueError when no score can be found.
+    """
+    parsed = _parse_json(content)
+    if parsed is not None:
+        return parsed
+
+    match = _SCORE_RE.search(content) or _FRACTION_RE.search(content)
+    if not match:
+        raise ValueError(f"Could not extract score from: {content}")
+    score = normalize_score(_to_number(match.group(1)), match.group(2))
+
+    explanation_match = _CONTRACT_EXPLANATION_RE.search(
+        content
+    ) or _EXPLANATION_RE.search(content)
+    if explanation_match:
+        explanation = explanation_match.group(1).strip()
+    else:
+        # Whatever surrounds the score line is the model's reasoning (or, for a
+        # one-line answer, the whole answer)
+        line_start = content.rfind("\n", 0, match.start()) + 1
+        line_end = content.find("\n", match.end())
+        rest = content[:line_start] + (content[line_end:] if line_end != -1 else "")
+        explanation = rest.strip() or content.strip()
+    return score, explanation or DEFAULT_EXPLANATION
@@ -1,76 +1,122 @@
+import logging
 import os
 import sys
+import time
 
-def extract_text_from_pdf(pdf_path: str, max_tokens: int = 20000) -> str:
+from . import telemetry
+from .tokens import count_tokens, fit_to_tokens
+
+# Métodos de extração, na ordem em que são tentados
+EXTRACTION_METHODS = ("pypdf2", "pdfminer", "pymupdf")
+# Limite padrão de tokens do texto extraído
+DEFAULT_MAX_TOKENS = 20000
+
+
+def extraction_max_tokens(map_reduce: bool = False) -> int | None:
+    """
+    Limite de tokens da extração para uma avaliação: nenhum no modo map-reduce,
+    que divide o texto inteiro em partes dentro de MAP_REDUCE_TOKEN_BUDGET
+    """
+    return None if map_reduce else DEFAULT_MAX_TOKENS
+
+
+def extract_text_from_pdf(
+    pdf_path: str, max_tokens: int | None = DEFAULT_MAX_TOKENS
+) -> str:
     """
     Extrai texto de um arquivo PDF usando múltiplos métodos.
-    
+
     Args:
         pdf_path (str): Caminho para o arquivo PDF
-        max_tokens (int): Número máximo de tokens (aproximadamente 4 caracteres por token)
-    
+        max_tokens (int | None): Número máximo de tokens (contados com o
+            tokenizador, ver utils/tokens.py); None não trunca o texto
+
     Returns:
         str: Texto extraído do PDF, truncado se necessário
     """
     if not os.path.exists(pdf_path):
-        print(f"Erro: Arquivo não encontrado: {pdf_path}")
+        telemetry.log("pdf_not_found", logging.ERROR, path=pdf_path)
+        return ""
+
+    with telemetry.span("extract_text_from_pdf", path=pdf_path) as span:
+        # Método 1: PyPDF2, método 2: pdfminer.six, método 3: pymupdf (fitz)
+        for method, extract in zip(
+            EXTRACTION_METHODS, (try_pypdf2, try_pdfminer, try_pymupdf)
+        ):
+            text = extract(pdf_path)
+            if text.strip():
+                span.set_attribute("method", method)
+                span.set_attribute("chars", len(text))
+                telemetry.log(
+                    "pdf_text_extracted", method=method, chars=len(text), path=pdf_path
+                )
+                if max_tokens is None:
+                    return text
+                return truncate_text(text, max_tokens)
+
+        span.set_attribute("method", None)
+        telemetry.log("pdf_extraction_failed", logging.WARNING, path=pdf_path)
         return ""
-    
-    print(f"Tentando extrair texto de: {pdf_path}")
-    
-    # Método 1: PyPDF2
-    text = try_pypdf2(pdf_path)
-    if text.strip():
-        print(f"PyPDF2 extraiu {len(text)} caracteres")
-        return truncate_text(text, max_tokens)
-    
-    # Método 2: pdfminer.six
-    text = try_pdfminer(pdf_path)
-    if text.strip():
-        print(f"pdfminer extraiu {len(text)} caracteres")
-        return truncate_text(text, max_tokens)
-    
-    # Método 3: pymupdf (fitz)
-    text = try_pymupdf(pdf_path)
-    if text.strip():
-        print(f"PyMuPDF extraiu {len(text)} caracteres")
-        return truncate_text(text, max_tokens)
-    
-    print("Nenhum método conseguiu extrair texto do PDF")
-    return ""
+
+
+def extract_text_timed(
+    pdf_path: str, max_tokens: int | None = DEFAULT_MAX_TOKENS
+) -> tuple[str, float]:
+    """
+    extract_text_from_pdf que também devolve os segundos gastos na extração.
+    Usada pelos processos de extração do pipeline em lote (batch.evaluate_pipeline).
+    """
+    start = time.perf_counter()
+    text = extract_text_from_pdf(pdf_path, max_tokens)
+    return text, time.perf_counter() - start
+
 
 def try_pypdf2(pdf_path: str) -> str:
     """Tenta extrair texto usando PyPDF2"""
     try:
         import PyPDF2
+
         text = ""
-        with open(pdf_path, 'rb') as file:
+        with open(pdf_path, "rb") as file:
             reader = PyPDF2.PdfReader(file)
             for page in reader.pages:
                 page_text = page.extract_text() or ""
                 text += page_text
         return text
     except Exception as e:
-        print(f"PyPDF2 falhou: {e}")
+        telemetry.log(
+            "pdf_method_failed", logging.WARNING, method="pypdf2", error=str(e)
+        )
         return ""
 
+
 def try_pdfminer(pdf_path: str) -> str:
     """Tenta extrair texto usando pdfminer.six"""
     try:
         from pdfminer.high_level import extract_text
+
         text = extract_text(pdf_path)
         return text
     except ImportError:
-        print("pdfminer.six não está instalado")
+        telemetry.log(
+            "pdf_method_unavailable",
+            logging.DEBUG,
+            method="pdfminer",
+            package="pdfminer.six",
+        )
         return ""
     except Exception as e:
-        print(f"pdfminer falhou: {e}")
+        telemetry.log(
+            "pdf_method_failed", logging.WARNING, method="pdfminer", error=str(e)
+        )
         return ""
 
+
 def try_pymupdf(pdf_path: str) -> str:
     """Tenta extrair texto usando PyMuPDF (fitz)"""
     try:
         import fitz  # PyMuPDF
+
         text = ""
         doc = fitz.open(pdf_path)
         for page in doc:
@@ -78,23 +124,30 @@ def try_pymupdf(pdf_path: str) -> str:
         doc.close()
         return text
     except ImportError:
-        print("PyMuPDF não está instalado")
+        telemetry.log(
+            "pdf_method_unavailable", logging.DEBUG, method="pymupdf", package="PyMuPDF"
+        )
         return ""
     except Exception as e:
-        print(f"PyMuPDF falhou: {e}")
+        telemetry.log(
+            "pdf_method_failed", logging.WARNING, method="pymupdf", error=str(e)
+        )
         return ""
 
+
 def truncate_text(text: str, max_tokens: int) -> str:
-    """Trunca o texto para caber no limite de tokens da API"""
-    max_chars = max_tokens * 4  # Aproximadamente 4 caracteres por token
-    if len(text) > max_chars:
-        truncated = text[:max_chars]
-        print(f"Texto truncado para {max_tokens} tokens ({len(truncated)} caracteres)")
+    """Trunca o texto ao limite de tokens da API, cortando no fim de uma frase"""
+    if count_tokens(text) > max_tokens:
+        truncated = fit_to_tokens(text, max_tokens)
+        telemetry.log(
+            "pdf_text_truncated", tokens=count_tokens(truncated), chars=len(truncated)
+        )
         return truncated
     return text
 
+
 if __name__ == "__main__":
-    # Teste direto
+    # Teste direto: python -m article_scout.utils.pdf_extractor arquivo.pdf
     if len(sys.argv) > 1:
         pdf_file = sys.argv[1]
         text = extract_text_from_pdf(pdf_file)
@@ -104,4 +157,4 @@ if __name__ == "__main__":
         else:
             print("Nenhum texto foi extraído")
     else:
-        print("Uso: python pdf_extractor.py <caminho_do_pdf>") 
\ No newline at end of file
+        print("Uso: python pdf_extractor.py <caminho_do_pdf>")
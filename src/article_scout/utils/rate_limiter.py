@@ -0,0 +1,301 @@
+"""
+Client-side rate limiting for model calls.
+
+One RateLimiter is shared by every model call of the process (threads and
+asyncio tasks alike). It keeps requests and tokens under the provider's
+per-minute limits with two token buckets, retries rate-limit (429) and server
+errors with jittered exponential backoff that honours Retry-After, and adapts
+the number of concurrent calls with AIMD: the limit grows by one per round of
+successful calls and is halved on a 429 (or reduced when latency climbs past
+the target), so throughput settles just under the provider limit.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+def _status_code(exc: BaseException) -> int | None:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    return _status_code(exc) == 429 or type(exc).__name__ == "RateLimitError"
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Rate limits, server errors and dropped connections are worth retrying."""
+    if is_rate_limit_error(exc):
+        return True
+    status = _status_code(exc)
+    if status is not None:
+        return status >= 500
+    return type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Reads Retry-After (seconds or an HTTP date) from the error's response, if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class TokenBucket:
+    """
+    Refills at per_minute / 60 units per second up to per_minute units.
+
+    Callers reserve units up front and may drive the balance negative; the
+    returned wait is how long they must sleep before their reservation is
+    covered. Reservations are therefore served in arrival order.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.available = min(
+            self.capacity, self.available + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Takes amount (capped at capacity); returns the seconds to wait for it."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.available -= min(amount, self.capacity)
+            return max(-self.available / self.rate, 0.0)
+
+    def adjust(self, delta: float) -> None:
+        """Returns (positive delta) or charges (negative delta) units after the fact."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.available = min(self.capacity, self.available + delta)
+
+
+class RateLimiter:
+    """
+    Shared limiter for model calls: request and token buckets, bounded retries
+    and AIMD concurrency. A per-minute limit of 0 disables that bucket.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        target_latency: float = 30.0,
+    ):
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.target_latency = target_latency
+
+        self.concurrency_limit = float(max_concurrency)
+        self.active = 0
+        self.peak_active = 0
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.throttled_seconds = 0.0
+        self._last_decrease = 0.0
+        self._slots = threading.Condition()
+        # (event loop, future) of each async caller waiting for a slot
+        self._async_waiters = []
+
+    # -- concurrency slots ------------------------------------------------
+
+    def _try_take_slot(self) -> bool:
+        # Caller holds self._slots
+        if self.active < int(self.concurrency_limit):
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            return True
+        return False
+
+    def _take_slot(self) -> None:
+        with self._slots:
+            while not self._try_take_slot():
+                self._slots.wait()
+
+    async def _atake_slot(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._slots:
+                if self._try_take_slot():
+                    return
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            finally:
+                with self._slots:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+
+    def _notify_waiters(self) -> None:
+        # Caller holds self._slots. Wakes every waiting thread and task; each
+        # one checks for a free slot again.
+        self._slots.notify_all()
+        for loop, waiter in self._async_waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                pass  # Its event loop is closed
+        self._async_waiters.clear()
+
+    def _release_slot(self) -> None:
+        with self._slots:
+            self.active -= 1
+            self._notify_waiters()
+
+    # -- AIMD -------------------------------------------------------------
+
+    def _on_success(self, latency: float) -> None:
+        with self._slots:
+            self.calls += 1
+            if latency > self.target_latency:
+                self._decrease(0.9)
+            else:
+                # +1 per round of `limit` successful calls
+                self.concurrency_limit = min(
+                    self.max_concurrency,
+                    self.concurrency_limit + 1.0 / self.concurrency_limit,
+                )
+            self._notify_waiters()
+
+    def _on_failure(self, exc: BaseException) -> None:
+        with self._slots:
+            if is_rate_limit_error(exc):
+                self.rate_limited += 1
+                self._decrease(0.5)
+
+    def _decrease(self, factor: float) -> None:
+        # Caller holds self._slots. Calls already in flight when the limit was
+        # cut report the same congestion, so cut at most once per second.
+        now = time.monotonic()
+        if now - self._last_decrease >= 1.0:
+            self.concurrency_limit = max(
+                self.min_concurrency, self.concurrency_limit * factor
+            )
+            self._last_decrease = now
+
+    # -- calls ------------------------------------------------------------
+
+    def _reserve(self, tokens: int) -> float:
+        wait = self.requests.reserve(1) if self.requests else 0.0
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        with self._slots:
+            self.throttled_seconds += wait
+        return wait
+
+    def _count_retry(self) -> None:
+        with self._slots:
+            self.retries += 1
+
+    def _backoff(self, attempt: int, exc: BaseException) -> float:
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None:
+            # Small jitter so callers told the same Retry-After do not return together
+            return retry_after + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def _record_usage(self, tokens: int, result, usage) -> None:
+        actual = usage(result) if usage and self.tokens else None
+        if actual is not None:
+            self.tokens.adjust(tokens - actual)
+
+    def call(self, fn, tokens: int = 0, usage=None):
+        """
+        Runs fn() once the buckets allow a request of `tokens` estimated tokens,
+        retrying retryable errors. usage(result), if given, returns the real
+        token count so the token bucket can be corrected. The buckets are waited
+        for before a concurrency slot is taken, so a throttled call never holds one.
+        """
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._reserve(tokens))
+            self._take_slot()
+            try:
+                start = time.monotonic()
+                result = fn()
+            except Exception as e:
+                self._on_failure(e)
+                if attempt == self.max_retries or not is_retryable_error(e):
+                    raise
+                delay = self._backoff(attempt, e)
+            else:
+                self._on_success(time.monotonic() - start)
+                self._record_usage(tokens, result, usage)
+                return result
+            finally:
+                self._release_slot()
+            self._count_retry()
+            time.sleep(delay)
+
+    async def acall(self, fn, tokens: int = 0, usage=None):
+        """Async counterpart of call; fn() returns an awaitable."""
+        for attempt in range(self.max_retries + 1):
+            if wait := self._reserve(tokens):
+                await asyncio.sleep(wait)
+            await self._atake_slot()
+            try:
+                start = time.monotonic()
+                result = await fn()
+            except Exception as e:
+                self._on_failure(e)
+                if attempt == self.max_retries or not is_retryable_error(e):
+                    raise
+                delay = self._backoff(attempt, e)
+            else:
+                self._on_success(time.monotonic() - start)
+                self._record_usage(tokens, result, usage)
+                return result
+            finally:
+                self._release_slot()
+            self._count_retry()
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "throttled_seconds": round(self.throttled_seconds, 3),
+            "concurrency_limit": round(self.concurrency_limit, 2),
+            "peak_active": self.peak_active,
+        }
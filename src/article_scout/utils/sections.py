@@ -0,0 +1,209 @@
+"""
+Splits extracted paper text into sections and builds per-criterion excerpts,
+plus fixed-size chunking for long-document (map-reduce) evaluation.
+
+Headings are detected line by line (English and Portuguese, optionally
+numbered, e.g. "3. Methodology" or "II. RELATED WORK") and mapped onto a small
+set of canonical section names. Each section is reported with character
+offsets into the original text.
+"""
+
+import re
+from typing import NamedTuple
+
+
+class Section(NamedTuple):
+    """A canonical section of the paper, as [start, end) offsets into its text."""
+
+    name: str
+    start: int
+    end: int
+
+
+# Canonical section name -> heading keywords
+SECTION_HEADINGS = {
+    "abstract": ["abstract", "summary", "resumo"],
+    "introduction": ["introduction", "introdução", "introducao"],
+    "background": [
+        "background",
+        "related work",
+        "related works",
+        "literature review",
+        "prior work",
+        "trabalhos relacionados",
+        "revisão da literatura",
+        "revisao da literatura",
+        "referencial teórico",
+        "referencial teorico",
+        "fundamentação teórica",
+        "fundamentacao teorica",
+    ],
+    "methods": [
+        "methods",
+        "method",
+        "methodology",
+        "materials and methods",
+        "approach",
+        "proposed method",
+        "experimental setup",
+        "metodologia",
+        "materiais e métodos",
+        "materiais e metodos",
+        "método",
+        "metodo",
+        "métodos",
+        "metodos",
+    ],
+    "results": [
+        "results",
+        "experiments",
+        "experimental results",
+        "evaluation",
+        "findings",
+        "results and discussion",
+        "resultados",
+        "experimentos",
+        "resultados e discussão",
+        "resultados e discussao",
+    ],
+    "discussion": ["discussion", "discussão", "discussao"],
+    "conclusion": [
+        "conclusion",
+        "conclusions",
+        "concluding remarks",
+        "conclusion and future work",
+        "conclusions and future work",
+        "conclusão",
+        "conclusao",
+        "conclusões",
+        "conclusoes",
+        "considerações finais",
+        "consideracoes finais",
+    ],
+    "references": [
+        "references",
+        "bibliography",
+        "works cited",
+        "literature cited",
+        "referências",
+        "referencias",
+        "referências bibliográficas",
+        "referencias bibliograficas",
+    ],
+}
+
+_KEYWORD_TO_SECTION = {
+    keyword: name for name, keywords in SECTION_HEADINGS.items() for keyword in keywords
+}
+# Longest keywords first so "materials and methods" wins over "methods"
+_KEYWORDS = "|".join(
+    re.escape(k) for k in sorted(_KEYWORD_TO_SECTION, key=len, reverse=True)
+)
+
+# A heading alone on its line, optionally numbered ("2", "2.", "2.1", "II.")
+_HEADING_RE = re.compile(
+    rf"^[ \t]*(?:(?:\d+(?:\.\d+)*|[IVXivx]+)\.?[ \t]+)?({_KEYWORDS})[ \t]*[:.]?[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Abstracts are often run in: "Abstract—We propose ..." / "Resumo: Este trabalho ..."
+_INLINE_ABSTRACT_RE = re.compile(
+    r"^[ \t]*(abstract|resumo)[ \t]*[:.\-—–][ \t]*\S", re.IGNORECASE | re.MULTILINE
+)
+
+
+def split_into_sections(text: str) -> list[Section]:
+    """
+    Detects the canonical sections of a paper.
+
+    Only the first heading of each canonical section is used, so sub-sections
+    that repeat a keyword stay inside their parent. Text before the first
+    detected heading (title, authors) is reported as 'front'. Returns an empty
+    list when no heading is found.
+    """
+    starts = {}
+    for match in _INLINE_ABSTRACT_RE.finditer(text):
+        starts.setdefault("abstract", match.start())
+        break
+    for match in _HEADING_RE.finditer(text):
+        name = _KEYWORD_TO_SECTION[match.group(1).lower()]
+        if name == "references":
+            # The bibliography is at the end; a "References" line earlier is
+            # usually a table of contents or running header
+            starts["references"] = match.start()
+        else:
+            starts.setdefault(name, match.start())
+
+    if not starts:
+        return []
+
+    ordered = sorted(starts.items(), key=lambda item: item[1])
+    sections = []
+    if ordered[0][1] > 0:
+        sections.append(Section("front", 0, ordered[0][1]))
+    for i, (name, start) in enumerate(ordered):
+        end = ordered[i + 1][1] if i + 1 < len(ordered) else len(text)
+        sections.append(Section(name, start, end))
+    return sections
+
+
+def _cut(text: str, max_chars: int) -> str:
+    """Cuts text to at most max_chars, preferring to stop at whitespace."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    boundary = cut.rfind(" ")
+    return cut[:boundary] if boundary > max_chars * 0.8 else cut
+
+
+def build_excerpt(
+    text: str, sections: list[Section], wanted: list[str], max_chars: int
+) -> str:
+    """
+    Builds an excerpt of at most max_chars from the wanted sections, in the
+    order given. Short sections are kept whole and their unused share of the
+    budget goes to the longer ones. Falls back to the start of the text when
+    none of the wanted sections were detected.
+    """
+    picked = [s for name in wanted for s in sections if s.name == name]
+    if not picked:
+        return _cut(text, max_chars)
+
+    labels = {s.name: f"[{s.name.capitalize()}]\n" for s in picked}
+    remaining = max_chars - sum(len(label) + 2 for label in labels.values())
+    shares = {}
+    # Hand out the budget from the shortest section up, so leftovers roll forward
+    for i, section in enumerate(sorted(picked, key=lambda s: s.end - s.start)):
+        share = max(remaining // (len(picked) - i), 0)
+        shares[section.name] = min(section.end - section.start, share)
+        remaining -= shares[section.name]
+
+    parts = [
+        labels[s.name] + _cut(text[s.start : s.end].strip(), shares[s.name])
+        for s in picked
+        if shares[s.name] > 0
+    ]
+    return "\n\n".join(parts)
+
+
+def split_into_chunks(text: str, max_chars: int) -> list[str]:
+    """
+    Splits text into consecutive chunks of at most max_chars, cutting at a
+    paragraph break, sentence end or whitespace near the end of each chunk
+    when one is available.
+    """
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            window = text[start:end]
+            for separator in ("\n\n", ". ", "\n", " "):
+                boundary = window.rfind(separator)
+                if boundary > max_chars * 0.5:
+                    end = start + boundary + len(separator)
+                    break
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        start = end
+    return chunks
@@ -0,0 +1,134 @@
+"""
+Single-flight deduplication of identical concurrent computations.
+
+When the same paper and theme are submitted twice at the same moment (two
+users, a double-click) both requests would pay for a full evaluation. A
+SingleFlight group lets the first caller for a key lead the computation while
+later callers with the same key wait for it and share its outcome, result or
+exception. Callers can be threads or asyncio tasks on any event loop, mixed:
+the outcome is a concurrent.futures.Future, which both can wait on.
+
+A leader that stops without an outcome (its task cancelled) abandons the
+flight; the waiting callers then start over and one of them leads a new
+computation.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import CancelledError, Future
+from typing import Any, Hashable
+
+
+class FlightAbandoned(Exception):
+    """The leader of a flight stopped before producing a result."""
+
+
+class Flight:
+    """
+    One caller's handle on the computation of a key. The leader computes and
+    calls resolve() (or uses the flight as a context manager, which records an
+    exception or abandons the flight when the block exits without a result);
+    followers call wait() or await_result().
+    """
+
+    def __init__(
+        self, group: "SingleFlight", key: Hashable, future: Future, leader: bool
+    ):
+        self._group = group
+        self.key = key
+        self.future = future
+        self.leader = leader
+
+    def resolve(self, result: Any) -> None:
+        self._group._finish(self)
+        self.future.set_result(result)
+
+    def fail(self, error: BaseException) -> None:
+        self._group._finish(self)
+        self.future.set_exception(error)
+
+    def abandon(self) -> None:
+        self._group._finish(self)
+        self.future.cancel()
+
+    def wait(self, timeout: float | None = None) -> Any:
+        """The leader's result (or its exception); FlightAbandoned if it gave up."""
+        try:
+            return self.future.result(timeout)
+        except CancelledError:
+            raise FlightAbandoned(self.key) from None
+
+    async def await_result(self) -> Any:
+        """Async wait(); cancelling the waiting task does not affect the flight."""
+        try:
+            # shield: a cancelled follower must not cancel the shared future
+            return await asyncio.shield(asyncio.wrap_future(self.future))
+        except asyncio.CancelledError:
+            if self.future.cancelled():
+                raise FlightAbandoned(self.key) from None
+            raise
+
+    def __enter__(self) -> "Flight":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self.future.done():
+            return
+        if isinstance(exc, Exception):
+            self.fail(exc)
+        else:
+            # No result, or a BaseException (a cancelled task, a closed generator)
+            self.abandon()
+
+
+class SingleFlight:
+    """In-flight computations by key; safe to share across threads and event loops."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: dict[Hashable, Future] = {}
+
+    def join(self, key: Hashable) -> Flight:
+        """Leads the computation of key if none is in flight, else follows it."""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                return Flight(self, key, future, leader=False)
+            future = self._flights[key] = Future()
+        return Flight(self, key, future, leader=True)
+
+    def lead_or_wait(self, key: Hashable) -> tuple[Flight | None, Any]:
+        """
+        (flight, None) when the caller must compute key and resolve the flight,
+        or (None, result) with the result of the computation another caller led.
+        """
+        while True:
+            flight = self.join(key)
+            if flight.leader:
+                return flight, None
+            try:
+                return None, flight.wait()
+            except FlightAbandoned:
+                continue
+
+    async def alead_or_wait(self, key: Hashable) -> tuple[Flight | None, Any]:
+        """Async counterpart of lead_or_wait."""
+        while True:
+            flight = self.join(key)
+            if flight.leader:
+                return flight, None
+            try:
+                return None, await flight.await_result()
+            except FlightAbandoned:
+                continue
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+    def _finish(self, flight: Flight) -> None:
+        # Unregister before publishing the outcome, so a caller arriving afterwards
+        # starts a new computation (or finds the stored result) instead of joining
+        with self._lock:
+            if self._flights.get(flight.key) is flight.future:
+                del self._flights[flight.key]
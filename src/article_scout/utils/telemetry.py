@@ -0,0 +1,704 @@
+"""
+Telemetry for the evaluation pipeline: structured logs, spans and metrics.
+
+- Logging: log(event, **fields) writes one structured record (logfmt text or
+  JSON lines, LOG_FORMAT) through the "article_scout" logger. Fields are only
+  formatted when the level is enabled, so disabled debug logging costs a level check.
+- Spans: span(name, **attributes) records an OpenTelemetry-style span (trace
+  and span ids, parent, start/end time, attributes, status). The current span
+  is held in a context variable, so it follows LangGraph's worker threads and
+  asyncio tasks. Finished spans are kept in memory (recent_spans), optionally
+  appended to TELEMETRY_SPANS_PATH as JSON lines by a background thread (so
+  spans ending on the event loop never wait on the disk; flush_spans() waits
+  for the pending lines), and mirrored to OpenTelemetry when the opentelemetry
+  package is installed.
+- Metrics: counters and histograms in a process-wide registry, rendered in the
+  Prometheus text format by render_metrics() and served by start_metrics_server().
+
+Graph nodes are wrapped with traced(node, fn), model calls with model_call().
+"""
+
+import asyncio
+import atexit
+import functools
+import json
+import logging
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LOGGER_NAME = "article_scout"
+DEFAULT_MAX_SPANS = 1000
+# Seconds; covers everything from a cache hit to a slow, rate-limited model call
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+
+# -- structured logging ---------------------------------------------------
+
+
+class LogfmtFormatter(logging.Formatter):
+    """`time level event key=value ...`, one line per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(
+            f"{key}={_logfmt_value(value)}"
+            for key, value in _record_fields(record).items()
+        )
+        line = f"{self.formatTime(record)} {record.levelname} {record.getMessage()}"
+        return f"{line} {fields}" if fields else line
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "event": record.getMessage(),
+            **_record_fields(record),
+        }
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def _logfmt_value(value) -> str:
+    text = str(value)
+    return (
+        json.dumps(text, ensure_ascii=False)
+        if not text or any(c in text for c in ' "=\n')
+        else text
+    )
+
+
+def _record_fields(record: logging.LogRecord) -> dict:
+    fields = dict(getattr(record, "fields", {}))
+    if getattr(record, "trace_id", None):
+        fields["trace_id"] = record.trace_id
+        fields["span_id"] = record.span_id
+    return fields
+
+
+def _configure_logger() -> logging.Logger:
+    logger = logging.getLogger(LOGGER_NAME)
+    # Respect a configuration made by the host application
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(
+            JsonFormatter()
+            if os.getenv("LOG_FORMAT", "text") == "json"
+            else LogfmtFormatter()
+        )
+        logger.addHandler(handler)
+        logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+        logger.propagate = False
+    return logger
+
+
+logger = _configure_logger()
+
+
+def log(event: str, level: int = logging.INFO, **fields) -> None:
+    """Logs a structured event, tagged with the current trace and span ids."""
+    if not logger.isEnabledFor(level):
+        return
+    span = _current_span.get()
+    extra = {"fields": fields}
+    if span is not None:
+        extra.update(trace_id=span.trace_id, span_id=span.span_id)
+    logger.log(level, event, extra=extra)
+
+
+# -- metrics ----------------------------------------------------------------
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    type = "counter"
+
+    def __init__(self, name: str, description: str, labelnames: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        with self._lock:
+            return [
+                (self.name, dict(zip(self.labelnames, key)), value)
+                for key, value in self._values.items()
+            ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, as Prometheus expects it."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket..., +Inf count, sum]
+        self._values: dict[tuple, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            counts = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def count(self, **labels) -> int:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            return int(self._values[key][-2]) if key in self._values else 0
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        samples = []
+        with self._lock:
+            for key, counts in self._values.items():
+                labels = dict(zip(self.labelnames, key))
+                for bound, count in zip(self.buckets, counts):
+                    samples.append(
+                        (f"{self.name}_bucket", {**labels, "le": f"{bound:g}"}, count)
+                    )
+                samples.append(
+                    (f"{self.name}_bucket", {**labels, "le": "+Inf"}, counts[-2])
+                )
+                samples.append((f"{self.name}_count", labels, counts[-2]))
+                samples.append((f"{self.name}_sum", labels, counts[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    """Named metrics of the process; counter()/histogram() reuse a registered one."""
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = cls(name, *args, **kwargs)
+            return self._metrics[name]
+
+    def counter(self, name: str, description: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter, name, description, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram, name, description, labelnames, buckets)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                label_text = ",".join(
+                    f'{key}="{_escape_label(val)}"' for key, val in labels.items()
+                )
+                lines.append(
+                    f"{name}{{{label_text}}} {value:g}"
+                    if label_text
+                    else f"{name} {value:g}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = MetricsRegistry()
+
+NODE_DURATION = metrics.histogram(
+    "article_scout_node_duration_seconds",
+    "Wall time of evaluation graph nodes",
+    ("node",),
+)
+NODE_ERRORS = metrics.counter(
+    "article_scout_node_errors_total", "Graph nodes that raised an exception", ("node",)
+)
+MODEL_CALL_DURATION = metrics.histogram(
+    "article_scout_model_call_seconds",
+    "Time spent inside the model API, all attempts of a call",
+    ("node",),
+)
+MODEL_WAIT = metrics.histogram(
+    "article_scout_model_wait_seconds",
+    "Time a model call spent waiting for a concurrency slot, "
+    "rate-limit buckets or retry backoff",
+    ("node",),
+)
+MODEL_RETRIES = metrics.counter(
+    "article_scout_model_retries_total",
+    "Model call attempts that were retried",
+    ("node",),
+)
+TOKENS = metrics.counter(
+    "article_scout_tokens_total",
+    "Prompt and completion tokens reported by the model",
+    ("node", "kind"),
+)
+PARSE_FAILURES = metrics.counter(
+    "article_scout_parse_failures_total",
+    "Model answers that could not be parsed, even after repair",
+    ("node",),
+)
+PARSE_REPAIRS = metrics.counter(
+    "article_scout_parse_repairs_total",
+    "Re-asks of unparseable criterion answers, by outcome",
+    ("node", "outcome"),
+)
+EVALUATIONS = metrics.counter(
+    "article_scout_evaluations_total", "Finished paper evaluations", ("mode", "cached")
+)
+NEAR_DUPLICATE_HITS = metrics.counter(
+    "article_scout_near_duplicate_hits_total",
+    "Evaluations answered with the cached result of a near-duplicate paper",
+)
+COALESCED_EVALUATIONS = metrics.counter(
+    "article_scout_coalesced_evaluations_total",
+    "Evaluations answered with the result of an identical evaluation "
+    "that was already running",
+)
+JOBS = metrics.counter(
+    "article_scout_jobs_total",
+    "Jobs of the HTTP job service: accepted, rejected, succeeded, failed",
+    ("status",),
+)
+EVALUATION_DURATION = metrics.histogram(
+    "article_scout_evaluation_duration_seconds",
+    "Wall time of a paper evaluation",
+    ("mode",),
+)
+
+
+def render_metrics() -> str:
+    return metrics.render()
+
+
+# -- spans ------------------------------------------------------------------
+
+
+class Span:
+    """
+    One timed operation. `node` is the graph node the span belongs to and is
+    inherited by child spans, so model calls are attributed to their node.
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent",
+        "node",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "status",
+        "_otel",
+    )
+
+    def __init__(
+        self, name: str, parent: "Span | None", node: str | None, attributes: dict
+    ):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.node = node or (parent.node if parent else None)
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = "OK"
+        self._otel = None
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def add(self, key: str, amount: float) -> None:
+        """Adds to a numeric attribute (totals over several model calls of a node)."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent.span_id if self.parent else None,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": {
+                **({"node": self.node} if self.node else {}),
+                **self.attributes,
+            },
+            "status": self.status,
+        }
+
+
+_current_span: ContextVar[Span | None] = ContextVar("article_scout_span", default=None)
+_finished_spans: deque = deque(
+    maxlen=int(os.getenv("TELEMETRY_MAX_SPANS", str(DEFAULT_MAX_SPANS)))
+)
+# (path, JSON line) of finished spans waiting for the writer thread
+_span_lines: queue.Queue = queue.Queue()
+_span_writer: threading.Thread | None = None
+_span_writer_lock = threading.Lock()
+_otel = None
+
+
+def _otel_tracer():
+    """OpenTelemetry tracer if installed (a no-op one unless an SDK is configured)."""
+    global _otel
+    if _otel is None:
+        try:
+            from opentelemetry import trace
+
+            _otel = (trace, trace.get_tracer(LOGGER_NAME))
+        except ImportError:
+            _otel = False
+    return _otel or None
+
+
+def _start_otel(span: Span) -> None:
+    otel = _otel_tracer()
+    if otel:
+        trace, tracer = otel
+        context = (
+            trace.set_span_in_context(span.parent._otel)
+            if span.parent and span.parent._otel
+            else None
+        )
+        span._otel = tracer.start_span(
+            span.name, context=context, start_time=span.start_ns
+        )
+
+
+def _finish(span: Span) -> None:
+    span.end_ns = time.time_ns()
+    _finished_spans.append(span)
+    if span._otel is not None:
+        for key, value in span.to_dict()["attributes"].items():
+            span._otel.set_attribute(
+                key, value if isinstance(value, (str, bool, int, float)) else str(value)
+            )
+        if span.status == "ERROR":
+            from opentelemetry.trace import Status, StatusCode
+
+            span._otel.set_status(Status(StatusCode.ERROR))
+        span._otel.end(end_time=span.end_ns)
+    path = os.getenv("TELEMETRY_SPANS_PATH")
+    if path:
+        _export_span(os.path.expanduser(path), span)
+
+
+def _export_span(path: str, span: Span) -> None:
+    """Queues the span's JSON line for the writer thread, starting it if needed."""
+    global _span_writer
+    _span_lines.put((path, json.dumps(span.to_dict(), ensure_ascii=False, default=str)))
+    if _span_writer is None:
+        with _span_writer_lock:
+            if _span_writer is None:
+                _span_writer = threading.Thread(
+                    target=_write_spans, name="telemetry-spans", daemon=True
+                )
+                _span_writer.start()
+                atexit.register(flush_spans)
+
+
+def _write_spans() -> None:
+    """Appends queued span lines, one open() per burst of spans and file."""
+    while True:
+        batch = [_span_lines.get()]
+        while True:
+            try:
+                batch.append(_span_lines.get_nowait())
+            except queue.Empty:
+                break
+        lines: dict[str, list[str]] = {}
+        for path, line in batch:
+            lines.setdefault(path, []).append(line + "\n")
+        for path, path_lines in lines.items():
+            try:
+                with open(path, "a", encoding="utf-8") as f:
+                    f.writelines(path_lines)
+            except OSError as e:
+                log(
+                    "span_export_failed",
+                    logging.WARNING,
+                    path=path,
+                    spans=len(path_lines),
+                    error=str(e),
+                )
+        for _ in batch:
+            _span_lines.task_done()
+
+
+def flush_spans() -> None:
+    """Blocks until the spans finished so far are written to TELEMETRY_SPANS_PATH."""
+    if _span_writer is not None:
+        _span_lines.join()
+
+
+@contextmanager
+def span(name: str, node: str | None = None, **attributes):
+    """Runs the block as a child of the current span (or as a new trace)."""
+    current = Span(name, _current_span.get(), node, attributes)
+    _start_otel(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except GeneratorExit:
+        # A stream closed early by its consumer is not a failure
+        raise
+    except BaseException as e:
+        current.status = "ERROR"
+        current.attributes["error.type"] = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        _finish(current)
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def current_node() -> str:
+    current = _current_span.get()
+    return (current.node if current else None) or "none"
+
+
+def recent_spans(trace_id: str | None = None) -> list[dict]:
+    """Finished spans still held in memory, oldest first, optionally of one trace."""
+    return [
+        s.to_dict()
+        for s in list(_finished_spans)
+        if trace_id is None or s.trace_id == trace_id
+    ]
+
+
+def traced(node: str, fn):
+    """Wraps a (sync or async) graph node function in a span and times it."""
+    if asyncio.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_node(*args, **kwargs):
+            with _node_span(node):
+                return await fn(*args, **kwargs)
+
+        return async_node
+
+    @functools.wraps(fn)
+    def node_fn(*args, **kwargs):
+        with _node_span(node):
+            return fn(*args, **kwargs)
+
+    return node_fn
+
+
+@contextmanager
+def _node_span(node: str):
+    try:
+        with span(node, node=node) as current:
+            yield current
+    except Exception:
+        NODE_ERRORS.inc(node=node)
+        raise
+    finally:
+        NODE_DURATION.observe(current.duration, node=node)
+
+
+class ModelCall:
+    """
+    Timing of one rate-limited model call. wrap()/awrap() count the attempts
+    and the time spent inside the API; everything else between the start and
+    the end of the call is waiting (concurrency slot, buckets, backoff).
+    """
+
+    def __init__(self, span: Span):
+        self.span = span
+        self.attempts = 0
+        self.call_seconds = 0.0
+        self.prompt_tokens = None
+        self.completion_tokens = None
+
+    def wrap(self, fn):
+        def attempt():
+            self.attempts += 1
+            start = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                self.call_seconds += time.perf_counter() - start
+
+        return attempt
+
+    def awrap(self, fn):
+        async def attempt():
+            self.attempts += 1
+            start = time.perf_counter()
+            try:
+                return await fn()
+            finally:
+                self.call_seconds += time.perf_counter() - start
+
+        return attempt
+
+    def set_usage(
+        self, prompt_tokens: int | None, completion_tokens: int | None
+    ) -> None:
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+
+
+@contextmanager
+def model_call(**attributes):
+    """Span and metrics of a model call; totals go to the enclosing node span."""
+    start = time.perf_counter()
+    with span("model_call", **attributes) as current:
+        call = ModelCall(current)
+        try:
+            yield call
+        finally:
+            wait = max(time.perf_counter() - start - call.call_seconds, 0.0)
+            retries = max(call.attempts - 1, 0)
+            node = current.node or "none"
+            totals = {
+                "llm.wait_seconds": wait,
+                "llm.call_seconds": call.call_seconds,
+                "llm.retries": retries,
+            }
+            if call.prompt_tokens is not None:
+                totals["llm.prompt_tokens"] = call.prompt_tokens
+                TOKENS.inc(call.prompt_tokens, node=node, kind="prompt")
+            if call.completion_tokens is not None:
+                totals["llm.completion_tokens"] = call.completion_tokens
+                TOKENS.inc(call.completion_tokens, node=node, kind="completion")
+            for key, value in totals.items():
+                current.set_attribute(
+                    key, round(value, 6) if isinstance(value, float) else value
+                )
+                if current.parent is not None and current.parent.node == node:
+                    current.parent.add(key, value)
+            MODEL_CALL_DURATION.observe(call.call_seconds, node=node)
+            MODEL_WAIT.observe(wait, node=node)
+            if retries:
+                MODEL_RETRIES.inc(retries, node=node)
+
+
+def record_parse_failure(error: str) -> None:
+    """Counts an unparseable model answer against the current node and logs it."""
+    node = current_node()
+    PARSE_FAILURES.inc(node=node)
+    current = _current_span.get()
+    if current is not None:
+        current.add("llm.parse_failures", 1)
+    log("parse_failure", logging.WARNING, node=node, error=error)
+
+
+# -- metrics endpoint -------------------------------------------------------
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] == "/metrics":
+            body = render_metrics().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif self.path.split("?")[0] == "/spans":
+            body = json.dumps(recent_spans(), default=str).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are frequent; keep them out of the application log
+        pass
+
+
+_servers: dict[int, ThreadingHTTPServer] = {}
+_servers_lock = threading.Lock()
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serves /metrics (Prometheus text format) and /spans (recent spans as JSON)
+    from a daemon thread. Calling it again for the same port returns the running server.
+    """
+    with _servers_lock:
+        if port not in _servers:
+            server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            server.daemon_threads = True
+            threading.Thread(
+                target=server.serve_forever, name=f"metrics-{port}", daemon=True
+            ).start()
+            _servers[port] = server
+            log("metrics_server_started", host=host, port=server.server_address[1])
+        return _servers[port]
@@ -0,0 +1,144 @@
+"""
+Token counting and token-based input budgeting.
+
+Counts use tiktoken when it is installed and its encoding can be loaded
+(cl100k_base is a close match for the Llama 3 vocabulary served by Groq).
+Otherwise a conservative regex estimate is used, which over-counts accented,
+non-Latin and math-heavy text rather than under-counting it, so budgets stay
+safe. Counts are cached by a digest of the text, so re-budgeting the same
+document is free without the cache keeping whole papers alive.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+from .telemetry import log
+
+# Context windows (prompt + completion) of the Groq models we use
+MODEL_CONTEXT_WINDOWS = {
+    "llama-3.1-8b-instant": 131072,
+    "llama-3.3-70b-versatile": 131072,
+    "meta-llama/llama-4-scout-17b-16e-instruct": 131072,
+    "meta-llama/llama-4-maverick-17b-128e-instruct": 131072,
+    "openai/gpt-oss-20b": 131072,
+    "openai/gpt-oss-120b": 131072,
+    "gemma2-9b-it": 8192,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+TIKTOKEN_ENCODING = "cl100k_base"
+
+# Fallback estimate: short letter runs, digit groups of up to three and every
+# other non-space character (punctuation, accents, symbols) count as one token
+_TOKEN_ESTIMATE_RE = re.compile(r"[A-Za-z]{1,6}|\d{1,3}|\S")
+# Sentence ends and paragraph breaks, used as preferred cut points
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n\s*\n")
+
+_encoding = None
+_encoding_unavailable = False
+
+# Most recent token counts, by a 16-byte digest of the text
+COUNT_CACHE_SIZE = 1024
+_counts: OrderedDict[bytes, int] = OrderedDict()
+_counts_lock = threading.Lock()
+
+
+def _get_encoding():
+    """Loads the tiktoken encoding once; returns None if it is not available."""
+    global _encoding, _encoding_unavailable
+    if _encoding is None and not _encoding_unavailable:
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding(TIKTOKEN_ENCODING)
+        except ImportError:
+            _encoding_unavailable = True
+        except Exception as e:
+            # Encoding files are downloaded on first use; offline hosts fall back
+            log(
+                "tiktoken_unavailable",
+                logging.WARNING,
+                fallback="estimate",
+                error=str(e),
+            )
+            _encoding_unavailable = True
+    return _encoding
+
+
+def _count(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(_TOKEN_ESTIMATE_RE.findall(text))
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in text (exact with tiktoken, a conservative estimate otherwise)."""
+    digest = hashlib.blake2b(
+        text.encode("utf-8", "surrogatepass"), digest_size=16
+    ).digest()
+    with _counts_lock:
+        count = _counts.get(digest)
+        if count is not None:
+            _counts.move_to_end(digest)
+            return count
+    count = _count(text)
+    with _counts_lock:
+        _counts[digest] = count
+        while len(_counts) > COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+    return count
+
+
+def chars_per_token(text: str) -> float:
+    """Average characters per token for this document (at least 1.0)."""
+    return max(len(text) / max(count_tokens(text), 1), 1.0)
+
+
+def context_window(model: str) -> int:
+    return MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+
+
+def input_token_budget(
+    model: str, prompt_tokens: int, output_tokens: int, request_limit: int | None = None
+) -> int:
+    """
+    Tokens left for the paper in one request: the model context window (or the
+    per-request limit, if smaller) minus the prompt around the paper and the
+    tokens reserved for the answer.
+    """
+    limit = context_window(model)
+    if request_limit:
+        limit = min(limit, request_limit)
+    return max(limit - prompt_tokens - output_tokens, 0)
+
+
+def _prefix_chars_within(text: str, max_tokens: int) -> int:
+    """Characters in the longest prefix of text with at most max_tokens tokens."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        prefix = encoding.decode(tokens[:max_tokens])
+        # A token cut inside a multi-byte character decodes to U+FFFD; drop it
+        return len(prefix.rstrip("�"))
+    matches = list(_TOKEN_ESTIMATE_RE.finditer(text))
+    return matches[max_tokens - 1].end() if max_tokens > 0 else 0
+
+
+def fit_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Returns the longest prefix of text that fits in max_tokens, cut at the last
+    sentence end or paragraph break when one is reasonably close to the limit,
+    otherwise at the last whitespace.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+    cut = _prefix_chars_within(text, max_tokens)
+    prefix = text[:cut]
+    sentence_ends = [m.start() for m in _SENTENCE_END_RE.finditer(prefix)]
+    if sentence_ends and sentence_ends[-1] > cut * 0.7:
+        return prefix[: sentence_ends[-1]]
+    boundary = prefix.rfind(" ")
+    return prefix[:boundary] if boundary > cut * 0.9 else prefix
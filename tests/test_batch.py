@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Testes da avaliação em lote (sem chamadas reais à API)
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+
+from article_scout import batch
+from article_scout.batch import (
+    BatchResult,
+    PipelineStats,
+    aevaluate_batch,
+    evaluate_batch,
+    evaluate_pipeline,
+    summarize_batch,
+)
+from article_scout.utils.pdf_extractor import DEFAULT_MAX_TOKENS
+from article_scout.utils.tokens import count_tokens
+
+
+def write_pdf(path, text: str) -> str:
+    """Escreve um PDF mínimo de uma página com o texto dado"""
+    stream = f"BT /F1 12 Tf 50 750 Td ({text}) Tj ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+    ]
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    with open(path, "wb") as f:
+        f.write(out)
+    return str(path)
+
+
+class TestBatchEvaluation:
+    """Testes para evaluate_batch e aevaluate_batch"""
+
+    @pytest.fixture
+    def fake_evaluation(self, monkeypatch):
+        """Substitui a avaliação real por uma versão lenta e determinística"""
+        state = {"active": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def fake_evaluate(research_paper, article_theme, **kwargs):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            # Papers mais curtos terminam primeiro
+            time.sleep(0.02 * len(research_paper))
+            with lock:
+                state["active"] -= 1
+            if research_paper == "boom":
+                raise RuntimeError("API indisponível")
+            return {"final_score": 0.5, "research_paper": research_paper}
+
+        async def fake_aevaluate(research_paper, article_theme, **kwargs):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.02 * len(research_paper))
+            state["active"] -= 1
+            if research_paper == "boom":
+                raise RuntimeError("API indisponível")
+            return {"final_score": 0.5, "research_paper": research_paper}
+
+        monkeypatch.setattr(batch, "evaluate_research_paper", fake_evaluate)
+        monkeypatch.setattr(batch, "aevaluate_research_paper", fake_aevaluate)
+        return state
+
+    @pytest.fixture
+    def jobs(self):
+        return [
+            ("x" * 20, "tema"),
+            ("boom", "tema"),
+            ("x" * 6, "tema"),
+            ("x" * 10, "tema"),
+        ]
+
+    def test_results_in_completion_order_with_errors(self, fake_evaluation, jobs):
+        """Resultados saem na ordem de conclusão e erros não interrompem o lote"""
+        results = list(evaluate_batch(jobs, max_concurrency=4))
+
+        assert [r.index for r in results] == [1, 2, 3, 0]
+        failed = [r for r in results if not r.ok]
+        assert len(failed) == 1 and "API indisponível" in failed[0].error
+        assert all(r.result["final_score"] == 0.5 for r in results if r.ok)
+
+    def test_concurrency_limit(self, fake_evaluation, jobs):
+        """Nunca há mais jobs em execução do que max_concurrency"""
+        results = list(evaluate_batch(jobs * 3, max_concurrency=2))
+
+        assert len(results) == 12
+        assert fake_evaluation["peak"] == 2
+
+    def test_async_batch(self, fake_evaluation, jobs):
+        """A versão assíncrona tem o mesmo comportamento"""
+
+        async def collect():
+            return [r async for r in aevaluate_batch(jobs, max_concurrency=4)]
+
+        results = asyncio.run(collect())
+
+        assert [r.index for r in results] == [1, 2, 3, 0]
+        assert sum(not r.ok for r in results) == 1
+        assert fake_evaluation["peak"] == 4
+
+    def test_missing_pdf_is_reported(self, fake_evaluation, tmp_path):
+        """Um PDF sem texto extraível vira erro do job, não exceção"""
+        empty_pdf = tmp_path / "vazio.pdf"
+        empty_pdf.write_bytes(b"")
+
+        results = list(evaluate_batch([(str(empty_pdf), "tema")]))
+
+        assert not results[0].ok
+        assert "Could not extract text" in results[0].error
+
+    @pytest.mark.parametrize("run_batch", [evaluate_batch, evaluate_pipeline])
+    def test_nonexistent_pdf_is_an_error(self, fake_evaluation, run_batch, tmp_path):
+        """Um caminho .pdf que não existe vira erro do job, não texto do paper"""
+        missing = str(tmp_path / "inexistente.pdf")
+
+        results = list(run_batch([(missing, "tema"), ("x" * 5, "tema")]))
+
+        failed = [r for r in results if not r.ok]
+        assert len(results) == 2 and len(failed) == 1
+        assert failed[0].source == missing
+        assert failed[0].error.startswith("FileNotFoundError")
+        # Só o texto chegou ao modelo
+        assert fake_evaluation["peak"] == 1
+
+    @pytest.mark.parametrize("run_batch", [evaluate_batch, evaluate_pipeline])
+    def test_map_reduce_receives_the_whole_pdf(self, run_batch, monkeypatch, tmp_path):
+        """No modo map-reduce, um PDF acima de 20k tokens chega inteiro ao chunker"""
+        from article_scout import article_scout_agent
+
+        chunked = []
+
+        def plan_chunks(research_paper, article_theme):
+            chunked.append(research_paper)
+            raise RuntimeError("parado depois do chunker")
+
+        monkeypatch.setattr(article_scout_agent, "_plan_chunks", plan_chunks)
+        text = " ".join(f"Sentence {i} about soil sensors." for i in range(6000))
+        pdf = write_pdf(tmp_path / "longo.pdf", text)
+
+        results = list(run_batch([(pdf, "tema")], map_reduce=True))
+
+        assert "parado depois do chunker" in results[0].error
+        assert count_tokens(chunked[0]) > DEFAULT_MAX_TOKENS
+        assert chunked[0].split() == text.split()
+
+    def test_summary_reports_gate_savings(self):
+        """O resumo soma as chamadas e tokens economizados pelo filtro de relevância"""
+        results = [
+            BatchResult(
+                0,
+                "a",
+                "tema",
+                result={
+                    "skipped_criteria": ["originality", "writing_clarity"],
+                    "saved_tokens": 900,
+                },
+            ),
+            BatchResult(
+                1, "b", "tema", result={"skipped_criteria": [], "saved_tokens": 0}
+            ),
+            BatchResult(2, "c", "tema", error="RuntimeError: API indisponível"),
+        ]
+
+        assert summarize_batch(results) == {
+            "jobs": 3,
+            "succeeded": 2,
+            "failed": 1,
+            "gated": 1,
+            "calls_saved": 2,
+            "tokens_saved": 900,
+            "parse_repairs": 0,
+        }
+
+
+class TestPipeline:
+    """Testes para evaluate_pipeline (extração em processos, avaliação em threads)"""
+
+    @pytest.fixture
+    def evaluated(self, monkeypatch):
+        """Avaliação falsa e lenta; registra os textos avaliados"""
+        texts = []
+
+        def fake_evaluate(research_paper, article_theme, **kwargs):
+            texts.append(research_paper)
+            time.sleep(0.05)
+            return {"final_score": 0.5, "research_paper": research_paper}
+
+        monkeypatch.setattr(batch, "evaluate_research_paper", fake_evaluate)
+        return texts
+
+    def test_pdfs_and_texts_flow_through_both_stages(self, evaluated, tmp_path):
+        """PDFs são extraídos em processos, textos vão direto; falhas viram erros"""
+        empty_pdf = tmp_path / "vazio.pdf"
+        empty_pdf.write_bytes(b"")
+        jobs = [
+            (write_pdf(tmp_path / "a.pdf", "Graph neural networks"), "tema"),
+            ("Texto direto do paper", "tema"),
+            (str(empty_pdf), "tema"),
+            (write_pdf(tmp_path / "b.pdf", "Soil moisture sensors"), "tema"),
+        ]
+        stats = PipelineStats()
+        results = sorted(
+            evaluate_pipeline(jobs, max_concurrency=2, extract_workers=2, stats=stats),
+            key=lambda r: r.index,
+        )
+
+        assert [r.ok for r in results] == [True, True, False, True]
+        assert "Graph neural networks" in results[0].result["research_paper"]
+        assert results[1].result["research_paper"] == "Texto direto do paper"
+        assert "Could not extract text" in results[2].error
+        assert stats.extraction.completed == 3 and stats.evaluation.completed == 3
+        occupancy = stats.occupancy()
+        assert 0 < occupancy["evaluation"] <= 1 and 0 < occupancy["extraction"] <= 1
+
+    def test_failed_extractions_in_a_row_do_not_end_the_batch(
+        self, monkeypatch, tmp_path
+    ):
+        """Falhas seguidas de extração, com a avaliação ocupada, não param o pipeline"""
+        empty_pdf = tmp_path / "vazio.pdf"
+        empty_pdf.write_bytes(b"")
+        stats, evaluated = PipelineStats(), []
+
+        def fake_evaluate(research_paper, article_theme, **kwargs):
+            # A primeira avaliação só termina depois das duas extrações que falham
+            deadline = time.monotonic() + 10
+            while stats.extraction.completed < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            evaluated.append(research_paper)
+            return {"final_score": 0.5}
+
+        monkeypatch.setattr(batch, "evaluate_research_paper", fake_evaluate)
+        jobs = [
+            ("Primeiro paper", "tema"),
+            (str(empty_pdf), "tema"),
+            (str(empty_pdf), "tema"),
+            ("Último paper", "tema"),
+        ]
+
+        results = sorted(
+            evaluate_pipeline(jobs, max_concurrency=1, extract_workers=1, stats=stats),
+            key=lambda r: r.index,
+        )
+
+        assert [r.ok for r in results] == [True, False, False, True]
+        assert evaluated == ["Primeiro paper", "Último paper"]
+
+    def test_backpressure_bounds_the_jobs_read(self, evaluated):
+        """Com consumidor lento, os jobs são lidos aos poucos (fila até queue_size)"""
+        read = []
+
+        def jobs():
+            for i in range(50):
+                read.append(i)
+                yield f"paper {i}", "tema"
+
+        stats = PipelineStats()
+        pipeline = evaluate_pipeline(
+            jobs(), max_concurrency=2, extract_workers=1, queue_size=3, stats=stats
+        )
+        next(pipeline)
+        time.sleep(0.2)
+
+        # 2 em avaliação + 3 na fila + o job que espera espaço
+        assert len(read) <= 2 + 3 + 1
+        assert stats.queued <= 3
+        pipeline.close()
+        assert len(read) < 50
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            list(evaluate_pipeline([("paper", "tema")], extract_workers=0))
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Testes do modo cascata de modelos (com modelos falsos, sem chamar a API)
+"""
+
+import os
+import sys
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+
+from article_scout import article_scout_agent
+from article_scout.article_scout_agent import (
+    evaluate_research_paper,
+    summarize_model_calls,
+)
+from article_scout.utils.rate_limiter import RateLimiter
+
+PAPER = "We evaluate a new method for things. " * 50
+
+
+class TestCascade:
+    """Testes para cascade=True e summarize_model_calls"""
+
+    @pytest.fixture(autouse=True)
+    def fake_models(self, monkeypatch):
+        monkeypatch.setattr(article_scout_agent, "rate_limiter", RateLimiter())
+        monkeypatch.setattr(article_scout_agent, "cascade_rate_limiter", RateLimiter())
+        monkeypatch.setattr(
+            article_scout_agent,
+            "cascade_llm",
+            FakeListChatModel(responses=["Score: 0.8\nExplanation: Large model."]),
+        )
+
+    def use_small_model(self, monkeypatch, response):
+        monkeypatch.setattr(
+            article_scout_agent, "llm", FakeListChatModel(responses=[response])
+        )
+
+    def test_confident_scores_stay_on_small_model(self, monkeypatch):
+        """Notas fora da faixa incerta não são reavaliadas"""
+        self.use_small_model(monkeypatch, "Score: 0.9\nExplanation: Small model.")
+
+        result = evaluate_research_paper(PAPER, "things", cascade=True)
+        summary = summarize_model_calls(result)
+
+        assert result["relevance_explanation"] == "Small model."
+        assert summary["small"]["calls"] == 7
+        assert summary["escalations"] == 0
+
+    @pytest.mark.parametrize(
+        "response", ["Score: 0.5\nExplanation: Unsure.", "I am not sure."]
+    )
+    def test_uncertain_or_unparsed_escalates(self, monkeypatch, response):
+        """Notas na faixa incerta ou respostas ilegíveis vão para o modelo maior"""
+        self.use_small_model(monkeypatch, response)
+
+        result = evaluate_research_paper(PAPER, "things", cascade=True)
+        summary = summarize_model_calls(result)
+
+        assert result["relevance_score"] == pytest.approx(0.8)
+        assert result["relevance_explanation"] == "Large model."
+        assert summary["large"]["calls"] == 7
+        assert summary["escalation_rate"] == 1.0
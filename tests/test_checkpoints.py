@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Testes das avaliações retomáveis (checkpoints do grafo em SQLite)
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+
+from article_scout import article_scout_agent
+from article_scout.article_scout_agent import (
+    aevaluate_research_paper,
+    evaluate_research_paper,
+    stream_research_paper_evaluation,
+)
+from article_scout.utils.checkpoints import SQLiteCheckpointer
+from article_scout.utils.rate_limiter import RateLimiter
+
+PAPER = "We evaluate a new method for things. " * 50
+
+
+def stored_checkpoints(checkpointer: SQLiteCheckpointer) -> int:
+    return checkpointer._conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+
+
+class TestResumableEvaluation:
+    """Testes para evaluate_research_paper(..., evaluation_id=...)"""
+
+    @pytest.fixture(autouse=True)
+    def checkpointer(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(article_scout_agent, "rate_limiter", RateLimiter())
+        monkeypatch.setattr(
+            article_scout_agent,
+            "llm",
+            FakeListChatModel(responses=["Score: 0.6\nExplanation: Ok."]),
+        )
+        checkpointer = SQLiteCheckpointer(str(tmp_path / "checkpoints.sqlite3"))
+        monkeypatch.setattr(article_scout_agent, "checkpointer", checkpointer)
+        return checkpointer
+
+    @pytest.fixture
+    def calls(self, monkeypatch):
+        """
+        Registra os prompts enviados. Enquanto calls["fail"] for True, a chamada de
+        originalidade expira (TimeoutError) depois que os outros critérios terminaram,
+        como um timeout real da API.
+        """
+        calls = {"prompts": [], "finished": 0, "fail": True}
+        lock = threading.Lock()
+        others_done = threading.Event()
+        original_invoke, original_ainvoke = (
+            article_scout_agent._invoke,
+            article_scout_agent._ainvoke,
+        )
+
+        def finished():
+            with lock:
+                calls["finished"] += 1
+                if calls["finished"] >= len(article_scout_agent.CRITERIA) - 1:
+                    others_done.set()
+
+        def invoke(runnable, prompt, output_tokens, limiter=None):
+            calls["prompts"].append(prompt)
+            if calls["fail"] and "originality" in prompt:
+                others_done.wait(5)
+                raise TimeoutError("Request timed out")
+            result = original_invoke(runnable, prompt, output_tokens, limiter)
+            finished()
+            return result
+
+        async def ainvoke(runnable, prompt, output_tokens, limiter=None):
+            calls["prompts"].append(prompt)
+            if calls["fail"] and "originality" in prompt:
+                while not others_done.is_set():
+                    await asyncio.sleep(0.01)
+                raise TimeoutError("Request timed out")
+            result = await original_ainvoke(runnable, prompt, output_tokens, limiter)
+            finished()
+            return result
+
+        monkeypatch.setattr(article_scout_agent, "_invoke", invoke)
+        monkeypatch.setattr(article_scout_agent, "_ainvoke", ainvoke)
+        return calls
+
+    def retry(self, calls):
+        calls["prompts"].clear()
+        calls["fail"] = False
+
+    def test_retry_runs_only_unfinished_criteria(self, calls, checkpointer):
+        """Depois de um timeout, a mesma avaliação só repete o critério que falhou"""
+        with pytest.raises(TimeoutError):
+            evaluate_research_paper(PAPER, "things", evaluation_id="job-1")
+        assert len(calls["prompts"]) == len(article_scout_agent.CRITERIA)
+
+        self.retry(calls)
+        result = evaluate_research_paper(PAPER, "things", evaluation_id="job-1")
+
+        assert len(calls["prompts"]) == 1 and "originality" in calls["prompts"][0]
+        assert result["final_score"] == pytest.approx(0.6)
+        assert all(
+            result[f"{name}_explanation"] == "Ok."
+            for name in article_scout_agent.CRITERIA
+        )
+        # A avaliação concluída não deixa checkpoints
+        assert stored_checkpoints(checkpointer) == 0
+
+    def test_checkpoints_survive_the_process(self, calls, checkpointer, monkeypatch):
+        """Um novo checkpointer sobre o mesmo arquivo (novo processo) também retoma"""
+        with pytest.raises(TimeoutError):
+            evaluate_research_paper(PAPER, "things", evaluation_id="job-1")
+        monkeypatch.setattr(
+            article_scout_agent, "checkpointer", SQLiteCheckpointer(checkpointer.path)
+        )
+
+        self.retry(calls)
+        evaluate_research_paper(PAPER, "things", evaluation_id="job-1")
+
+        assert len(calls["prompts"]) == 1
+
+    def test_other_input_starts_over(self, calls):
+        """O mesmo id com outro paper não reaproveita o checkpoint"""
+        with pytest.raises(TimeoutError):
+            evaluate_research_paper(PAPER, "things", evaluation_id="job-1")
+
+        self.retry(calls)
+        evaluate_research_paper(
+            PAPER + " Another one.", "things", evaluation_id="job-1"
+        )
+
+        assert len(calls["prompts"]) == len(article_scout_agent.CRITERIA)
+
+    def test_async_resume(self, calls):
+        """A versão assíncrona também retoma"""
+        with pytest.raises(TimeoutError):
+            asyncio.run(
+                aevaluate_research_paper(PAPER, "things", evaluation_id="job-1")
+            )
+
+        self.retry(calls)
+        result = asyncio.run(
+            aevaluate_research_paper(PAPER, "things", evaluation_id="job-1")
+        )
+
+        assert len(calls["prompts"]) == 1
+        assert result["originality_explanation"] == "Ok."
+
+    def test_async_checkpoint_queries_run_off_the_event_loop(
+        self, calls, checkpointer, monkeypatch
+    ):
+        """Na versão assíncrona, as consultas ao SQLite rodam fora do event loop"""
+        self.retry(calls)
+        threads = set()
+        for name in ("get_tuple", "list", "put", "put_writes", "delete_thread"):
+
+            def recorded(*args, _original=getattr(checkpointer, name), **kwargs):
+                threads.add(threading.get_ident())
+                return _original(*args, **kwargs)
+
+            monkeypatch.setattr(checkpointer, name, recorded)
+
+        async def main():
+            await aevaluate_research_paper(PAPER, "things", evaluation_id="job-1")
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(main())
+
+        assert threads and loop_thread not in threads
+        assert stored_checkpoints(checkpointer) == 0
+
+    def test_resumed_stream_reports_each_criterion_once(self, calls):
+        """Retomando o stream (com filtro de relevância), cada critério vem uma vez"""
+        with pytest.raises(TimeoutError):
+            list(
+                stream_research_paper_evaluation(
+                    PAPER, "things", relevance_threshold=0.1, evaluation_id="job-1"
+                )
+            )
+
+        self.retry(calls)
+        events = list(
+            stream_research_paper_evaluation(
+                PAPER, "things", relevance_threshold=0.1, evaluation_id="job-1"
+            )
+        )
+
+        criteria = [
+            event["criterion"] for event in events if event["event"] == "criterion"
+        ]
+        assert sorted(criteria) == sorted(article_scout_agent.CRITERIA)
+        assert events[-1]["final_score"] == pytest.approx(0.6)
+        assert len(calls["prompts"]) == 1
+
+    def test_without_id_nothing_is_stored(self, calls, checkpointer):
+        """Sem evaluation_id a avaliação não usa checkpoints"""
+        with pytest.raises(TimeoutError):
+            evaluate_research_paper(PAPER, "things")
+
+        assert stored_checkpoints(checkpointer) == 0
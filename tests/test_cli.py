@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Testes do comando article-scout batch (JSONL incremental e retomada)
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+
+from article_scout import batch
+from article_scout.main import load_finished, main
+from tests.test_batch import write_pdf
+
+
+def read_records(path) -> list[dict]:
+    """Linhas JSON do arquivo de saída, ignorando uma linha cortada"""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                pass
+    return records
+
+
+class TestBatchCommand:
+    """Testes para o subcomando batch de main.py"""
+
+    @pytest.fixture
+    def evaluated(self, monkeypatch):
+        """Avaliação falsa; registra os textos avaliados"""
+        texts = []
+
+        def fake_evaluate(research_paper, article_theme, **kwargs):
+            texts.append(research_paper)
+            return {"final_score": 0.7, "research_paper": research_paper}
+
+        monkeypatch.setattr(batch, "evaluate_research_paper", fake_evaluate)
+        return texts
+
+    @pytest.fixture
+    def papers(self, tmp_path):
+        papers = tmp_path / "papers"
+        papers.mkdir()
+        write_pdf(papers / "a.pdf", "Graph neural networks")
+        write_pdf(papers / "b.pdf", "Soil moisture sensors")
+        (papers / "vazio.pdf").write_bytes(b"")
+        (papers / "notas.txt").write_text("não é um PDF")
+        return papers
+
+    def run(self, papers, out, *options):
+        return main(
+            [
+                "batch",
+                str(papers),
+                "--theme",
+                "tema",
+                "--out",
+                str(out),
+                "--workers",
+                "2",
+                "--extract-workers",
+                "1",
+                *options,
+            ]
+        )
+
+    def test_writes_one_record_per_pdf(self, evaluated, papers, tmp_path):
+        """Uma linha JSONL por PDF; uma falha não para o lote, mas muda o código"""
+        out = tmp_path / "results.jsonl"
+
+        assert self.run(papers, out) == 1
+
+        records = {
+            os.path.basename(record["path"]): record for record in read_records(out)
+        }
+        assert sorted(records) == ["a.pdf", "b.pdf", "vazio.pdf"]
+        assert records["a.pdf"]["ok"] and records["a.pdf"]["final_score"] == 0.7
+        # O texto do paper não é gravado de novo na saída
+        assert records["a.pdf"]["result"] == {"final_score": 0.7}
+        assert (
+            not records["vazio.pdf"]["ok"]
+            and "Could not extract text" in records["vazio.pdf"]["error"]
+        )
+
+    def test_restart_skips_papers_already_in_the_output(
+        self, evaluated, papers, tmp_path
+    ):
+        """Nova execução só avalia os PDFs que faltam; --retry-failed repete falhas"""
+        out = tmp_path / "results.jsonl"
+        self.run(papers, out)
+        write_pdf(papers / "c.pdf", "Crop yield prediction")
+        # Uma linha cortada por uma execução interrompida
+        with open(out, "a", encoding="utf-8") as f:
+            f.write('{"path": "')
+        evaluated.clear()
+
+        self.run(papers, out)
+        assert len(evaluated) == 1 and "Crop yield prediction" in evaluated[0]
+
+        self.run(papers, out, "--retry-failed")
+        assert len(evaluated) == 1
+        assert len(read_records(out)) == 5
+
+    def test_missing_results_fail_the_run(self, papers, tmp_path, monkeypatch):
+        """Se faltam resultados do pipeline, a execução não termina como concluída"""
+
+        def lossy_pipeline(jobs, **kwargs):
+            for index, (source, article_theme) in enumerate(list(jobs)[:1]):
+                yield batch.BatchResult(
+                    index, source, article_theme, result={"final_score": 0.7}
+                )
+
+        monkeypatch.setattr(batch, "evaluate_pipeline", lossy_pipeline)
+        out = tmp_path / "results.jsonl"
+
+        assert self.run(papers, out) == 1
+        assert len(read_records(out)) == 1
+
+    def test_other_theme_is_evaluated_again(self, tmp_path):
+        out = tmp_path / "results.jsonl"
+        out.write_text(
+            json.dumps({"path": "/p/a.pdf", "theme": "tema", "ok": True})
+            + "\n"
+            + json.dumps({"path": "/p/b.pdf", "theme": "tema", "ok": False})
+            + "\n"
+            + json.dumps({"path": "/p/b.pdf", "theme": "outro tema", "ok": True})
+            + "\n"
+        )
+
+        assert load_finished(out, "tema") == {"/p/a.pdf", "/p/b.pdf"}
+        assert load_finished(out, "tema", retry_failed=True) == {"/p/a.pdf"}
+        assert load_finished(out, "outro tema") == {"/p/b.pdf"}
+        assert load_finished(tmp_path / "ausente.jsonl", "tema") == set()
+
+    def test_serve_passes_its_options_to_the_job_service(self, monkeypatch):
+        from article_scout import job_service
+
+        received = []
+        monkeypatch.setattr(job_service, "main", received.append)
+
+        assert main(["serve", "--port", "0", "--workers", "2"]) == 0
+        assert received == [["--port", "0", "--workers", "2"]]
+
+    def test_invalid_arguments(self, tmp_path):
+        with pytest.raises(SystemExit):
+            main(["batch", str(tmp_path / "ausente"), "--theme", "tema"])
+        with pytest.raises(SystemExit):
+            main(["batch", str(tmp_path), "--theme", "tema", "--workers", "0"])
+        with pytest.raises(SystemExit):
+            main(["batch", str(tmp_path), "--theme", "tema", "--port", "0"])
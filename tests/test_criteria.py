@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Testes do registro de critérios: prompts, arquivo de configuração e grafo gerado a
+partir dele
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_dir = os.path.join(project_root, "src")
+sys.path.insert(0, package_dir)
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+
+from article_scout import article_scout_agent
+from article_scout.article_scout_agent import evaluate_research_paper
+from article_scout.utils.criteria import (
+    DEFAULT_CRITERIA,
+    Criterion,
+    load_criteria,
+    registry_fingerprint,
+)
+from article_scout.utils.rate_limiter import RateLimiter
+from article_scout.utils.tokens import count_tokens
+
+PAPER = "We evaluate a new method for things. " * 50
+REPRODUCIBILITY_TEMPLATE = (
+    "Can the paper be reproduced? Research Paper: {research_paper}"
+)
+
+
+def write_config(tmp_path, overrides: dict) -> str:
+    path = tmp_path / "criteria.json"
+    path.write_text(json.dumps(overrides), encoding="utf-8")
+    return str(path)
+
+
+class TestCriterion:
+    """Testes para Criterion e load_criteria"""
+
+    def test_render_matches_prompt_template(self):
+        """render() produz exatamente o texto de ChatPromptTemplate.format()"""
+        for criterion in load_criteria():
+            assert criterion.render("theme {x}", "paper") == criterion.prompt.format(
+                article_theme="theme {x}", research_paper="paper"
+            )
+
+    def test_defaults(self):
+        """Sem arquivo, os sete critérios padrão na ordem original"""
+        criteria = load_criteria()
+        assert [c.name for c in criteria] == [item["name"] for item in DEFAULT_CRITERIA]
+        assert sum(c.weight for c in criteria) == pytest.approx(1.0)
+
+    def test_override_remove_and_add(self, tmp_path):
+        """O arquivo ajusta, remove e acrescenta critérios"""
+        path = write_config(
+            tmp_path,
+            {
+                "writing_clarity": {
+                    "weight": 0.05,
+                    "excerpt": "head",
+                    "input_tokens": 500,
+                },
+                "references_timeliness": None,
+                "reproducibility": {
+                    "label": "Reproducibility",
+                    "weight": 0.1,
+                    "template": REPRODUCIBILITY_TEMPLATE,
+                },
+            },
+        )
+        criteria = {c.name: c for c in load_criteria(path)}
+
+        assert "references_timeliness" not in criteria
+        assert criteria["writing_clarity"].excerpt == "head"
+        assert criteria["writing_clarity"].label == "Writing Clarity"
+        assert list(criteria)[-1] == "reproducibility"
+        assert criteria["reproducibility"].summary == "reproducibility"
+
+    def test_fingerprint_follows_the_prompt(self):
+        """A impressão digital muda com o template, não com o rótulo ou o peso"""
+        base = dict(name="x", label="X", template="Judge {research_paper}", weight=1.0)
+        assert (
+            Criterion(**base).fingerprint
+            == Criterion(**{**base, "label": "Y", "weight": 2.0}).fingerprint
+        )
+        assert (
+            Criterion(**base).fingerprint
+            != Criterion(**{**base, "template": "Rate {research_paper}"}).fingerprint
+        )
+        assert registry_fingerprint([Criterion(**base)]) != registry_fingerprint(
+            [Criterion(**{**base, "weight": 2.0})]
+        )
+
+    @pytest.mark.parametrize(
+        "override",
+        [
+            {"template": "No paper placeholder"},
+            {"excerpt": "middle"},
+            {"weight": -1},
+            {"unknown_field": 1},
+        ],
+    )
+    def test_invalid_definitions(self, tmp_path, override):
+        """Definições inválidas geram ValueError"""
+        with pytest.raises(ValueError):
+            load_criteria(write_config(tmp_path, {"originality": override}))
+
+    def test_all_zero_weights(self, tmp_path):
+        """Pesos todos zerados não formam uma nota final"""
+        with pytest.raises(ValueError):
+            load_criteria(
+                write_config(
+                    tmp_path, {item["name"]: {"weight": 0} for item in DEFAULT_CRITERIA}
+                )
+            )
+
+
+class TestGeneratedGraph:
+    """Testes do grafo, do esquema e da nota final gerados a partir do registro"""
+
+    @pytest.fixture(autouse=True)
+    def fake_model(self, monkeypatch):
+        monkeypatch.setattr(article_scout_agent, "rate_limiter", RateLimiter())
+
+    def test_one_node_and_schema_field_per_criterion(self):
+        """Cada critério vira um nó check_<nome> e um campo da chamada única"""
+        names = list(article_scout_agent.CRITERIA)
+        assert list(article_scout_agent.CRITERIA_NODES) == [
+            f"check_{name}" for name in names
+        ]
+        assert list(article_scout_agent.PaperAssessment.model_fields) == names
+
+    def test_final_score_uses_registry_weights(self, monkeypatch):
+        """A nota final é a média ponderada com os pesos do registro"""
+        monkeypatch.setattr(
+            article_scout_agent,
+            "llm",
+            FakeListChatModel(responses=["Score: 0.6\nExplanation: Ok."]),
+        )
+        result = evaluate_research_paper(PAPER, "things")
+        assert result["final_score"] == pytest.approx(0.6)
+        scores = {f"{name}_score": 0.0 for name in article_scout_agent.CRITERIA}
+        scores["relevance_score"] = 1.0
+        final = article_scout_agent.calculate_final_score(scores)["final_score"]
+        assert final == pytest.approx(
+            article_scout_agent.CRITERION_WEIGHTS["relevance"]
+        )
+
+    def test_full_excerpt_fits_the_request(self):
+        """Com seções detectadas, um critério "full" recebe o paper cortado ao limite"""
+        criterion = Criterion(
+            name="clarity", label="Clarity", template=REPRODUCIBILITY_TEMPLATE, weight=1
+        )
+        criterion = Criterion(**{**criterion.to_dict(), "excerpt": "full"})
+        long_paper = "Introduction\n" + "We describe the method in detail. " * 3000
+        state = {
+            "research_paper": long_paper,
+            "article_theme": "things",
+            "paper_sections": [{"name": "introduction"}],
+        }
+        budget = article_scout_agent._paper_token_budget(
+            [criterion.prompt], "things", criterion.output_tokens
+        )
+
+        excerpt = article_scout_agent._criterion_input(criterion, state)
+        assert count_tokens(long_paper) > budget
+        assert long_paper.startswith(excerpt)
+        assert budget - 50 < count_tokens(excerpt) <= budget
+        # Sem seções, o paper já foi cortado em _prepare_initial_state
+        state["paper_sections"] = []
+        assert article_scout_agent._criterion_input(criterion, state) == long_paper
+
+    def test_custom_registry_end_to_end(self, tmp_path):
+        """Um arquivo de critérios muda o grafo, o resultado e a nota, sem código"""
+        path = write_config(
+            tmp_path,
+            {
+                **{
+                    item["name"]: None
+                    for item in DEFAULT_CRITERIA
+                    if item["name"] not in ("relevance", "originality")
+                },
+                "reproducibility": {
+                    "label": "Reproducibility",
+                    "weight": 0.2,
+                    "output_tokens": 100,
+                    "template": REPRODUCIBILITY_TEMPLATE,
+                },
+            },
+        )
+        script = (
+            "from article_scout import article_scout_agent as a\n"
+            "from langchain_core.language_models import FakeListChatModel\n"
+            "a.llm = FakeListChatModel(responses=['Score: 0.5\\nExplanation: Ok.'])\n"
+            "r = a.evaluate_research_paper(\n"
+            "    'A paper. ' * 50, 'things', relevance_threshold=0.1\n"
+            ")\n"
+            "print(\n"
+            "    sorted(a.CRITERIA_NODES),\n"
+            "    round(r['final_score'], 6),\n"
+            "    r['reproducibility_explanation'],\n"
+            ")\n"
+        )
+        env = {**os.environ, "CRITERIA_CONFIG": path, "LOG_LEVEL": "WARNING"}
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=package_dir,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+        assert output.strip() == (
+            "['check_originality', 'check_relevance', 'check_reproducibility'] 0.5 Ok."
+        )
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Testes do cache persistente de avaliações
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from article_scout.utils.evaluation_cache import EvaluationCache, make_cache_key
+
+
+class TestEvaluationCache:
+    """Testes para EvaluationCache e make_cache_key"""
+
+    @pytest.fixture
+    def cache_path(self, tmp_path):
+        return str(tmp_path / "cache" / "evaluations.sqlite3")
+
+    def test_key_depends_on_every_part(self):
+        """Qualquer mudança de texto, tema ou modelo gera outra chave"""
+        base = make_cache_key("1", "llama-3.1-8b-instant", 0.3, "tema", "texto")
+
+        assert base == make_cache_key("1", "llama-3.1-8b-instant", 0.3, "tema", "texto")
+        assert base != make_cache_key("2", "llama-3.1-8b-instant", 0.3, "tema", "texto")
+        assert base != make_cache_key(
+            "1", "llama-3.1-8b-instant", 0.3, "tema", "texto!"
+        )
+        assert base != make_cache_key("1", "llama-3.1-8b-instant", 0.7, "tema", "texto")
+
+    def test_hits_misses_and_persistence(self, cache_path):
+        """Valores sobrevivem ao reabrir o arquivo e os contadores são atualizados"""
+        cache = EvaluationCache(cache_path)
+        assert cache.get("k") is None
+        cache.set("k", {"final_score": 0.7})
+        assert cache.get("k") == {"final_score": 0.7}
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+        cache.close()
+
+        reopened = EvaluationCache(cache_path)
+        assert reopened.get("k") == {"final_score": 0.7}
+
+    def test_ttl_expiration(self, cache_path):
+        """Entradas mais antigas que o TTL são descartadas"""
+        cache = EvaluationCache(cache_path, ttl_seconds=0.05)
+        cache.set("k", {"final_score": 0.7})
+        time.sleep(0.1)
+
+        assert cache.get("k") is None
+        assert cache.stats()["evictions"] == 1
+
+    def test_size_eviction_keeps_recently_used(self, cache_path):
+        """Ao passar de max_entries, a entrada menos usada recentemente sai"""
+        cache = EvaluationCache(cache_path, max_entries=2)
+        cache.set("a", {"v": 1})
+        time.sleep(0.01)
+        cache.set("b", {"v": 2})
+        time.sleep(0.01)
+        cache.get("a")
+        time.sleep(0.01)
+        cache.set("c", {"v": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+        assert cache.get("c") == {"v": 3}
+        assert cache.stats()["entries"] == 2
@@ -11,9 +11,11 @@ import pprint
 # Adiciona o diretório raiz do projeto ao path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
 
-from utils.pdf_extractor import extract_text_from_pdf
-from article_scout_agent import evaluate_research_paper, format_results_for_display
+from article_scout.utils.pdf_extractor import extract_text_from_pdf
+from article_scout.utils.tokens import count_tokens
+from article_scout.article_scout_agent import evaluate_research_paper, format_results_for_display
 
 class TestIntegration:
     """Testes de integração entre extração de PDF e avaliação"""
@@ -101,9 +103,9 @@ class TestIntegration:
             
             # Verifica se o truncamento está funcionando
             if text_1000 and text_3000 and text_5000:
-                assert len(text_1000) <= 4000, "1000 tokens deve ser <= 4000 chars"
-                assert len(text_3000) <= 12000, "3000 tokens deve ser <= 12000 chars"
-                assert len(text_5000) <= 20000, "5000 tokens deve ser <= 20000 chars"
+                assert count_tokens(text_1000) <= 1000, "Texto deve ter <= 1000 tokens"
+                assert count_tokens(text_3000) <= 3000, "Texto deve ter <= 3000 tokens"
+                assert count_tokens(text_5000) <= 5000, "Texto deve ter <= 5000 tokens"
                 print(f"✅ Truncamento funcionando corretamente para {pdf_file}")
     
     def test_evaluation_with_truncated_text(self, input_dir, pdf_files):
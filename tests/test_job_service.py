@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Testes do serviço HTTP de jobs (fila limitada, workers, polling e server-sent events)
+"""
+
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+
+from article_scout import article_scout_agent, job_service
+from article_scout.job_service import JobRejected, JobService, make_server
+from article_scout.utils.pdf_extractor import DEFAULT_MAX_TOKENS
+from article_scout.utils.rate_limiter import RateLimiter
+
+PAPER = "We evaluate a new method for things. " * 50
+
+
+def request(
+    base_url: str,
+    path: str,
+    body: bytes | None = None,
+    content_type: str | None = None,
+    headers: dict | None = None,
+) -> tuple[int, dict]:
+    """Faz uma requisição e devolve (status, JSON da resposta)"""
+    req = urllib.request.Request(
+        base_url + path, data=body, headers=dict(headers or {})
+    )
+    if content_type:
+        req.add_header("Content-Type", content_type)
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def submit_text(
+    base_url: str, text: str = PAPER, theme: str = "things", **options
+) -> tuple[int, dict]:
+    body = json.dumps({"text": text, "theme": theme, **options}).encode()
+    return request(base_url, "/jobs", body, "application/json")
+
+
+def wait_for(base_url: str, job_id: str, timeout: float = 10) -> dict:
+    """Consulta o job até ele terminar"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        _, job = request(base_url, f"/jobs/{job_id}")
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def read_events(
+    base_url: str, job_id: str, last_event_id: int | None = None
+) -> list[tuple[str, dict]]:
+    """Lê o stream de server-sent events do job até o servidor encerrá-lo"""
+    req = urllib.request.Request(f"{base_url}/jobs/{job_id}/events")
+    if last_event_id is not None:
+        req.add_header("Last-Event-ID", str(last_event_id))
+    with urllib.request.urlopen(req, timeout=10) as response:
+        assert response.headers["Content-Type"] == "text/event-stream"
+        stream = response.read().decode()
+    events = []
+    for block in stream.strip().split("\n\n"):
+        fields = dict(
+            line.split(": ", 1)
+            for line in block.splitlines()
+            if not line.startswith(":")
+        )
+        if fields:
+            events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+class TestJobService:
+    """Testes para JobService e os endpoints HTTP"""
+
+    @pytest.fixture(autouse=True)
+    def model(self, monkeypatch):
+        monkeypatch.setattr(article_scout_agent, "rate_limiter", RateLimiter())
+        monkeypatch.setattr(
+            article_scout_agent,
+            "llm",
+            FakeListChatModel(responses=["Score: 0.6\nExplanation: Ok."]),
+        )
+
+    @pytest.fixture
+    def service(self):
+        service = JobService(workers=2, queue_size=10)
+        yield service
+        service.close(timeout=5)
+
+    @pytest.fixture
+    def base_url(self, service):
+        server = make_server(service, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    def test_text_job_is_evaluated(self, base_url):
+        """Um job com texto recebe um id na hora e termina com o resultado"""
+        status, accepted = submit_text(
+            base_url, single_call=False, relevance_threshold=0.1
+        )
+        assert status == 202 and accepted["status"] in ("queued", "running")
+
+        job = wait_for(base_url, accepted["job_id"])
+        assert job["status"] == "succeeded"
+        assert job["options"] == {"single_call": False, "relevance_threshold": 0.1}
+        assert job["result"]["final_score"] == pytest.approx(0.6)
+        assert "research_paper" not in job["result"]
+        assert sorted(event["criterion"] for event in job["events"]) == sorted(
+            article_scout_agent.CRITERIA
+        )
+
+    def test_pdf_upload(self, base_url, monkeypatch):
+        """PDFs chegam como multipart ou como corpo application/pdf"""
+        uploads, limits = [], []
+
+        def extract(path, max_tokens):
+            with open(path, "rb") as f:
+                uploads.append(f.read())
+            limits.append(max_tokens)
+            return PAPER
+
+        monkeypatch.setattr(job_service, "extract_text_from_pdf", extract)
+        boundary = "article-scout-test"
+        multipart = (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="theme"\r\n\r\nthings\r\n'
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="paper.pdf"\r\n'
+            "Content-Type: application/pdf\r\n\r\n%PDF-1.4 multipart\r\n"
+            f"--{boundary}--\r\n"
+        ).encode()
+        _, first = request(
+            base_url, "/jobs", multipart, f"multipart/form-data; boundary={boundary}"
+        )
+        _, second = request(
+            base_url,
+            "/jobs?theme=things&cascade=false",
+            b"%PDF-1.4 raw",
+            "application/pdf",
+        )
+
+        assert wait_for(base_url, first["job_id"])["status"] == "succeeded"
+        job = wait_for(base_url, second["job_id"])
+        assert job["status"] == "succeeded" and job["options"] == {"cascade": False}
+        assert sorted(uploads) == [b"%PDF-1.4 multipart", b"%PDF-1.4 raw"]
+        assert limits == [DEFAULT_MAX_TOKENS] * 2
+
+        # O map-reduce divide o texto inteiro: a extração não é truncada
+        _, third = request(
+            base_url,
+            "/jobs?theme=things&map_reduce=true",
+            b"%PDF-1.4",
+            "application/pdf",
+        )
+        assert wait_for(base_url, third["job_id"])["status"] == "succeeded"
+        assert limits[-1] is None
+
+    def test_failed_extraction_fails_the_job(self, base_url, monkeypatch):
+        monkeypatch.setattr(
+            job_service, "extract_text_from_pdf", lambda path, max_tokens: ""
+        )
+        _, accepted = request(
+            base_url, "/jobs?theme=things", b"not a pdf", "application/pdf"
+        )
+
+        job = wait_for(base_url, accepted["job_id"])
+        assert job["status"] == "failed" and "Could not extract text" in job["error"]
+
+    def test_server_sent_events(self, base_url):
+        """O stream traz status, critérios e o fim, e retoma após Last-Event-ID"""
+        _, accepted = submit_text(base_url)
+        events = read_events(base_url, accepted["job_id"])
+
+        kinds = [kind for kind, _ in events]
+        assert kinds[:2] == ["status", "status"] and kinds[-2:] == ["final", "status"]
+        assert kinds.count("criterion") == len(article_scout_agent.CRITERIA)
+        assert events[-2][1]["final_score"] == pytest.approx(0.6)
+        assert events[-1][1] == {"event": "status", "status": "succeeded"}
+
+        assert (
+            read_events(base_url, accepted["job_id"], last_event_id=len(events) - 2)
+            == events[-1:]
+        )
+
+    def test_invalid_submissions(self, base_url):
+        assert submit_text(base_url, theme="")[0] == 400
+        assert submit_text(base_url, text="   ")[0] == 400
+        # Campos JSON de outro tipo são recusados na leitura da requisição
+        assert submit_text(base_url, text=5)[0] == 400
+        assert submit_text(base_url, text=["A paper."])[0] == 400
+        assert submit_text(base_url, theme={"name": "things"})[0] == 400
+        assert (
+            request(base_url, "/jobs", b'["not", "an object"]', "application/json")[0]
+            == 400
+        )
+        assert submit_text(base_url, relevance_threshold="high")[0] == 400
+        assert submit_text(base_url, single_call=True, map_reduce=True)[0] == 400
+        assert request(base_url, "/jobs", b"x", "text/plain")[0] == 415
+        assert request(base_url, "/jobs/unknown")[0] == 404
+
+    @pytest.mark.parametrize(
+        "content_length, status", [(None, 411), ("abc", 400), ("-5", 400)]
+    )
+    def test_content_length_is_validated(self, base_url, content_length, status):
+        """Sem Content-Length o pedido é recusado com 411; um valor inválido, com 400"""
+        host, port = base_url.removeprefix("http://").split(":")
+        connection = http.client.HTTPConnection(host, int(port), timeout=10)
+        try:
+            connection.putrequest("POST", "/jobs")
+            connection.putheader("Content-Type", "application/json")
+            if content_length is not None:
+                connection.putheader("Content-Length", content_length)
+            connection.endheaders()
+            response = connection.getresponse()
+            assert response.status == status
+            assert "error" in json.loads(response.read())
+        finally:
+            connection.close()
+
+    def test_full_queue_rejects_submissions(self, monkeypatch):
+        """Com a fila cheia, novos jobs são recusados (503) em vez de acumular"""
+        release = threading.Event()
+
+        def blocked_evaluation(*args, **kwargs):
+            release.wait(5)
+            yield {"event": "final", "final_score": 0.5, "result": {"final_score": 0.5}}
+
+        monkeypatch.setattr(
+            job_service, "stream_research_paper_evaluation", blocked_evaluation
+        )
+        service = JobService(workers=1, queue_size=2)
+        try:
+            jobs = [service.submit("things", {}, text=PAPER)]
+            while service.stats()["running"] == 0:
+                time.sleep(0.01)
+            jobs += [service.submit("things", {}, text=PAPER) for _ in range(2)]
+            with pytest.raises(JobRejected) as rejected:
+                service.submit("things", {}, text=PAPER)
+            assert rejected.value.status == 503
+            assert service.stats()["running"] == 1 and service.stats()["queued"] == 2
+        finally:
+            release.set()
+            service.close(timeout=5)
+        assert all(job.status == "succeeded" for job in jobs)
+
+    def test_health(self, base_url):
+        status, health = request(base_url, "/health")
+        assert status == 200 and health["workers"] == 2 and health["queued"] == 0
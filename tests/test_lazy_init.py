@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Testes da inicialização preguiçosa do agente (modelo, cache e grafos construídos no
+primeiro uso)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+package_dir = os.path.join(project_root, "src")
+sys.path.insert(0, package_dir)
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+
+from article_scout import article_scout_agent
+
+
+def run_in_new_interpreter(script: str) -> dict:
+    env = {**os.environ, "LLM_BACKEND": "fake", "LOG_LEVEL": "WARNING"}
+    output = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=package_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output)
+
+
+class TestLazyInitialization:
+    """Testes para _get, initialize e o acesso preguiçoso aos atributos do módulo"""
+
+    def test_import_does_not_load_langgraph_or_the_model(self):
+        """Importar o agente não importa LangGraph/LangChain nem cria recursos"""
+        loaded = run_in_new_interpreter(
+            "import json, sys\n"
+            "from article_scout import article_scout_agent as a\n"
+            "built = sorted(name for name in a._LAZY_FACTORIES if name in vars(a))\n"
+            "print(json.dumps({'langgraph': 'langgraph' in sys.modules,\n"
+            "                  'langchain': 'langchain_core' in sys.modules,\n"
+            "                  'built': built}))\n"
+        )
+        assert loaded == {"langgraph": False, "langchain": False, "built": []}
+
+    def test_import_does_not_load_the_env_file(self, tmp_path):
+        """O .env é carregado pelo ponto de entrada (Streamlit, CLI), não pelo agente"""
+        (tmp_path / ".env").write_text("ARTICLE_SCOUT_TEST_VARIABLE=set\n")
+        script = (
+            "import json, os, sys\n"
+            f"sys.path.insert(0, {package_dir!r})\n"
+            "from article_scout import article_scout_agent\n"
+            "print(json.dumps(os.getenv('ARTICLE_SCOUT_TEST_VARIABLE')))\n"
+        )
+        env = {**os.environ, "LLM_BACKEND": "fake", "LOG_LEVEL": "WARNING"}
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=tmp_path,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        assert json.loads(output) is None
+
+    def test_first_use_builds_the_graph(self):
+        """A primeira avaliação constrói o modelo e os grafos do módulo"""
+        built = run_in_new_interpreter(
+            "import json\n"
+            "from article_scout import article_scout_agent as a\n"
+            "a.evaluate_research_paper('A paper. ' * 50, 'things')\n"
+            "print(json.dumps({'llm': 'llm' in vars(a), 'app': 'app' in vars(a),"
+            " 'single_call_app': 'single_call_app' in vars(a)}))\n"
+        )
+        assert built == {"llm": True, "app": True, "single_call_app": True}
+
+    def test_resources_are_built_once_across_threads(self, monkeypatch):
+        """Threads concorrentes recebem o mesmo objeto, construído uma única vez"""
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return {"test_resource": object()}
+
+        monkeypatch.setitem(
+            article_scout_agent._LAZY_FACTORIES, "test_resource", factory
+        )
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(article_scout_agent.test_resource)
+            )
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        del article_scout_agent.test_resource
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Testes do índice léxico local (BM25) e da pré-seleção de papers por tema
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+
+from article_scout import batch
+from article_scout.batch import prefilter_jobs, rank_papers
+from article_scout.utils.lexical_index import LexicalIndex, tokenize
+
+GRAPHS = (
+    "We propose graph neural networks for molecule property prediction. The graph "
+    "encoder " * 20
+)
+RETRIEVAL = (
+    "Dense retrieval with neural networks improves search. Retrieval of passages " * 20
+)
+SOIL = (
+    "Soil moisture sensors in irrigation of coffee farms. Sensors measure moisture "
+    * 20
+)
+
+
+class TestLexicalIndex:
+    """Testes para tokenize e LexicalIndex"""
+
+    def test_tokenize(self):
+        """Minúsculas, sem acentos, sem stopwords e sem o plural em 's'"""
+        assert tokenize("Redes Neurais para Análise de Imagens") == [
+            "rede",
+            "neurai",
+            "imagen",
+        ]
+        assert tokenize("The Networks of the network") == ["network", "network"]
+        assert tokenize("class process") == ["class", "process"]
+
+    def test_search_ranks_by_bm25(self):
+        """Quem mais usa os termos do tema vem primeiro; sem termos comuns, some"""
+        index = LexicalIndex(":memory:")
+        index.add("graphs", GRAPHS)
+        index.add("retrieval", RETRIEVAL)
+        index.add("soil", SOIL)
+
+        hits = index.search("Graph Neural Networks")
+        assert [hit.doc_id for hit in hits] == ["graphs", "retrieval"]
+        assert hits[0].score > hits[1].score > 0
+        assert index.search("graph networks", top_k=1)[0].doc_id == "graphs"
+        assert [
+            hit.doc_id for hit in index.search("neural", doc_ids=["retrieval", "soil"])
+        ] == ["retrieval"]
+        assert index.search("of the") == []
+
+    def test_reindex_and_remove(self, tmp_path):
+        """Reindexar substitui o documento, e o índice persiste no arquivo"""
+        path = str(tmp_path / "prefilter.sqlite3")
+        index = LexicalIndex(path)
+        index.add("paper", SOIL, fingerprint="v1")
+        index.add("paper", GRAPHS, fingerprint="v2")
+        index.close()
+
+        reopened = LexicalIndex(path)
+        assert len(reopened) == 1 and reopened.fingerprint("paper") == "v2"
+        assert reopened.search("moisture") == []
+        assert reopened.search("graph")[0].doc_id == "paper"
+
+        reopened.remove("paper")
+        assert "paper" not in reopened and reopened.fingerprint("paper") is None
+
+    def test_ranking_is_fast(self):
+        """Ordenar um corpus de 2000 papers leva milissegundos"""
+        index = LexicalIndex(":memory:")
+        for i in range(2000):
+            index.add(f"paper-{i}", (GRAPHS, RETRIEVAL, SOIL)[i % 3] + f" paper{i}")
+
+        start = time.perf_counter()
+        hits = index.search("graph neural networks for molecules", top_k=10)
+        assert time.perf_counter() - start < 0.5
+        assert len(hits) == 10
+
+
+class TestPrefilter:
+    """Testes para rank_papers e prefilter_jobs"""
+
+    @pytest.fixture
+    def extractions(self, monkeypatch, tmp_path):
+        """PDFs falsos cujo texto vem de um dicionário; registra as extrações"""
+        texts = {"graphs.pdf": GRAPHS, "soil.pdf": SOIL, "empty.pdf": ""}
+        extracted = []
+        for name in texts:
+            (tmp_path / name).write_bytes(b"%PDF-1.4")
+
+        def extract(path, max_tokens):
+            extracted.append(os.path.basename(path))
+            return texts[os.path.basename(path)]
+
+        monkeypatch.setattr(batch, "extract_text_from_pdf", extract)
+        return extracted
+
+    def test_rank_papers(self, extractions, tmp_path):
+        """Textos e PDFs são ordenados juntos; sem termos comuns, fica no fim com 0"""
+        sources = [
+            str(tmp_path / "soil.pdf"),
+            RETRIEVAL,
+            str(tmp_path / "graphs.pdf"),
+            str(tmp_path / "empty.pdf"),
+        ]
+        ranked = rank_papers(
+            sources, "graph neural networks", index=LexicalIndex(":memory:")
+        )
+
+        assert [paper.source for paper in ranked] == [
+            sources[2],
+            sources[1],
+            sources[0],
+            sources[3],
+        ]
+        assert ranked[0].relative_score == 1.0 and 0 < ranked[1].relative_score < 1
+        assert ranked[2].score == ranked[3].score == 0.0
+
+    def test_missing_pdf_ranks_last(self, extractions, tmp_path):
+        """Um PDF inexistente não interrompe a ordenação: fica no fim com score 0"""
+        missing = str(tmp_path / "missing.pdf")
+        ranked = rank_papers(
+            [missing, str(tmp_path / "graphs.pdf")],
+            "graph",
+            index=LexicalIndex(":memory:"),
+        )
+
+        assert [paper.source for paper in ranked][-1] == missing
+        assert ranked[-1].score == 0.0 and extractions == ["graphs.pdf"]
+
+    def test_unchanged_pdfs_are_not_extracted_again(self, extractions, tmp_path):
+        """O índice em disco evita reextrair PDFs que não mudaram"""
+        index = LexicalIndex(str(tmp_path / "prefilter.sqlite3"))
+        sources = [str(tmp_path / "graphs.pdf"), str(tmp_path / "soil.pdf")]
+        rank_papers(sources, "graph", index=index)
+        rank_papers(sources, "soil moisture", index=index)
+        assert sorted(extractions) == ["graphs.pdf", "soil.pdf"]
+
+        os.utime(tmp_path / "soil.pdf", ns=(0, 0))
+        rank_papers(sources, "soil moisture", index=index)
+        assert sorted(extractions) == ["graphs.pdf", "soil.pdf", "soil.pdf"]
+
+    def test_prefilter_jobs(self, extractions, tmp_path):
+        """top_k e min_score limitam os jobs; papers sem termos do tema nunca passam"""
+        index = LexicalIndex(":memory:")
+        sources = [SOIL, RETRIEVAL, GRAPHS]
+
+        assert prefilter_jobs(sources, "graph neural networks", index=index) == [
+            (GRAPHS, "graph neural networks"),
+            (RETRIEVAL, "graph neural networks"),
+        ]
+        assert prefilter_jobs(
+            sources, "graph neural networks", top_k=1, index=index
+        ) == [(GRAPHS, "graph neural networks")]
+        assert prefilter_jobs(
+            sources, "graph neural networks", min_score=0.99, index=index
+        ) == [(GRAPHS, "graph neural networks")]
+        with pytest.raises(ValueError):
+            prefilter_jobs(sources, "graph", top_k=0, index=index)
+
+    def test_default_index_path(self, monkeypatch, tmp_path):
+        """Sem índice explícito, usa o arquivo de PREFILTER_INDEX_PATH"""
+        path = tmp_path / "prefilter.sqlite3"
+        monkeypatch.setattr(batch, "PREFILTER_INDEX_PATH", str(path))
+        prefilter_jobs([GRAPHS, SOIL], "graph")
+
+        assert len(LexicalIndex(str(path))) == 2
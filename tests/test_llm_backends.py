@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Testes dos backends de modelo offline (falso e gravação/reprodução)
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import pytest
+from pydantic import BaseModel
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from article_scout.utils.llm_backends import (
+    CassetteChatModel,
+    CassetteMissError,
+    FakeAPIError,
+    FakeChatModel,
+)
+
+PROMPT = "Article Theme: things\n\nResearch Paper: We evaluate a new method for things."
+
+
+class Assessment(BaseModel):
+    score: float
+    explanation: str
+
+
+class TwoCriteria(BaseModel):
+    relevance: Assessment
+    originality: Assessment
+
+
+class TestFakeChatModel:
+    """Testes para FakeChatModel"""
+
+    def test_deterministic_score_contract(self):
+        """Mesmo prompt, mesma resposta no formato 'Score:/Explanation:'"""
+        first = FakeChatModel().invoke(PROMPT).content
+        second = FakeChatModel().invoke(PROMPT).content
+
+        assert first == second
+        assert first.startswith("Score: ") and "\nExplanation: " in first
+        assert 0.0 <= float(first.split()[1]) <= 1.0
+
+    def test_structured_output(self):
+        """Pedidos com saída estruturada recebem uma chamada de ferramenta válida"""
+        result = (
+            FakeChatModel(score=0.7)
+            .with_structured_output(TwoCriteria, include_raw=True)
+            .invoke(PROMPT)
+        )
+
+        assert result["parsing_error"] is None
+        assert result["parsed"].relevance.score == 0.7
+
+    def test_error_injection(self):
+        """Com error_rate=1 toda chamada falha do jeito configurado"""
+        with pytest.raises(FakeAPIError) as error:
+            FakeChatModel(error_rate=1.0, retry_after=2).invoke(PROMPT)
+        assert error.value.status_code == 429
+        assert error.value.response.headers["retry-after"] == "2"
+
+        malformed = FakeChatModel(error_rate=1.0, error_kind="malformed").invoke(PROMPT)
+        assert "Score:" not in malformed.content
+
+    def test_latency_distribution(self):
+        """A latência média segue a distribuição configurada"""
+        model = FakeChatModel(
+            latency_distribution="lognormal",
+            latency_mean=0.01,
+            latency_stddev=0.005,
+            seed=1,
+        )
+        latencies = [model._sample()[0] for _ in range(2000)]
+
+        assert statistics.mean(latencies) == pytest.approx(0.01, rel=0.1)
+        assert statistics.stdev(latencies) == pytest.approx(0.005, rel=0.2)
+
+    def test_async_calls_overlap(self):
+        """Chamadas assíncronas dormem no event loop e rodam em paralelo"""
+        model = FakeChatModel(latency_mean=0.1)
+
+        async def run():
+            return await asyncio.gather(*(model.ainvoke(PROMPT) for _ in range(5)))
+
+        start = time.perf_counter()
+        asyncio.run(run())
+        assert time.perf_counter() - start < 0.3
+
+
+class TestCassetteChatModel:
+    """Testes para CassetteChatModel"""
+
+    def test_record_then_replay(self, tmp_path):
+        """Respostas gravadas são reproduzidas sem o modelo real"""
+        path = str(tmp_path / "cassette.jsonl")
+        inner = FakeChatModel(model_name="inner")
+        recorder = CassetteChatModel(
+            model_name="m", path=path, mode="record", inner=inner
+        )
+        recorded = recorder.invoke(PROMPT).content
+        structured = recorder.with_structured_output(TwoCriteria).invoke(PROMPT)
+        recorder.invoke(PROMPT)
+        assert inner.stats["calls"] == 2
+
+        player = CassetteChatModel(model_name="m", path=path)
+        assert len(player) == 2
+        assert player.invoke(PROMPT).content == recorded
+        assert player.with_structured_output(TwoCriteria).invoke(PROMPT) == structured
+
+    def test_replay_miss(self, tmp_path):
+        """Um pedido que não foi gravado gera CassetteMissError"""
+        player = CassetteChatModel(model_name="m", path=str(tmp_path / "empty.jsonl"))
+
+        with pytest.raises(CassetteMissError):
+            player.invoke(PROMPT)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Testes da detecção de papers quase duplicados (MinHash/LSH) e do reaproveitamento
+das avaliações
+"""
+
+import os
+import random
+import sys
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+
+from article_scout import article_scout_agent
+from article_scout.article_scout_agent import evaluate_research_paper
+from article_scout.utils import telemetry
+from article_scout.utils.evaluation_cache import EvaluationCache
+from article_scout.utils.near_duplicates import (
+    NearDuplicateIndex,
+    estimate_similarity,
+    minhash_signature,
+)
+from article_scout.utils.rate_limiter import RateLimiter
+
+
+def make_paper(seed: int, words: int = 1500) -> str:
+    """Texto pseudoaleatório, mas determinístico, com um título na primeira linha"""
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(rng.choice("abcdefghijklmnop") for _ in range(rng.randint(2, 9)))
+        for _ in range(800)
+    ]
+    return f"Paper {seed}: A Study of Things\n" + " ".join(
+        rng.choice(vocabulary) for _ in range(words)
+    )
+
+
+def reextracted(text: str) -> str:
+    """A mesma versão extraída de outro PDF: outras quebras, maiúsculas e hífens"""
+    return (
+        text.replace(" ", "\n", 200).replace("Study", "STUDY").replace(" ab", " a-\nb")
+    )
+
+
+def revised(text: str, changed_every: int = 100) -> str:
+    """Uma revisão do paper (camera-ready): uma palavra a cada changed_every muda"""
+    words = text.split(" ")
+    return " ".join(
+        "revised" if i % changed_every == 0 else word for i, word in enumerate(words)
+    )
+
+
+class TestNearDuplicateIndex:
+    """Testes para minhash_signature e NearDuplicateIndex"""
+
+    def test_similarity_estimates(self):
+        """Reextrações são idênticas, revisões ficam próximas, outros papers longe"""
+        paper = make_paper(1)
+        signature = minhash_signature(paper)
+
+        assert (
+            estimate_similarity(signature, minhash_signature(reextracted(paper))) > 0.95
+        )
+        assert estimate_similarity(signature, minhash_signature(revised(paper))) > 0.8
+        assert estimate_similarity(signature, minhash_signature(make_paper(2))) < 0.1
+
+    def test_query_returns_the_match_within_its_scope(self, tmp_path):
+        """A consulta só acha papers do escopo acima do limiar; o índice persiste"""
+        path = str(tmp_path / "near_duplicates.sqlite3")
+        index = NearDuplicateIndex(path)
+        index.add("key-1", "scope-a", make_paper(1))
+        index.add("key-2", "scope-a", make_paper(2))
+
+        reopened = NearDuplicateIndex(path)
+        match = reopened.query(revised(make_paper(1)), "scope-a")
+        assert match.key == "key-1" and match.title == "Paper 1: A Study of Things"
+        assert reopened.query(make_paper(1), "scope-b") is None
+        assert reopened.query(make_paper(3), "scope-a") is None
+
+        reopened.remove("key-1")
+        assert reopened.query(make_paper(1), "scope-a") is None
+        assert len(reopened) == 1
+
+    def test_threshold(self):
+        """Com limiar 1.0 só textos com os mesmos shingles são encontrados"""
+        index = NearDuplicateIndex(":memory:", threshold=1.0)
+        index.add("key-1", "scope", make_paper(1))
+
+        assert index.query(reextracted(make_paper(1)), "scope") is not None
+        assert index.query(revised(make_paper(1)), "scope") is None
+
+    def test_invalid_configuration(self):
+        with pytest.raises(ValueError):
+            NearDuplicateIndex(":memory:", num_perm=100, bands=16)
+
+
+class TestNearDuplicateReuse:
+    """Testes do reaproveitamento da avaliação de um quase duplicado"""
+
+    @pytest.fixture(autouse=True)
+    def cache(self, monkeypatch):
+        monkeypatch.setattr(article_scout_agent, "rate_limiter", RateLimiter())
+        monkeypatch.setattr(
+            article_scout_agent, "evaluation_cache", EvaluationCache(":memory:")
+        )
+        monkeypatch.setattr(
+            article_scout_agent, "near_duplicate_index", NearDuplicateIndex(":memory:")
+        )
+
+    def use_model(self, monkeypatch, answer: str) -> list:
+        prompts = []
+        monkeypatch.setattr(
+            article_scout_agent, "llm", FakeListChatModel(responses=[answer])
+        )
+        original_invoke = article_scout_agent._invoke
+
+        def invoke(runnable, prompt, output_tokens, limiter=None):
+            prompts.append(prompt)
+            return original_invoke(runnable, prompt, output_tokens, limiter)
+
+        monkeypatch.setattr(article_scout_agent, "_invoke", invoke)
+        return prompts
+
+    @pytest.mark.parametrize("options", [{}, {"map_reduce": True}])
+    def test_revised_paper_reuses_the_stored_result(self, monkeypatch, options):
+        """Uma revisão do mesmo paper não chama o modelo e informa a correspondência"""
+        self.use_model(monkeypatch, "Score: 0.7\nExplanation: Original.")
+        original = evaluate_research_paper(make_paper(1), "things", **options)
+        assert original["near_duplicate"] is None
+
+        prompts = self.use_model(monkeypatch, "Score: 0.1\nExplanation: Fresh.")
+        hits_before = telemetry.NEAR_DUPLICATE_HITS.value()
+        result = evaluate_research_paper(revised(make_paper(1)), "things", **options)
+
+        assert prompts == []
+        assert result["relevance_explanation"] == "Original."
+        assert result["final_score"] == pytest.approx(original["final_score"])
+        assert result["near_duplicate"]["title"] == "Paper 1: A Study of Things"
+        assert (
+            result["near_duplicate"]["similarity"]
+            >= article_scout_agent.NEAR_DUPLICATE_THRESHOLD
+        )
+        assert result["research_paper"] == revised(make_paper(1))
+        assert telemetry.NEAR_DUPLICATE_HITS.value() == hits_before + 1
+
+    def test_other_paper_or_theme_is_evaluated(self, monkeypatch):
+        """Outro paper, ou o mesmo paper com outro tema, é avaliado normalmente"""
+        self.use_model(monkeypatch, "Score: 0.7\nExplanation: Original.")
+        evaluate_research_paper(make_paper(1), "things")
+
+        prompts = self.use_model(monkeypatch, "Score: 0.1\nExplanation: Fresh.")
+        other_paper = evaluate_research_paper(make_paper(2), "things")
+        other_theme = evaluate_research_paper(revised(make_paper(1)), "other things")
+
+        assert len(prompts) == 2 * len(article_scout_agent.CRITERIA)
+        assert (
+            other_paper["near_duplicate"] is None
+            and other_theme["near_duplicate"] is None
+        )
+        assert other_theme["relevance_explanation"] == "Fresh."
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Testes do parsing tolerante das respostas e do reparo (nova pergunta) do critério
+que falhou
+"""
+
+import os
+import sys
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+
+from article_scout import article_scout_agent
+from article_scout.article_scout_agent import (
+    evaluate_research_paper,
+    summarize_parse_repairs,
+)
+from article_scout.utils import telemetry
+from article_scout.utils.parsing import parse_score_response
+from article_scout.utils.rate_limiter import RateLimiter
+
+PAPER = "We evaluate a new method for things. " * 50
+
+
+class TestParseScoreResponse:
+    """Testes para parse_score_response"""
+
+    @pytest.mark.parametrize(
+        "content, expected",
+        [
+            ("Score: 0.8\nExplanation: Good.\nMore.", (0.8, "Good.\nMore.")),
+            ("Score: 8\nExplanation: Out of ten.", (0.8, "Out of ten.")),
+            ("**Score:** 7/10\n**Explanation:** Decorated.", (0.7, "Decorated.")),
+            (
+                '```json\n{"score": 0.65, "explanation": "Fenced JSON."}\n```',
+                (0.65, "Fenced JSON."),
+            ),
+            ('{"Rating": "9/10", "reasoning": "Other keys."}', (0.9, "Other keys.")),
+            ("Rating - 0.4\nReason: Other labels.", (0.4, "Other labels.")),
+            ("Score (0-1): 0.3\nJustification: Range hint.", (0.3, "Range hint.")),
+        ],
+    )
+    def test_accepted_formats(self, content, expected):
+        """JSON, rótulos decorados e notas de 0 a 10 ou em porcentagem são aceitos"""
+        score, explanation = parse_score_response(content)
+        assert score == pytest.approx(expected[0])
+        assert explanation == expected[1]
+
+    def test_explanation_without_label(self):
+        """Sem rótulo, a explicação é o restante da resposta"""
+        assert parse_score_response(
+            "The relevance score is 85%. It matches the theme."
+        ) == (pytest.approx(0.85), "The relevance score is 85%. It matches the theme.")
+
+    @pytest.mark.parametrize(
+        "content",
+        ["I cannot evaluate this.", "Score: 15", "Score: -1", '{"score": true}'],
+    )
+    def test_unusable_answers(self, content):
+        """Sem nota, ou com nota fora da escala, gera ValueError"""
+        with pytest.raises(ValueError):
+            parse_score_response(content)
+
+
+class TestParseRepair:
+    """Testes do reparo de respostas ilegíveis durante a avaliação"""
+
+    @pytest.fixture(autouse=True)
+    def fake_limiter(self, monkeypatch):
+        monkeypatch.setattr(article_scout_agent, "rate_limiter", RateLimiter())
+
+    def use_model(self, monkeypatch, responses):
+        model = FakeListChatModel(responses=responses)
+        monkeypatch.setattr(article_scout_agent, "llm", model)
+        return model
+
+    def test_failing_answer_is_repaired(self, monkeypatch):
+        """Só o critério ilegível é perguntado de novo, com o prompt curto de reparo"""
+        prompts = []
+        model = self.use_model(monkeypatch, ["Score: 0.6\nExplanation: Fine."])
+        original_invoke = article_scout_agent._invoke
+
+        def invoke(runnable, prompt, output_tokens, limiter=None):
+            prompts.append(prompt)
+            if "originality" in prompt and "Previous answer" not in prompt:
+                return model.invoke("unused").model_copy(
+                    update={"content": "I would rather not say."}
+                )
+            return original_invoke(runnable, prompt, output_tokens, limiter)
+
+        monkeypatch.setattr(article_scout_agent, "_invoke", invoke)
+        result = evaluate_research_paper(PAPER, "things")
+
+        repair_prompts = [p for p in prompts if "Previous answer" in p]
+        assert len(prompts) == len(article_scout_agent.CRITERIA) + 1
+        assert (
+            len(repair_prompts) == 1 and "I would rather not say." in repair_prompts[0]
+        )
+        assert PAPER.strip() not in repair_prompts[0]
+        assert result["originality_score"] == 0.6
+        assert result["parse_repairs"] == [
+            {"criterion": "originality", "attempts": 1, "repaired": True}
+        ]
+        assert result["final_score"] == pytest.approx(0.6)
+
+    def test_unrepairable_answer_is_recorded_once(self, monkeypatch):
+        """Se o reparo também falha, o critério fica com erro e conta a falha"""
+        self.use_model(monkeypatch, ["I cannot evaluate this."])
+        failures_before = telemetry.PARSE_FAILURES.value(node="check_relevance")
+        repairs_before = telemetry.PARSE_REPAIRS.value(
+            node="check_relevance", outcome="failed"
+        )
+
+        result = evaluate_research_paper(PAPER, "things")
+
+        assert result["relevance_explanation"].startswith("Error:")
+        assert (
+            telemetry.PARSE_FAILURES.value(node="check_relevance")
+            == failures_before + 1
+        )
+        assert (
+            telemetry.PARSE_REPAIRS.value(node="check_relevance", outcome="failed")
+            == repairs_before + 1
+        )
+        summary = summarize_parse_repairs(result)
+        assert summary["repair_rate"] == 1.0
+        assert summary["repair_success_rate"] == 0.0
+
+    def test_repair_can_be_disabled(self, monkeypatch):
+        """Com PARSE_REPAIR_ATTEMPTS=0 não há nova pergunta"""
+        monkeypatch.setattr(article_scout_agent, "PARSE_REPAIR_ATTEMPTS", 0)
+        self.use_model(monkeypatch, ["I cannot evaluate this."])
+
+        result = evaluate_research_paper(PAPER, "things")
+
+        assert result["parse_repairs"] == []
+        assert summarize_parse_repairs(result)["repairs"] == 0
@@ -10,8 +10,10 @@ import pytest
 # Adiciona o diretório raiz do projeto ao path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
 
-from utils.pdf_extractor import extract_text_from_pdf
+from article_scout.utils.pdf_extractor import extract_text_from_pdf
+from article_scout.utils.tokens import count_tokens
 
 class TestPDFExtraction:
     """Testes para extração de texto de PDFs"""
@@ -81,9 +83,8 @@ class TestPDFExtraction:
             
             if text:
                 # Verifica se o texto foi truncado corretamente
-                max_chars = 1000 * 4  # 4 caracteres por token
-                assert len(text) <= max_chars, f"Texto deve ser truncado para {max_chars} caracteres"
-                print(f"✅ Truncamento OK: {len(text)} caracteres")
+                assert count_tokens(text) <= 1000, "Texto deve ser truncado para 1000 tokens"
+                print(f"✅ Truncamento OK: {count_tokens(text)} tokens ({len(text)} caracteres)")
             else:
                 print(f"❌ Falha na extração de {pdf_file}")
 
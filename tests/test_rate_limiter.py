@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Testes do limitador de taxa compartilhado pelas chamadas ao modelo
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from article_scout.utils.rate_limiter import (
+    RateLimiter,
+    TokenBucket,
+    retry_after_seconds,
+)
+
+
+class FakeRateLimitError(Exception):
+    """Imita o erro 429 do cliente Groq"""
+
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("rate limited")
+        headers = {"retry-after": retry_after} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=429, headers=headers)
+
+
+class TestRateLimiter:
+    """Testes para TokenBucket e RateLimiter"""
+
+    def test_bucket_waits_once_empty(self):
+        """Depois de gastar a capacidade, a espera é proporcional ao que falta"""
+        bucket = TokenBucket(per_minute=600)  # 10 por segundo
+
+        assert bucket.reserve(600) == 0.0
+        assert bucket.reserve(5) == pytest.approx(0.5, abs=0.05)
+        bucket.adjust(5)
+        assert bucket.reserve(1) == pytest.approx(0.1, abs=0.05)
+
+    def test_retry_after_header(self):
+        """Retry-After em segundos é lido da resposta"""
+        assert retry_after_seconds(FakeRateLimitError("2")) == 2.0
+        assert retry_after_seconds(FakeRateLimitError()) is None
+
+    def test_retries_honour_retry_after(self):
+        """Um 429 é repetido após o Retry-After e reduz a concorrência"""
+        limiter = RateLimiter(max_concurrency=8, base_delay=0.01)
+        attempts = []
+
+        def flaky():
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise FakeRateLimitError("0.1")
+            return "ok"
+
+        assert limiter.call(flaky) == "ok"
+        assert attempts[1] - attempts[0] >= 0.1
+        stats = limiter.stats()
+        assert stats["retries"] == 1 and stats["rate_limited"] == 1
+        assert stats["concurrency_limit"] < 8
+
+    def test_gives_up_after_max_retries(self):
+        """Erros persistentes são propagados; os não transitórios não se repetem"""
+        limiter = RateLimiter(max_retries=2, base_delay=0.001)
+        calls = []
+
+        def always_limited():
+            calls.append(1)
+            raise FakeRateLimitError()
+
+        with pytest.raises(FakeRateLimitError):
+            limiter.call(always_limited)
+        assert len(calls) == 3
+
+        with pytest.raises(ValueError):
+            limiter.call(lambda: (_ for _ in ()).throw(ValueError("bad prompt")))
+        assert limiter.retries == 2
+
+    def test_concurrency_limit_is_shared_by_threads_and_tasks(self):
+        """Threads e tarefas asyncio respeitam o mesmo limite de chamadas simultâneas"""
+        limiter = RateLimiter(max_concurrency=2)
+
+        async def slow_async():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        async def run_tasks():
+            return await asyncio.gather(*(limiter.acall(slow_async) for _ in range(3)))
+
+        threads = [
+            threading.Thread(target=limiter.call, args=(lambda: time.sleep(0.05),))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        assert asyncio.run(run_tasks()) == ["ok"] * 3
+        for thread in threads:
+            thread.join()
+
+        assert limiter.peak_active == 2
+        assert limiter.stats()["calls"] == 6
+
+    def test_throttled_call_does_not_hold_a_slot(self):
+        """Uma chamada esperando o balde de tokens não ocupa vaga de concorrência"""
+        limiter = RateLimiter(
+            tokens_per_minute=600, max_concurrency=1
+        )  # 10 tokens por segundo
+        limiter.call(lambda: "answer", tokens=600)
+
+        throttled = threading.Thread(
+            target=limiter.call, args=(lambda: "answer",), kwargs={"tokens": 3}
+        )
+        throttled.start()
+        time.sleep(0.1)
+        assert limiter.active == 0
+        throttled.join()
+
+        assert limiter.stats()["throttled_seconds"] == pytest.approx(0.3, abs=0.05)
+
+    def test_async_waiter_is_woken_by_the_release(self, monkeypatch):
+        """Uma tarefa esperando vaga acorda quando uma thread a libera, sem polling"""
+        limiter = RateLimiter(max_concurrency=1)
+        release = threading.Event()
+        holder = threading.Thread(target=limiter.call, args=(release.wait,))
+        holder.start()
+        while limiter.active == 0:
+            time.sleep(0.001)
+
+        original_sleep, sleeps = asyncio.sleep, []
+
+        async def counting_sleep(delay, *args):
+            sleeps.append(delay)
+            return await original_sleep(delay, *args)
+
+        monkeypatch.setattr(asyncio, "sleep", counting_sleep)
+
+        async def main():
+            task = asyncio.ensure_future(limiter.acall(lambda: original_sleep(0, "ok")))
+            await original_sleep(0.05)
+            assert not task.done()
+            release.set()
+            return await asyncio.wait_for(task, timeout=1)
+
+        assert asyncio.run(main()) == "ok"
+        holder.join()
+        assert sleeps == []
+
+    def test_token_usage_corrects_estimate(self):
+        """O consumo real informado pela API corrige a reserva estimada"""
+        limiter = RateLimiter(tokens_per_minute=600)
+
+        limiter.call(lambda: "answer", tokens=600, usage=lambda result: 0)
+        start = time.monotonic()
+        limiter.call(lambda: "answer", tokens=300)
+        assert time.monotonic() - start < 0.1
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Testes do filtro de relevância (com um modelo falso, sem chamar a API)
+"""
+
+import os
+import sys
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+
+from article_scout import article_scout_agent
+from article_scout.article_scout_agent import evaluate_research_paper
+from article_scout.utils.rate_limiter import RateLimiter
+
+PAPER = "We evaluate a new method for things. " * 50
+
+
+class TestRelevanceGate:
+    """Testes para o parâmetro relevance_threshold"""
+
+    @pytest.fixture(autouse=True)
+    def no_rate_limit(self, monkeypatch):
+        monkeypatch.setattr(article_scout_agent, "rate_limiter", RateLimiter())
+
+    def use_responses(self, monkeypatch, *responses):
+        fake = FakeListChatModel(responses=list(responses))
+        monkeypatch.setattr(article_scout_agent, "llm", fake)
+
+    def test_off_theme_paper_skips_other_criteria(self, monkeypatch):
+        """Relevância abaixo do limite: uma chamada e os demais critérios sem nota"""
+        # Qualquer chamada além da primeira receberia a nota 0.9
+        self.use_responses(
+            monkeypatch,
+            "Score: 0.1\nExplanation: Off-theme.",
+            "Score: 0.9\nExplanation: Great.",
+        )
+
+        result = evaluate_research_paper(PAPER, "things", relevance_threshold=0.3)
+
+        assert result["relevance_score"] == pytest.approx(0.1)
+        assert len(result["skipped_criteria"]) == 6
+        assert result["saved_tokens"] > 0
+        assert result["originality_score"] == 0.0
+        assert result["originality_explanation"].startswith("Not evaluated")
+        assert result["final_score"] == pytest.approx(0.1 * 0.20)
+
+    def test_relevant_paper_runs_every_criterion(self, monkeypatch):
+        """Relevância acima do limite: todos os critérios são avaliados"""
+        self.use_responses(monkeypatch, "Score: 0.8\nExplanation: On theme.")
+
+        result = evaluate_research_paper(PAPER, "things", relevance_threshold=0.3)
+
+        assert result["skipped_criteria"] == []
+        assert result["final_score"] == pytest.approx(0.8)
+
+    def test_not_available_in_single_call_mode(self):
+        """O filtro precisa de chamadas por critério"""
+        with pytest.raises(ValueError):
+            evaluate_research_paper(
+                PAPER, "things", single_call=True, relevance_threshold=0.3
+            )
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Testes da divisão do texto em seções e dos trechos por critério
+"""
+
+import os
+import sys
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from article_scout.utils.sections import build_excerpt, split_into_sections
+
+PAPER = (
+    """A Study of Things
+Jane Doe, John Roe
+Abstract—We propose a method for things.
+1. Introduction
+Things matter. """
+    + "context " * 100
+    + """
+II. RELATED WORK
+Others did similar things.
+3 Methodology
+We collected data. """
+    + "procedure " * 200
+    + """
+3.1 Method details
+More details.
+4. Results
+Accuracy was 90%.
+5. Discussion
+This is good.
+6. Conclusão
+Fim.
+References
+[1] A. Smith. Things. 2021.
+"""
+)
+
+
+class TestSections:
+    """Testes para split_into_sections e build_excerpt"""
+
+    def test_detects_sections_with_offsets(self):
+        """Cabeçalhos numerados, em caixa alta e em português são reconhecidos"""
+        sections = split_into_sections(PAPER)
+        names = [s.name for s in sections]
+
+        assert names == [
+            "front",
+            "abstract",
+            "introduction",
+            "background",
+            "methods",
+            "results",
+            "discussion",
+            "conclusion",
+            "references",
+        ]
+        methods = next(s for s in sections if s.name == "methods")
+        assert PAPER[methods.start :].startswith("3 Methodology")
+        # A subseção "3.1 Method details" continua dentro de methods
+        assert "3.1 Method details" in PAPER[methods.start : methods.end]
+        assert sections[-1].end == len(PAPER)
+
+    def test_no_headings(self):
+        """Sem cabeçalhos não há seções"""
+        assert split_into_sections("just some text without structure") == []
+
+    def test_excerpt_respects_budget_and_sections(self):
+        """O trecho contém só as seções pedidas e cabe no orçamento"""
+        sections = split_into_sections(PAPER)
+        excerpt = build_excerpt(PAPER, sections, ["results", "references"], 300)
+
+        assert len(excerpt) <= 300
+        assert "[Results]" in excerpt and "[References]" in excerpt
+        assert "A. Smith" in excerpt
+        assert "procedure" not in excerpt
+
+    def test_long_section_gets_leftover_budget(self):
+        """Seções curtas ficam inteiras e a sobra vai para as longas"""
+        sections = split_into_sections(PAPER)
+        excerpt = build_excerpt(PAPER, sections, ["abstract", "methods"], 1000)
+
+        assert "We propose a method for things." in excerpt
+        assert len(excerpt) > 900
+
+    def test_fallback_to_start_of_text(self):
+        """Sem as seções pedidas, usa o início do texto"""
+        excerpt = build_excerpt("word " * 100, [], ["methods"], 50)
+
+        assert len(excerpt) <= 50
+        assert excerpt.startswith("word")
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Testes da deduplicação de avaliações idênticas em andamento (single-flight)
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+
+from article_scout import article_scout_agent
+from article_scout.article_scout_agent import (
+    aevaluate_research_paper,
+    astream_research_paper_evaluation,
+    evaluate_research_paper,
+    stream_research_paper_evaluation,
+)
+from article_scout.utils import telemetry
+from article_scout.utils.rate_limiter import RateLimiter
+from article_scout.utils.single_flight import SingleFlight
+
+PAPER = "We evaluate a new method for things. " * 50
+
+
+def led(group: SingleFlight, key, compute):
+    """Executa compute como líder do voo de key, ou devolve o resultado compartilhado"""
+    flight, shared = group.lead_or_wait(key)
+    if flight is None:
+        return shared
+    with flight:
+        result = compute()
+        flight.resolve(result)
+    return result
+
+
+class TestSingleFlight:
+    """Testes para SingleFlight"""
+
+    def test_threads_share_one_computation(self):
+        """Chamadas simultâneas de mesma chave rodam uma vez; outras não esperam"""
+        group, calls = SingleFlight(), []
+
+        def compute(key):
+            calls.append(key)
+            time.sleep(0.1)
+            return f"result {key}"
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            futures = [
+                executor.submit(led, group, key, lambda key=key: compute(key))
+                for key in "aaaab" + "b"
+            ]
+            results = [future.result() for future in futures]
+
+        assert results == ["result a"] * 4 + ["result b"] * 2
+        assert sorted(calls) == ["a", "b"]
+        assert len(group) == 0
+
+    def test_exception_is_shared(self):
+        """A exceção do líder chega a quem esperava por ele"""
+        group = SingleFlight()
+        leader = group.join("key")
+        follower = group.join("key")
+        assert leader.leader and not follower.leader
+
+        with pytest.raises(RuntimeError):
+            with leader:
+                raise RuntimeError("API indisponível")
+        with pytest.raises(RuntimeError, match="API indisponível"):
+            follower.wait()
+
+    def test_abandoned_flight_is_taken_over(self):
+        """Se o líder desiste, um dos que esperavam passa a calcular"""
+        group = SingleFlight()
+        leader = group.join("key")
+        result = {}
+
+        def follower():
+            result["value"] = led(group, "key", lambda: "computed by the follower")
+
+        thread = threading.Thread(target=follower)
+        thread.start()
+        time.sleep(0.05)
+        with leader:
+            pass  # Sai sem resultado, como um stream fechado
+        thread.join(5)
+
+        assert result["value"] == "computed by the follower"
+
+    def test_asyncio_tasks_and_threads_share(self):
+        """Tarefas asyncio (de qualquer loop) e threads esperam pelo mesmo voo"""
+        group, calls = SingleFlight(), []
+
+        async def acompute():
+            calls.append("async")
+            await asyncio.sleep(0.1)
+            return "shared"
+
+        async def alead():
+            flight, shared = await group.alead_or_wait("key")
+            if flight is None:
+                return shared
+            with flight:
+                result = await acompute()
+                flight.resolve(result)
+            return result
+
+        async def main():
+            first = asyncio.create_task(alead())
+            await asyncio.sleep(0.01)
+            thread_result = asyncio.to_thread(
+                led, group, "key", lambda: calls.append("thread")
+            )
+            return await asyncio.gather(first, alead(), alead(), thread_result)
+
+        assert asyncio.run(main()) == ["shared"] * 4
+        assert calls == ["async"]
+
+    def test_cancelled_follower_leaves_the_flight_running(self):
+        """Cancelar uma tarefa que espera não cancela o voo dos outros"""
+        group = SingleFlight()
+
+        async def main():
+            leader = group.join("key")
+            waiting = asyncio.create_task(group.join("key").await_result())
+            other = asyncio.create_task(group.join("key").await_result())
+            await asyncio.sleep(0.01)
+            waiting.cancel()
+            await asyncio.sleep(0.01)
+            leader.resolve("done")
+            return await other, waiting.cancelled()
+
+        assert asyncio.run(main()) == ("done", True)
+
+
+class TestEvaluationCoalescing:
+    """Testes da deduplicação nas funções de avaliação"""
+
+    @pytest.fixture(autouse=True)
+    def prompts(self, monkeypatch):
+        """Modelo lento, para sobrepor avaliações; registra os prompts enviados"""
+        monkeypatch.setattr(article_scout_agent, "rate_limiter", RateLimiter())
+        monkeypatch.setattr(
+            article_scout_agent,
+            "llm",
+            FakeListChatModel(responses=["Score: 0.6\nExplanation: Ok."]),
+        )
+        prompts = []
+        original_invoke, original_ainvoke = (
+            article_scout_agent._invoke,
+            article_scout_agent._ainvoke,
+        )
+
+        def invoke(runnable, prompt, output_tokens, limiter=None):
+            prompts.append(prompt)
+            time.sleep(0.2)
+            return original_invoke(runnable, prompt, output_tokens, limiter)
+
+        async def ainvoke(runnable, prompt, output_tokens, limiter=None):
+            prompts.append(prompt)
+            await asyncio.sleep(0.2)
+            return await original_ainvoke(runnable, prompt, output_tokens, limiter)
+
+        monkeypatch.setattr(article_scout_agent, "_invoke", invoke)
+        monkeypatch.setattr(article_scout_agent, "_ainvoke", ainvoke)
+        return prompts
+
+    def test_concurrent_identical_requests_are_evaluated_once(self, prompts):
+        """Três usuários enviando o mesmo paper e tema pagam uma avaliação só"""
+        coalesced_before = telemetry.COALESCED_EVALUATIONS.value()
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            results = list(
+                executor.map(
+                    lambda _: evaluate_research_paper(PAPER, "things"), range(3)
+                )
+            )
+
+        assert len(prompts) == len(article_scout_agent.CRITERIA)
+        assert all(result == results[0] for result in results)
+        # Cada chamador recebe sua própria cópia do resultado
+        assert results[0] is not results[1]
+        assert telemetry.COALESCED_EVALUATIONS.value() == coalesced_before + 2
+
+    def test_different_theme_is_not_coalesced(self, prompts):
+        """O mesmo paper com outro tema é outra avaliação"""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(
+                executor.map(
+                    lambda theme: evaluate_research_paper(PAPER, theme),
+                    ["things", "other things"],
+                )
+            )
+
+        assert len(prompts) == 2 * len(article_scout_agent.CRITERIA)
+
+    def test_async_and_stream_callers_share(self, prompts):
+        """Tarefas asyncio e um stream em outra thread compartilham a mesma avaliação"""
+
+        async def main():
+            stream = asyncio.to_thread(
+                lambda: list(stream_research_paper_evaluation(PAPER, "things"))
+            )
+            return await asyncio.gather(
+                aevaluate_research_paper(PAPER, "things"),
+                aevaluate_research_paper(PAPER, "things"),
+                stream,
+            )
+
+        first, second, events = asyncio.run(main())
+
+        assert len(prompts) == len(article_scout_agent.CRITERIA)
+        assert first["final_score"] == second["final_score"] == pytest.approx(0.6)
+        criteria = [
+            event["criterion"] for event in events if event["event"] == "criterion"
+        ]
+        assert sorted(criteria) == sorted(article_scout_agent.CRITERIA)
+        assert events[-1]["final_score"] == pytest.approx(0.6)
+
+    def test_unread_stream_does_not_hold_up_waiting_callers(self, prompts):
+        """Quem espera recebe o resultado mesmo que o stream líder não seja lido"""
+        stream = stream_research_paper_evaluation(PAPER, "things")
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            assert next(stream)["event"] == "criterion"
+            result = executor.submit(evaluate_research_paper, PAPER, "things").result(
+                timeout=10
+            )
+        finally:
+            stream.close()
+            executor.shutdown()
+
+        assert result["final_score"] == pytest.approx(0.6)
+        assert len(prompts) == len(article_scout_agent.CRITERIA)
+
+    def test_unread_async_stream_does_not_hold_up_waiting_callers(self, prompts):
+        async def main():
+            stream = astream_research_paper_evaluation(PAPER, "things")
+            try:
+                assert (await anext(stream))["event"] == "criterion"
+                return await asyncio.wait_for(
+                    aevaluate_research_paper(PAPER, "things"), timeout=10
+                )
+            finally:
+                await stream.aclose()
+
+        assert asyncio.run(main())["final_score"] == pytest.approx(0.6)
+        assert len(prompts) == len(article_scout_agent.CRITERIA)
+
+    def test_failure_reaches_every_waiting_caller(self, prompts, monkeypatch):
+        """Se a líder falha, quem espera recebe o erro; a próxima tenta de novo"""
+
+        def failing_graph(*args, **kwargs):
+            time.sleep(0.2)
+            raise TimeoutError("Request timed out")
+
+        app = article_scout_agent._get("app")
+        monkeypatch.setattr(app, "invoke", failing_graph)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(evaluate_research_paper, PAPER, "things")
+                for _ in range(3)
+            ]
+            errors = [future.exception() for future in futures]
+
+        assert all(isinstance(error, TimeoutError) for error in errors)
+        assert len(article_scout_agent.evaluation_flights) == 0
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Testes da API de avaliação em streaming (com um modelo falso, sem chamar a API)
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+
+from article_scout import article_scout_agent
+from article_scout.article_scout_agent import (
+    astream_research_paper_evaluation,
+    stream_research_paper_evaluation,
+)
+from article_scout.utils.rate_limiter import RateLimiter
+
+PAPER = "We evaluate a new method for things. " * 50
+
+
+class TestStreaming:
+    """Testes do stream síncrono e assíncrono da avaliação"""
+
+    @pytest.fixture(autouse=True)
+    def fake_llm(self, monkeypatch):
+        fake = FakeListChatModel(responses=["Score: 0.5\nExplanation: Looks fine."])
+        monkeypatch.setattr(article_scout_agent, "llm", fake)
+        monkeypatch.setattr(article_scout_agent, "rate_limiter", RateLimiter())
+
+    def test_yields_every_criterion_then_final(self):
+        """Um evento por critério e, por último, o evento final com a nota"""
+        events = list(stream_research_paper_evaluation(PAPER, "things"))
+
+        criteria = [e["criterion"] for e in events if e["event"] == "criterion"]
+        assert sorted(criteria) == sorted(article_scout_agent.CRITERIA)
+        assert events[-1]["event"] == "final"
+        assert events[-1]["final_score"] == pytest.approx(0.5)
+        assert events[-1]["result"]["relevance_explanation"] == "Looks fine."
+
+    def test_async_iterator(self):
+        """A versão assíncrona produz os mesmos eventos"""
+
+        async def collect():
+            return [e async for e in astream_research_paper_evaluation(PAPER, "things")]
+
+        events = asyncio.run(collect())
+
+        assert sum(e["event"] == "criterion" for e in events) == 7
+        assert events[-1]["event"] == "final"
@@ -9,11 +9,11 @@ import sys
 import tempfile
 import pprint
 
-# Adiciona o diretório raiz ao path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Adiciona o diretório src ao path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
 
-from utils.pdf_extractor import extract_text_from_pdf
-from article_scout_agent import evaluate_research_paper
+from article_scout.utils.pdf_extractor import extract_text_from_pdf
+from article_scout.article_scout_agent import evaluate_research_paper
 
 def main():
     """Demonstra o fluxo completo da integração"""
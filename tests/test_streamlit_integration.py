@@ -14,9 +14,10 @@ import pytest
 # Adiciona o diretório raiz do projeto ao path
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, "src"))
 
-from utils.pdf_extractor import extract_text_from_pdf
-from article_scout_agent import evaluate_research_paper, format_results_for_display
+from article_scout.utils.pdf_extractor import extract_text_from_pdf
+from article_scout.article_scout_agent import evaluate_research_paper, format_results_for_display
 
 class TestStreamlitIntegration:
     """Testa a integração completa simulando o fluxo do Streamlit"""
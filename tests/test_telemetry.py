@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Testes da telemetria: spans, métricas no formato Prometheus e instrumentação dos
+nós do grafo
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import urllib.request
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ["EVALUATION_CACHE_PATH"] = ""
+
+from article_scout import article_scout_agent
+from article_scout.article_scout_agent import (
+    aevaluate_research_paper,
+    evaluate_research_paper,
+)
+from article_scout.utils import telemetry
+from article_scout.utils.llm_backends import FakeAPIError
+from article_scout.utils.rate_limiter import RateLimiter
+
+PAPER = "We evaluate a new method for things. " * 50
+
+
+class TestMetrics:
+    """Testes para o registro de métricas"""
+
+    def test_prometheus_text_format(self):
+        """Contadores e histogramas são exportados no formato de texto do Prometheus"""
+        registry = telemetry.MetricsRegistry()
+        counter = registry.counter("test_calls_total", "Calls", ("node",))
+        histogram = registry.histogram(
+            "test_seconds", "Seconds", ("node",), buckets=(0.1, 1.0)
+        )
+        counter.inc(node="a")
+        counter.inc(2, node="a")
+        histogram.observe(0.5, node="a")
+
+        text = registry.render()
+
+        assert "# TYPE test_calls_total counter" in text
+        assert 'test_calls_total{node="a"} 3' in text
+        assert 'test_seconds_bucket{node="a",le="0.1"} 0' in text
+        assert 'test_seconds_bucket{node="a",le="1"} 1' in text
+        assert 'test_seconds_bucket{node="a",le="+Inf"} 1' in text
+        assert 'test_seconds_sum{node="a"} 0.5' in text
+
+    def test_registry_returns_existing_metric(self):
+        """Registrar o mesmo nome duas vezes devolve a mesma métrica"""
+        registry = telemetry.MetricsRegistry()
+        assert registry.counter("x_total", "X") is registry.counter("x_total", "X")
+
+    def test_metrics_server(self):
+        """O servidor responde /metrics em texto e /spans em JSON"""
+        server = telemetry.start_metrics_server(0, host="127.0.0.1")
+        port = server.server_address[1]
+
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert "article_scout_node_duration_seconds" in response.read().decode()
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/spans") as response:
+            assert response.headers["Content-Type"] == "application/json"
+
+
+class TestSpans:
+    """Testes para spans e chamadas de modelo"""
+
+    def test_nested_spans_share_trace(self):
+        """Spans filhos herdam o trace e o nó do pai"""
+        with telemetry.span("root") as root:
+            with telemetry.span("node", node="check_x"):
+                with telemetry.span("child") as child:
+                    pass
+
+        spans = telemetry.recent_spans(root.trace_id)
+        assert [s["name"] for s in spans] == ["child", "node", "root"]
+        assert spans[0]["attributes"]["node"] == "check_x"
+        assert spans[2]["parent_span_id"] is None
+        assert child.parent.parent is root
+
+    def test_error_status(self):
+        """Uma exceção marca o span como ERROR"""
+        with pytest.raises(ValueError):
+            with telemetry.span("failing") as span:
+                raise ValueError("boom")
+        assert span.status == "ERROR"
+        assert span.attributes["error.type"] == "ValueError"
+
+    def test_spans_file_is_written_off_the_event_loop(self, monkeypatch, tmp_path):
+        """Spans que terminam no event loop só enfileiram a linha; uma thread grava"""
+        path = tmp_path / "spans.jsonl"
+        monkeypatch.setenv("TELEMETRY_SPANS_PATH", str(path))
+        writers = []
+
+        def spy_open(*args, **kwargs):
+            writers.append(threading.current_thread().name)
+            return open(*args, **kwargs)
+
+        monkeypatch.setattr(telemetry, "open", spy_open, raising=False)
+
+        async def run():
+            with telemetry.span("async_root") as root:
+                with telemetry.span("async_child"):
+                    await asyncio.sleep(0)
+            return root
+
+        root = asyncio.run(run())
+        telemetry.flush_spans()
+
+        with open(path, encoding="utf-8") as f:
+            spans = [json.loads(line) for line in f]
+        assert [s["name"] for s in spans] == ["async_child", "async_root"]
+        assert all(s["trace_id"] == root.trace_id for s in spans)
+        assert writers and set(writers) == {"telemetry-spans"}
+
+    def test_model_call_records_retries_wait_and_tokens(self):
+        """Tentativas repetidas e tempo de espera são somados no span do nó"""
+        limiter = RateLimiter(base_delay=0.01)
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise FakeAPIError(429, retry_after=0.05)
+            return "ok"
+
+        retries_before = telemetry.MODEL_RETRIES.value(node="test_node")
+        with telemetry.span("test_node", node="test_node") as node:
+            with telemetry.model_call() as call:
+                limiter.call(call.wrap(flaky))
+                call.set_usage(100, 20)
+
+        assert node.attributes["llm.retries"] == 1
+        assert node.attributes["llm.wait_seconds"] >= 0.05
+        assert node.attributes["llm.prompt_tokens"] == 100
+        assert node.attributes["llm.completion_tokens"] == 20
+        assert telemetry.MODEL_RETRIES.value(node="test_node") == retries_before + 1
+
+
+class TestGraphInstrumentation:
+    """Testes da instrumentação do grafo de avaliação"""
+
+    @pytest.fixture(autouse=True)
+    def fake_model(self, monkeypatch):
+        monkeypatch.setattr(article_scout_agent, "rate_limiter", RateLimiter())
+
+    def use_model(self, monkeypatch, response):
+        monkeypatch.setattr(
+            article_scout_agent, "llm", FakeListChatModel(responses=[response])
+        )
+
+    def node_spans(self):
+        root = telemetry.recent_spans()[-1]
+        return root, {s["name"]: s for s in telemetry.recent_spans(root["trace_id"])}
+
+    def test_every_node_has_a_span(self, monkeypatch):
+        """Cada nó vira um span filho da avaliação, com as chamadas de modelo"""
+        self.use_model(monkeypatch, "Score: 0.8\nExplanation: Fine.")
+        evaluations_before = telemetry.EVALUATIONS.value(
+            mode="per_criterion", cached="false"
+        )
+
+        evaluate_research_paper(PAPER, "things")
+        root, spans = self.node_spans()
+
+        assert root["name"] == "evaluate_research_paper"
+        assert root["attributes"]["mode"] == "per_criterion"
+        for node in [*article_scout_agent.CRITERIA_NODES, "calculate_final_score"]:
+            assert spans[node]["parent_span_id"] == root["span_id"]
+        relevance = spans["check_relevance"]["attributes"]
+        assert relevance["llm.prompt_tokens"] > 0
+        assert relevance["llm.retries"] == 0
+        assert "llm.wait_seconds" in relevance
+        assert (
+            spans["model_call"]["attributes"]["node"]
+            in article_scout_agent.CRITERIA_NODES
+        )
+        assert (
+            telemetry.EVALUATIONS.value(mode="per_criterion", cached="false")
+            == evaluations_before + 1
+        )
+
+    def test_parse_failures_are_counted(self, monkeypatch):
+        """Respostas ilegíveis contam como falha de parsing do nó"""
+        self.use_model(monkeypatch, "I cannot evaluate this.")
+        failures_before = telemetry.PARSE_FAILURES.value(node="check_originality")
+
+        result = asyncio.run(aevaluate_research_paper(PAPER, "things"))
+        _, spans = self.node_spans()
+
+        assert result["originality_explanation"].startswith("Error:")
+        assert spans["check_originality"]["attributes"]["llm.parse_failures"] == 1
+        assert (
+            telemetry.PARSE_FAILURES.value(node="check_originality")
+            == failures_before + 1
+        )
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Testes da contagem de tokens e do orçamento de entrada
+"""
+
+import os
+import sys
+from collections import OrderedDict
+
+# Adiciona o pacote ao path, como faz o Streamlit App
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(project_root, "src"))
+
+from article_scout.utils import tokens
+from article_scout.utils.tokens import (
+    chars_per_token,
+    count_tokens,
+    fit_to_tokens,
+    input_token_budget,
+)
+
+ENGLISH = "The proposed method improves accuracy on every benchmark we evaluated. " * 50
+PORTUGUESE = (
+    "A metodologia proposta é avaliada em três conjuntos de dados públicos. " * 50
+)
+MATH = "∑ᵢ αᵢ·xᵢ ≤ β, ∀x ∈ ℝⁿ; f(x)=‖Ax−b‖² " * 50
+
+
+class TestTokens:
+    """Testes para count_tokens, fit_to_tokens e input_token_budget"""
+
+    def test_density_varies_by_language(self):
+        """Português e fórmulas têm menos caracteres por token que inglês"""
+        assert (
+            chars_per_token(ENGLISH)
+            > chars_per_token(PORTUGUESE)
+            > chars_per_token(MATH)
+        )
+
+    def test_fit_respects_budget_and_sentence_boundary(self):
+        """O texto cortado cabe no orçamento e termina numa frase completa"""
+        for text in (ENGLISH, PORTUGUESE, MATH):
+            fitted = fit_to_tokens(text, 200)
+            assert 0 < count_tokens(fitted) <= 200
+            assert text.startswith(fitted)
+        assert fit_to_tokens(ENGLISH, 200).endswith("evaluated.")
+
+    def test_count_cache_keeps_digests_not_texts(self, monkeypatch):
+        """O cache das contagens guarda resumos de 16 bytes, não os textos"""
+        monkeypatch.setattr(tokens, "_counts", OrderedDict())
+        monkeypatch.setattr(tokens, "COUNT_CACHE_SIZE", 2)
+        papers = [f"Paper {i}. " + ENGLISH for i in range(3)]
+        counts = [count_tokens(paper) for paper in papers]
+
+        assert len(tokens._counts) == 2
+        assert all(len(key) == 16 for key in tokens._counts)
+        assert [count_tokens(paper) for paper in papers] == counts
+        assert count_tokens(papers[0]) != count_tokens(papers[0] + " More text.")
+
+    def test_short_text_is_unchanged(self):
+        """Texto que já cabe não é alterado"""
+        assert fit_to_tokens("Short text.", 100) == "Short text."
+
+    def test_input_budget(self):
+        """O orçamento desconta prompt e resposta do menor limite"""
+        assert input_token_budget("llama-3.1-8b-instant", 500, 400, 6000) == 5100
+        assert input_token_budget("llama-3.1-8b-instant", 500, 400) == 131072 - 900
+        assert input_token_budget("unknown-model", 9000, 400) == 0